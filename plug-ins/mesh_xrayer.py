@@ -121,7 +121,9 @@ class MeshXRayerData(om.MUserData):
         """Constructor."""
         super(MeshXRayerData, self).__init__(False)  # don't delete after draw
 
-        self.mesh_tris = om.MPointArray()
+        self.mesh_pts = om.MPointArray()
+        self.mesh_tri_ids = om.MUintArray()
+        self.mesh_topology = None
         self.color = om.MColor()
         self.hide_angle = 0.0
         self.draw_control = True
@@ -202,22 +204,11 @@ class MeshXRayerDrawOverride(omr.MPxDrawOverride):
         _in_mesh_plug = om.MPlug(_node, MeshXRayer.in_mesh)
         lprint(' - IN MESH PLUG', _in_mesh_plug, verbose=verbose)
 
-        _data.mesh_tris.clear()
         if _in_mesh_plug.isNull:
             return None
-        if _in_mesh_plug.asMDataHandle().type() != om.MFnData.kMesh:
+
+        if not self._read_mesh(_in_mesh_plug, _data, verbose=verbose):
             return None
-        _in_mesh_handle = _in_mesh_plug.asMDataHandle().asMesh()
-        _in_mesh = om.MFnMesh(_in_mesh_handle)
-
-        # Read mesh triangles
-        _mesh_pts = _in_mesh.getPoints()
-        for _poly_id in range(_in_mesh.numPolygons):
-            _vtx_ids = _in_mesh.getPolygonVertices(_poly_id)
-            for _vtx_id in _vtx_ids[:3]:
-                _data.mesh_tris.append(_mesh_pts[_vtx_id])
-        lprint(' - IN MESH', _in_mesh, len(_in_mesh.getPoints()),
-               verbose=verbose)
 
         # Read col/hide_angle + draw toggles
         _col_plug = om.MPlug(_node, MeshXRayer.color)
@@ -233,6 +224,46 @@ class MeshXRayerDrawOverride(omr.MPxDrawOverride):
 
         return _data
 
+    @staticmethod
+    def _read_mesh(plug, data, verbose=0):
+        """Read in_mesh triangles into the data cache.
+
+        The triangles are stored as the mesh points and an index buffer
+        built from MFnMesh.getTriangles, so n-gons are drawn correctly and
+        no per-polygon calls are needed. The points are reread on every
+        draw so that deformations are shown, but the index buffer is only
+        rebuilt when the mesh topology changes - this is checked using a
+        hash of the vertex ids of each polygon, so that edits which keep
+        the same counts (eg. edge spin) are detected.
+
+        Args:
+            plug (MPlug): in_mesh plug
+            data (MeshXRayerData): data to update
+            verbose (int): print process data
+
+        Returns:
+            (bool): whether a mesh was read
+        """
+        _handle = plug.asMDataHandle()
+        if _handle.type() != om.MFnData.kMesh:
+            data.mesh_pts.clear()
+            data.mesh_tri_ids.clear()
+            data.mesh_topology = None
+            return False
+        _in_mesh = om.MFnMesh(_handle.asMesh())
+        _vtx_counts, _vtx_ids = _in_mesh.getVertices()
+        _topology = hash((_in_mesh.numVertices, tuple(_vtx_counts),
+                          tuple(_vtx_ids)))
+        if data.mesh_topology != _topology:
+            _, _tri_vtx_ids = _in_mesh.getTriangles()
+            data.mesh_tri_ids = om.MUintArray(_tri_vtx_ids)
+            data.mesh_topology = _topology
+        data.mesh_pts = _in_mesh.getPoints()
+        lprint(' - IN MESH', _in_mesh, len(data.mesh_pts),
+               len(data.mesh_tri_ids)/3, verbose=verbose)
+
+        return True
+
     def hasUIDrawables(self):
         """Test if this drawing override has drawables.
 
@@ -266,7 +297,8 @@ class MeshXRayerDrawOverride(omr.MPxDrawOverride):
         if data.draw_mesh and _angle_to_cam <= _hide_angle:
             painter.beginDrawInXray()
             painter.setColor(data.color)
-            painter.mesh(omr.MGeometry.kTriangles, data.mesh_tris)
+            painter.mesh(omr.MGeometry.kTriangles, data.mesh_pts,
+                         None, None, data.mesh_tri_ids)
             painter.endDrawInXray()
 
         # Draw control
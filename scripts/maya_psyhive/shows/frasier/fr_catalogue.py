@@ -0,0 +1,342 @@
+"""Tools for managing a persistent catalogue of frasier action works.
+
+Finding action works requires listing every asset's animation work dir,
+and filtering them requires reading the vendor file cache of each work.
+The catalogue stores a record of each work in an sqlite db, with indexes
+on the fields which are filtered on, so that queries don't need to touch
+the work files. Each work dir is stored with its mtime (and the mtime of
+its cache dir) and only dirs which have changed are reread on update.
+"""
+
+import collections
+import os
+import sqlite3
+import threading
+import time
+
+from psyhive import qt
+from psyhive.utils import (
+    CacheMissing, lprint, test_path, get_time_t, get_time_f, store_result,
+    passes_filter)
+
+from . import fr_vendor_ma
+from .fr_work import ASSETS, FrasierWork
+
+CATALOGUE_DB = os.environ.get(
+    'PSYHIVE_FR_CATALOGUE',
+    '{}/data_cache/action_works.db'.format(fr_vendor_ma.MOBURN_ROOT))
+
+ActionRecord = collections.namedtuple('ActionRecord', [
+    'path', 'dir', 'root', 'task', 'type_', 'name', 'desc', 'iter',
+    'version', 'vendor_ma', 'mtime', 'day', 'fbx', 'dated_fbx'])
+
+_INDEXED = ['root', 'task', 'type_', 'name', 'desc', 'version',
+            'vendor_ma', 'mtime', 'day']
+
+
+class ActionCatalogue(object):
+    """Persistent catalogue of action works stored in an sqlite file."""
+
+    def __init__(self, file_=CATALOGUE_DB, min_age=2.0):
+        """Constructor.
+
+        Args:
+            file_ (str): path to sqlite file
+            min_age (float): don't store mtimes of dirs which were
+                modified less than this many seconds ago (to avoid
+                missing changes made within the mtime resolution)
+        """
+        self.file_ = file_
+        self.min_age = min_age
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def find(self, type_=None, task=None, root=None, name=None, desc=None,
+             version=None, day=None, after=None, max_age=None):
+        """Find records in this catalogue.
+
+        Args:
+            type_ (str): match type (eg. Vignette, Disposition)
+            task (str): match task
+            root (str): match asset root path
+            name (str): match name
+            desc (str): match desc
+            version (int): match version
+            day (str): match delivery day (in %y%m%d format)
+            after (float): match works delivered at or after this time
+            max_age (float): match works delivered less than this many
+                seconds ago
+
+        Returns:
+            (ActionRecord list): matching records
+        """
+        _where, _args = [], []
+        for _field, _val in [
+                ('type_', type_), ('task', task), ('root', root),
+                ('name', name), ('desc', desc), ('version', version),
+                ('day', day)]:
+            if _val:
+                _where.append('{}=?'.format(_field))
+                _args.append(_val)
+        if max_age is not None:
+            _after = time.time() - max_age
+            after = max(after, _after) if after else _after
+        if after:
+            _where.append('mtime>=?')
+            _args.append(after)
+
+        _sql = 'SELECT {} FROM works'.format(', '.join(ActionRecord._fields))
+        if _where:
+            _sql += ' WHERE '+' AND '.join(_where)
+        _sql += ' ORDER BY path'
+        with self._lock:
+            _rows = self._get_conn().execute(_sql, _args).fetchall()
+        return [ActionRecord(*_row) for _row in _rows]
+
+    def update(self, rebuild=False, progress=True, verbose=0):
+        """Update this catalogue from disk.
+
+        Work dirs whose mtimes have not changed since they were last
+        read are skipped.
+
+        Args:
+            rebuild (bool): reread all work dirs
+            progress (bool): show progress bar
+            verbose (int): print process data
+        """
+        _conn = self._get_conn()
+        with self._lock:
+            _mtimes = dict([
+                (_dir, (_mtime, _cache_mtime))
+                for _dir, _mtime, _cache_mtime in _conn.execute(
+                    'SELECT path, mtime, cache_mtime FROM dirs')])
+
+        for _asset in qt.progress_bar(
+                ASSETS.values(), 'Checking {:d} asset{}', show=progress):
+            _anim = _asset.find_step_root('animation', catch=True)
+            if not _anim:
+                continue
+            _area = _anim.get_work_area(dcc='maya')
+            _dir = _area.get_work_dir()
+            _cur_mtimes = _get_dir_mtimes(_dir)
+            if not rebuild and _mtimes.get(_dir) == _cur_mtimes:
+                lprint('UP TO DATE', _dir, verbose=verbose)
+                continue
+            lprint('READING', _dir, verbose=verbose)
+            _records = []
+            if _cur_mtimes:
+                _records = [
+                    _work_to_record(_work)
+                    for _work in _area.find_work(class_=FrasierWork)]
+            self._write_dir(_dir, _records, _cur_mtimes)
+
+    def _write_dir(self, dir_, records, mtimes):
+        """Replace the records of a work dir.
+
+        Args:
+            dir_ (str): work dir
+            records (ActionRecord list): records of works in dir
+            mtimes (tuple): dir/cache dir mtimes
+        """
+        _store = bool(mtimes) and time.time() - max(mtimes) > self.min_age
+        with self._lock:
+            _conn = self._get_conn()
+            try:
+                _conn.execute('DELETE FROM works WHERE dir=?', (dir_, ))
+                _conn.executemany(
+                    'INSERT OR REPLACE INTO works VALUES ({})'.format(
+                        ', '.join(['?']*len(ActionRecord._fields))),
+                    records)
+                if _store:
+                    _conn.execute(
+                        'INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)',
+                        (dir_, ) + mtimes)
+                else:
+                    _conn.execute('DELETE FROM dirs WHERE path=?', (dir_, ))
+                _conn.commit()
+            except sqlite3.Error as _exc:
+                _conn.rollback()
+                lprint('FAILED TO UPDATE CATALOGUE', _exc)
+
+    def _get_conn(self):
+        """Get connection to the catalogue database.
+
+        If the database fails to open on disk then an in memory database
+        is used, so the catalogue still works for this session.
+
+        Returns:
+            (Connection): database connection
+        """
+        if self._conn is None:
+            try:
+                test_path(os.path.dirname(self.file_))
+                self._conn = sqlite3.connect(
+                    self.file_, timeout=30, check_same_thread=False)
+                _init_db(self._conn)
+            except (sqlite3.Error, OSError) as _exc:
+                lprint('FAILED TO OPEN CATALOGUE', self.file_, _exc)
+                self._conn = sqlite3.connect(
+                    ':memory:', check_same_thread=False)
+                _init_db(self._conn)
+        return self._conn
+
+    def __repr__(self):
+        return '<{}|{}>'.format(type(self).__name__, self.file_)
+
+
+def find_action_records(
+        type_=None, task_filter=None, day_filter=None, max_age=None,
+        after=None, task=None, root=None, filter_=None, version=None,
+        fbx_filter=None, ma_filter=None, name=None, desc=None, force=False,
+        progress=True):
+    """Find action work records in the catalogue.
+
+    Exact matches are applied using the catalogue indexes, and then
+    filters are applied to the matching records' paths.
+
+    Args:
+        type_ (str): filter by type (eg. Vignette, Disposition)
+        task_filter (str): apply filter to work task attribute
+        day_filter (str): filter by day (in %y%m%d format)
+        max_age (float): reject any work files older than is many secs
+        after (str): return works on or after this day (in %y%m%d format)
+        task (str): filter by exact task name
+        root (TTRoot): filter by root
+        filter_ (str): apply filter to work file path
+        version (int): filter by version (v001 are always ingested files)
+        fbx_filter (str): apply filter export fbx path
+        ma_filter (str): filter by vendor ma path
+        name (str): filter by exact name
+        desc (str): filter by exact desc
+        force (bool): update catalogue from disk
+        progress (bool): show progress bar on update
+
+    Returns:
+        (ActionRecord list): matching records
+    """
+    _catalogue = get_catalogue(force=force, progress=progress)
+    _after = None
+    if after:
+        _after = get_time_f(time.strptime(after, '%y%m%d'))
+    _records = _catalogue.find(
+        type_=type_, task=task, root=root.path if root else None,
+        name=name, desc=desc, version=version, day=day_filter,
+        after=_after, max_age=max_age)
+
+    for _filter, _field in [
+            (filter_, 'path'),
+            (task_filter, 'task'),
+            (fbx_filter, 'fbx'),
+            (ma_filter, 'vendor_ma')]:
+        if not _filter:
+            continue
+        _records = [
+            _record for _record in _records
+            if getattr(_record, _field) and
+            passes_filter(getattr(_record, _field), _filter)]
+
+    return _records
+
+
+@store_result
+def get_catalogue(force=False, progress=True):
+    """Get the action work catalogue.
+
+    The catalogue is updated from disk the first time it's accessed in
+    each session, and then each time force is used.
+
+    Args:
+        force (bool): update the catalogue from disk
+        progress (bool): show progress bar on update
+
+    Returns:
+        (ActionCatalogue): catalogue
+    """
+    _catalogue = ActionCatalogue()
+    _catalogue.update(progress=progress)
+    return _catalogue
+
+
+@store_result
+def obtain_work(path):
+    """Obtain work object for the given path.
+
+    Work objects are reused between queries within a session, so that
+    their cached data is preserved.
+
+    Args:
+        path (str): path to work file
+
+    Returns:
+        (FrasierWork): work file
+    """
+    return FrasierWork(path)
+
+
+def _get_dir_mtimes(dir_):
+    """Get mtimes of a work dir and its cache dir.
+
+    Args:
+        dir_ (str): work dir
+
+    Returns:
+        (tuple|None): dir/cache dir mtimes (None if dir missing)
+    """
+    try:
+        _mtime = os.stat(dir_).st_mtime
+    except OSError:
+        return None
+    try:
+        _cache_mtime = os.stat(dir_+'/cache').st_mtime
+    except OSError:
+        _cache_mtime = 0.0
+    return _mtime, _cache_mtime
+
+
+def _init_db(conn):
+    """Create catalogue tables and indexes.
+
+    Args:
+        conn (Connection): database connection
+    """
+    conn.text_factory = str
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS dirs '
+        '(path TEXT PRIMARY KEY, mtime REAL, cache_mtime REAL)')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS works ({}, PRIMARY KEY (path))'.format(
+            ', '.join(ActionRecord._fields)))
+    for _field in _INDEXED + ['dir']:
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS works_{field} '
+            'ON works ({field})'.format(field=_field))
+    conn.commit()
+
+
+def _work_to_record(work):
+    """Build a catalogue record for the given work.
+
+    Args:
+        work (FrasierWork): work to read
+
+    Returns:
+        (ActionRecord): record
+    """
+    try:
+        _vendor_ma = work.get_vendor_file()
+    except CacheMissing:
+        _vendor_ma = None
+    _mtime = _day = _dated_fbx = None
+    if _vendor_ma:
+        _mtime = work.get_mtime()
+        _day = time.strftime('%y%m%d', get_time_t(_mtime))
+        try:
+            _dated_fbx = work.get_export_fbx(dated=True).path
+        except AssertionError:
+            lprint('BAD DELIVERY DIR', _vendor_ma)
+    return ActionRecord(
+        path=work.path, dir=work.dir, root=work.get_root().path,
+        task=work.task, type_=work.type_, name=work.name, desc=work.desc,
+        iter=work.iter, version=work.version, vendor_ma=_vendor_ma,
+        mtime=_mtime, day=_day, fbx=work.get_export_fbx().path,
+        dated_fbx=_dated_fbx)
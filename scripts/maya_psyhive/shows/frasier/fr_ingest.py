@@ -6,15 +6,14 @@ file sequences as blasts, and the exported to fbx in the processed_fbx folder.
 """
 
 import os
-import tempfile
 
 from maya import cmds, mel
 from pymel import core as pm
 
-import psylaunch
-
-from psyhive import icons, qt, host
-from psyhive.utils import find, abs_path, lprint, passes_filter, Seq
+from psyhive import icons, qt, host, farm
+from psyhive.utils import (
+    find, abs_path, lprint, passes_filter, WorkQueue, get_plural,
+    comp_frames, read_frames, FrameWriter)
 
 from maya_psyhive import ref, open_maya as hom, ui
 from maya_psyhive.tools import fkik_switcher
@@ -33,6 +32,7 @@ MOBURN_RIG = ("P:/projects/frasier_38732V/production/kealeye_tools"
               "/MocapTools/Data/CaptureRig/SK_Tier1_Male_CR.ma")
 
 _DIR = abs_path(os.path.dirname(__file__))
+_QUEUE_ROOT = '{}/.ingest_queue'.format(fr_vendor_ma.MOBURN_ROOT)
 CAM_SETTINGS_FMT = abs_path(
     '_fr_{}_cam_{}.preset', root=os.path.dirname(__file__))
 
@@ -269,12 +269,16 @@ def ingest_ma_files_to_pipeline(
         src_dir=('P:/projects/frasier_38732V/production/vendor_in/'
                  'Motion Burner/Delivery_2020-02-12'),
         ma_filter='', work_filter='', replace=False, blast_=False,
-        legs_to_ik=False, reverse=False, limit=0, verbose=0):
+        legs_to_ik=False, limit=0, farm_workers=0, verbose=0):
     """Copy ma file from vendors_in to psyop pipeline.
 
     This creates a work file for each ma file and  also generates face/body
     blasts.
 
+    The files are processed from a shared work queue, so this can be run
+    in several maya sessions at once (or on the farm) and each file will
+    only be ingested once.
+
     Args:
         src_dir (str): vendor in directory to search for ma files
         ma_filter (str): apply filter to ma file path
@@ -282,8 +286,9 @@ def ingest_ma_files_to_pipeline(
         replace (bool): overwrite existing files
         blast_ (bool): execute blasts
         legs_to_ik (bool): execute legs ik switch (slow)
-        reverse (bool): reverse the list (for parallel processing)
         limit (int): limit the number of files to be processed
+        farm_workers (int): submit this many farm tasks to process the
+            queue rather than processing it in this session
         verbose (int): print process data
     """
     _src_dir = abs_path(src_dir)
@@ -295,6 +300,7 @@ def ingest_ma_files_to_pipeline(
     _to_process = []
     _overwrites = []
     _replacing = []
+    _missing_outputs = []
     for _idx, _ma in qt.progress_bar(
             enumerate(_mas), 'Checking {:d} ma files'):
         lprint(
@@ -320,6 +326,8 @@ def ingest_ma_files_to_pipeline(
                 print ' - NO PROCESSING NEEDED'
                 print
                 continue
+        if _is_missing_outputs(_work, blast_=blast_):
+            _missing_outputs.append(_ma)
 
         _to_process.append([_ma, _work])
 
@@ -336,16 +344,127 @@ def ingest_ma_files_to_pipeline(
     if _overwrites:
         _remove_existing_data(_overwrites)
 
+    # Clear files which are being overwritten or whose outputs have been
+    # removed from the queue's done list, so they are ingested again
+    _queue = _get_ingest_queue(blast_=blast_, legs_to_ik=legs_to_ik)
+    _queue.reset(
+        [_ma.path for _ma, _ in _overwrites] +
+        [_ma.path for _ma in _missing_outputs], leases=False)
+
     # Execute the ingestion
     if not _to_process:
         return
-    qt.ok_cancel('Ingest {:d} files?'.format(len(_to_process)), icon=ICON)
-    if reverse:
-        _to_process = reversed(_to_process)
-    for _ma, _work in qt.progress_bar(
-            _to_process, 'Ingesting {:d} ma{}', col='LightSkyBlue'):
-        _ingest_vendor_ma(ma_=_ma, work=_work, blast_=blast_,
-                          legs_to_ik=legs_to_ik)
+    _paths = [_ma.path for _ma, _ in _to_process]
+    if farm_workers:
+        qt.ok_cancel(
+            'Submit {:d} files to {:d} farm worker{}?'.format(
+                len(_paths), farm_workers, get_plural(range(farm_workers))),
+            icon=ICON)
+        _submit_ingest_workers(
+            paths=_paths, blast_=blast_, legs_to_ik=legs_to_ik,
+            workers=farm_workers)
+        return
+    qt.ok_cancel('Ingest {:d} files?'.format(len(_paths)), icon=ICON)
+    run_ingest_queue(_paths, blast_=blast_, legs_to_ik=legs_to_ik)
+
+
+def _is_missing_outputs(work, blast_):
+    """Test whether a work is missing any of its ingestion outputs.
+
+    Args:
+        work (FrasierWork): work to check
+        blast_ (bool): whether blast comp is required
+
+    Returns:
+        (bool): whether the work or any required outputs are missing
+    """
+    if not work.exists():
+        return True
+    if blast_ and not work.blast_comp.exists():
+        return True
+    return not (
+        work.get_export_fbx().exists() and
+        work.get_export_fbx(dated=True).exists())
+
+
+def _get_ingest_queue(blast_, legs_to_ik):
+    """Get work queue for ingesting vendor ma files.
+
+    Each combination of options has its own queue, so that a file which
+    was ingested without blasts is not skipped when blasts are requested.
+
+    Args:
+        blast_ (bool): execute blasts
+        legs_to_ik (bool): execute legs ik switch
+
+    Returns:
+        (WorkQueue): work queue
+    """
+    return WorkQueue('{}/blast{:d}_ik{:d}'.format(
+        _QUEUE_ROOT, blast_, legs_to_ik))
+
+
+def run_ingest_queue(paths, blast_, legs_to_ik, progress=True):
+    """Ingest vendor ma files from the shared work queue.
+
+    Each file is claimed before it is processed, so files which are done
+    or being processed by another worker are skipped. If this worker
+    errors or is killed, its claim is released or expires, and the file
+    can be picked up by another worker.
+
+    Args:
+        paths (str list): paths to vendor ma files
+        blast_ (bool): execute blasts
+        legs_to_ik (bool): execute legs ik switch (slow)
+        progress (bool): show progress bar
+    """
+    _queue = _get_ingest_queue(blast_=blast_, legs_to_ik=legs_to_ik)
+    _paths = paths
+    if progress:
+        _paths = qt.progress_bar(
+            paths, 'Ingesting {:d} ma{}', col='LightSkyBlue')
+    for _idx, _path in enumerate(_paths):
+        _lease = _queue.claim(_path)
+        if not _lease:
+            print '[{:d}/{:d}] SKIPPING {} (DONE OR CLAIMED)'.format(
+                _idx+1, len(paths), _path)
+            continue
+        print '[{:d}/{:d}] CLAIMED {}'.format(_idx+1, len(paths), _path)
+        with _lease:
+            _ma = fr_vendor_ma.FrasierVendorMa(_path)
+            _ingest_vendor_ma(ma_=_ma, work=_ma.get_work(), blast_=blast_,
+                              legs_to_ik=legs_to_ik)
+        print '[{:d}/{:d}] COMPLETED {}'.format(_idx+1, len(paths), _path)
+
+    _done, _leased, _pending = _queue.get_status(paths)
+    print 'QUEUE {:d} DONE, {:d} IN PROGRESS, {:d} PENDING'.format(
+        len(_done), len(_leased), len(_pending))
+
+
+def _submit_ingest_workers(paths, blast_, legs_to_ik, workers):
+    """Submit farm tasks to process the ingestion queue.
+
+    Each task works through the whole queue, claiming files which have
+    not been claimed by other tasks.
+
+    Args:
+        paths (str list): paths to vendor ma files
+        blast_ (bool): execute blasts
+        legs_to_ik (bool): execute legs ik switch (slow)
+        workers (int): number of tasks to submit
+    """
+    _py = '\n'.join([
+        'from maya_psyhive.shows.frasier import fr_ingest',
+        'fr_ingest.run_ingest_queue(',
+        '    paths={paths!r}, blast_={blast_!r},',
+        '    legs_to_ik={legs_to_ik!r}, progress=False)',
+    ]).format(paths=paths, blast_=blast_, legs_to_ik=legs_to_ik)
+    _job = farm.MayaPyJob('Ingest {:d} ma{}'.format(
+        len(paths), get_plural(paths)))
+    for _idx in range(workers):
+        _job.tasks.append(farm.MayaPyTask(
+            _py, label='Ingest worker {:d}'.format(_idx+1)))
+    _job.submit()
 
 
 def _remove_existing_data(overwrites):
@@ -524,55 +643,20 @@ def _build_blast_cam():
     return _cam
 
 
-def _get_ref_jpgs(mov, start, secs):
-    """Get reference mov jpg sequence.
-
-    If no reference mov was found, None is returns. Otherwise, the
-    section of the reference mov relating to this work (based on
-    ref_movs.data spreadsheet) is baked out to a tmp jpg sequence.
-
-    Args:
-        mov (str): path to mov to extract
-        start (float): start seconds
-        secs (float): duration of section to bake
-
-    Returns:
-        (Seq|None): tmp reference jpgs (if any)
-    """
-    print ' - MOV', start, mov
-
-    # Prepare tmp seq
-    _ref_tmp_jpgs = Seq(abs_path('{}/ref_tmp/images.%04d.jpg'.format(
-        tempfile.gettempdir())))
-    _ref_tmp_jpgs.test_dir()
-    _ref_tmp_jpgs.delete(force=True)
-
-    # Run ffmpeg
-    _args = [
-        '-i', mov,
-        '-vf', "fps=30,select='between(t,{:.02f},{:.02f})'".format(
-            start, start+secs),
-        '-vsync', '0', _ref_tmp_jpgs.path,
-    ]
-    print 'launch ffmpeg --', ' '.join(_args)
-    psylaunch.launch_app('ffmpeg', args=_args, wait=True)
-    print ' - WROTE TO', _ref_tmp_jpgs.path
-    print ' - REF JPGS {} {}'.format(
-        _ref_tmp_jpgs.find_range(force=True), _ref_tmp_jpgs.path)
-
-    return _ref_tmp_jpgs
-
-
 def _generate_blast_comp_mov(
-        work, ref_imgs=True, comp_imgs=True, margin=20, thumb_aspect=0.75):
+        work, ref_imgs=True, margin=20, thumb_aspect=0.75, threads=None):
     """Generate blast comp mov file for the given work.
 
+    The blast, face blast and reference mov are decoded by ffmpeg, comped
+    on a thread pool and piped straight into an ffmpeg encode process,
+    so no tmp images are written.
+
     Args:
         work (FrasierWork): work file to comp images for
-        ref_imgs (bool): generate ref jpgs (disable for debugging)
-        comp_imgs (bool): generate comp jpgs (disable for debugging)
+        ref_imgs (bool): include reference mov (disable for debugging)
         margin (int): face ref/blast overlay margin in pixels
         thumb_aspect (float): aspect ration of face ref/blast overlay
+        threads (int): override number of comp threads
     """
     print 'WORK', work.path
 
@@ -581,74 +665,57 @@ def _generate_blast_comp_mov(
     assert not work.blast_comp.exists()
 
     _start, _end = work.blast.find_range()
-    _dur_secs = 1.0*(_end - _start + 1)/30
+    _count = _end - _start + 1
+    _dur_secs = 1.0*_count/30
 
     print ' - BLAST COMP', work.blast_comp.path
     print ' - RANGE {:d}-{:d} ({:.02f}s)'.format(_start, _end, _dur_secs)
 
-    # Generate tmp ref jpgs
+    # Get sizes
+    _size = qt.HPixmap(work.blast[_start]).size()
+    _size = _size.width(), _size.height()
+    _thumb_w = int((1.0*_size[0]/3 - margin*3)/2)
+    _thumb_size = _thumb_w, int(_thumb_w/thumb_aspect)
+
+    # Set up inputs
+    _inputs = [
+        read_frames(
+            work.blast.path, size=_size, frames=_count,
+            input_args=['-start_number', str(_start)]),
+        read_frames(
+            work.face_blast.path, size=_thumb_size, frames=_count,
+            filters=['crop=ih*{}:ih'.format(thumb_aspect)],
+            input_args=['-start_number', str(_start)])]
     if ref_imgs and work.get_ref_mov():
-        _mov, _start = work.get_ref_data()
-        _ref_tmp_jpgs = _get_ref_jpgs(mov=_mov, start=_start, secs=_dur_secs)
-    else:
-        _ref_tmp_jpgs = Seq(abs_path('{}/ref_tmp/images.%04d.jpg'.format(
-            tempfile.gettempdir())))
-        _ref_tmp_jpgs.delete(force=True)
-    print ' - REF JPG', _ref_tmp_jpgs
-
-    # Build comp jpgs
-    _comp_tmp_jpgs = Seq(abs_path('{}/comp_tmp/images.%04d.jpg'.format(
-        tempfile.gettempdir())))
-    if comp_imgs:
-
-        _comp_tmp_jpgs.test_dir()
-        _comp_tmp_jpgs.delete(force=True)
-
-        for _idx, _src_frame in qt.progress_bar(
-                enumerate(work.blast.get_frames()),
-                'Comping {:d} images', stack_key='FrasierBlastComp',
-                col='GreenYellow'):
-
-            _out = qt.HPixmap(work.blast[_src_frame])
-            _face = qt.HPixmap(work.face_blast[_src_frame])
-            _thumb_w = (1.0*_out.width()/3 - margin*3)/2
-            _thumb_size = qt.get_size(_thumb_w, _thumb_w/thumb_aspect)
-
-            # Add ref overlay
-            if _ref_tmp_jpgs:
-                _ref = qt.HPixmap(_ref_tmp_jpgs[_idx+1])
-                _ref = _ref.resize(_thumb_size)
-                _out.add_overlay(_ref, pos=(_out.width()*2/3 + margin, margin))
-
-            # Add face blast overlay
-            _face_size = qt.get_size(
-                _face.height()*thumb_aspect, _face.height())
-            _face = _face.copy(
-                _face.width()/2 - _face_size.width()/2, 0,
-                _face_size.width(), _face_size.height())
-            _face = _face.resize(_thumb_size)
-            _out.add_overlay(
-                _face, pos=(_out.width()-margin, margin), anchor="TR")
-
-            _out.save(_comp_tmp_jpgs[_idx+1])
-        print ' - WROTE TMP IMAGES', _comp_tmp_jpgs.path
-    print ' - COMP IMAGES {} {}'.format(
-        _comp_tmp_jpgs.find_range(force=True), _comp_tmp_jpgs.path)
-
-    # Compile out mov
+        _mov, _mov_start = work.get_ref_data()
+        print ' - MOV', _mov_start, _mov
+        _inputs.append(read_frames(
+            _mov, size=_thumb_size, filters=['fps=30'], frames=_count,
+            input_args=['-ss', '{:.02f}'.format(_mov_start),
+                        '-t', '{:.02f}'.format(_dur_secs)]))
+
+    def _comp(out, face, ref=None):
+        if ref:
+            out.paste(ref, pos=(_size[0]*2/3 + margin, margin))
+        if face:
+            out.paste(face, pos=(_size[0]-margin, margin), anchor='TR')
+        return out
+
+    # Stream comp to mov
     work.blast_comp.test_dir()
-    _args = [
-        '-r', '30',
-        '-f', 'image2',
-        '-i', _comp_tmp_jpgs.path,
-        '-vcodec', 'libx264',
-        '-crf', '25',
-        '-pix_fmt', 'yuv420p',
-        work.blast_comp.path]
-    print 'launch ffmpeg --', ' '.join(_args)
-    psylaunch.launch_app('ffmpeg', args=_args, wait=True)
+    _frames = comp_frames(_comp, _inputs, threads=threads)
+    with FrameWriter(
+            work.blast_comp.path, size=_size, fps=30) as _writer:
+        for _ in qt.progress_bar(
+                range(len(work.blast.get_frames())),
+                'Comping {:d} image{}', stack_key='FrasierBlastComp',
+                col='GreenYellow'):
+            _frame = next(_frames, None)
+            if not _frame:
+                break
+            _writer.write(_frame)
     assert work.blast_comp.exists()
-    print ' - WROTE MOV', work.blast_comp.path
+    print ' - WROTE MOV', work.blast_comp.path, _writer.frames
 
 
 def _generate_fbx(work, load_scene=True, lazy=True, force=False):
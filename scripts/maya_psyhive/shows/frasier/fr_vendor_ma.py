@@ -5,7 +5,7 @@ import time
 from psyhive import host, tk2
 from psyhive.utils import (
     File, Dir, lprint, CacheMissing, get_result_to_file_storer,
-    get_time_f)
+    get_time_f, MaFile)
 
 _LINT_TAG = tk2  # Keep pylint happy - prevent import outside psyop
 MOBURN_ROOT = 'P:/projects/frasier_38732V/production/vendor_in/Motion Burner'
@@ -99,12 +99,19 @@ class FrasierVendorMa(File):
     def get_range(self, force=False):
         """Get frame range of this ma file.
 
+        The range is read from the playback options in the file without
+        opening it. If they can't be found, the scene is opened (only if
+        force is used).
+
         Args:
             force (bool): force reread data
 
         Returns:
             (tuple): start/end frames
         """
+        _rng = MaFile(self.path).read_range()
+        if _rng:
+            return tuple([float(_frame) for _frame in _rng])
         if not force:
             raise CacheMissing(self.path)
         if not host.cur_scene() == self.path:
@@ -4,7 +4,6 @@ These are work files with added naming conventions to accomodate
 for additional data required to be stored.
 """
 
-import operator
 import os
 import shutil
 import time
@@ -15,9 +14,8 @@ import six
 
 from psyhive import host, tk2, qt
 from psyhive.utils import (
-    File, abs_path, Dir, CacheMissing, store_result,
-    apply_filter, get_time_f, get_time_t, store_result_on_obj,
-    lprint, passes_filter, store_result_to_file)
+    File, abs_path, Dir, CacheMissing, store_result, get_time_t,
+    store_result_on_obj, lprint, store_result_to_file)
 
 from . import fr_tools, fr_vendor_ma
 
@@ -391,6 +389,10 @@ def find_action_works(
         progress=True):
     """Find action work files in frasier project.
 
+    Works are read from the persistent action work catalogue (see
+    fr_catalogue), which is updated from disk on first use in each
+    session and when force is used.
+
     Args:
         type_ (str): filter by type (eg. Vignette, Disposition)
         task_filter (str): apply filter to work task attribute
@@ -405,80 +407,20 @@ def find_action_works(
         ma_filter (str): filter by vendor ma path
         name (str): filter by exact name
         desc (str): filter by exact desc
-        force (bool): force reread actions from disk
+        force (bool): update catalogue from disk
         progress (bool): show progress bar on read
 
     Returns:
         (FrasierWork list): list of work files
     """
-    _works = _read_action_works(force=force, progress=progress)
-
-    # Filters
-    if filter_:
-        _works = apply_filter(
-            _works, filter_, key=operator.attrgetter('path'))
-    if task_filter:
-        _works = apply_filter(
-            _works, task_filter, key=operator.attrgetter('task'))
-    if fbx_filter:
-        _works = [_work for _work in _works
-                  if passes_filter(_work.get_export_fbx().path, fbx_filter)]
-    if ma_filter:
-        _works = [_work for _work in _works
-                  if _work.get_mtime() and
-                  passes_filter(_work.get_vendor_file(), ma_filter)]
-
-    # Match attr
-    if task:
-        _works = [_work for _work in _works if _work.task == task]
-    if type_:
-        _works = [_work for _work in _works if _work.type_ == type_]
-    if root:
-        _works = [_work for _work in _works if _work.get_root() == root]
-    if name:
-        _works = [_work for _work in _works if _work.name == name]
-    if desc:
-        _works = [_work for _work in _works if _work.desc == desc]
-    if version:
-        _works = [_work for _work in _works if _work.version == version]
-
-    # Date match
-    if max_age is not None:
-        _works = [_work for _work in _works if _work.get_age() < max_age]
-
-    if day_filter:
-        _works = [_work for _work in _works
-                  if _work.get_mtime() and
-                  _work.get_mtime_fmt('%y%m%d') == day_filter]
-    if after:
-        _cutoff = get_time_f(time.strptime(after, '%y%m%d'))
-        _works = [_work for _work in _works
-                  if _work.get_mtime() and
-                  _work.get_mtime() >= _cutoff]
-
-    return _works
-
-
-@store_result
-def _read_action_works(force=False, progress=True):
-    """Read action work files from disk.
-
-    Args:
-        force (bool): force reread from disk
-        progress (bool): show progress bar on read
-
-    Returns:
-        (FrasierWork list): list of all frasier work files
-    """
-    _works = []
-    for _asset in qt.progress_bar(
-            ASSETS.values(), 'Checking {:d} asset{}', show=progress):
-        _anim = _asset.find_step_root('animation', catch=True)
-        if not _anim:
-            continue
-        for _work in _anim.find_work(class_=FrasierWork, dcc='maya'):
-            _works.append(_work)
-    return _works
+    from . import fr_catalogue
+    _records = fr_catalogue.find_action_records(
+        type_=type_, task_filter=task_filter, day_filter=day_filter,
+        max_age=max_age, after=after, task=task, root=root,
+        filter_=filter_, version=version, fbx_filter=fbx_filter,
+        ma_filter=ma_filter, name=name, desc=desc, force=force,
+        progress=progress)
+    return [fr_catalogue.obtain_work(_record.path) for _record in _records]
 
 
 @store_result
@@ -11,7 +11,7 @@ import psylaunch
 
 from psyhive import icons, py_gui, qt, host
 from psyhive.utils import (
-    CacheMissing, find, store_result, File, get_single, abs_path, copy_text,
+    find, store_result, File, get_single, abs_path, copy_text,
     Cacheable, build_cache_fmt, get_path, dprint, Dir)
 
 from maya_psyhive import ref
@@ -19,9 +19,9 @@ from maya_psyhive.tools import fkik_switcher
 from maya_psyhive.shows import vampirebloodline
 from maya_psyhive.utils import restore_sel
 
-from . import fr_action_browser, fr_tools, fr_ingest, fr_scale_anim
+from . import (
+    fr_action_browser, fr_catalogue, fr_tools, fr_ingest, fr_scale_anim)
 from .fr_vendor_ma import FrasierVendorMa
-from .fr_work import find_action_works
 from .fr_ingest import ingest_ma_files_to_pipeline
 
 ICON = icons.EMOJI.find('Brain')
@@ -83,7 +83,7 @@ py_gui.set_section('Batch ingestion')
         default_dir=_INGEST_ROOT, mode='SingleDirExisting')})
 def ingest_ma_files_to_pipeline_(
         src_dir, ma_filter='', replace=False, blast_=True, legs_to_ik=False,
-        verbose=0):
+        farm_workers=0, verbose=0):
     """Copy ma file from vendors_in to psyop pipeline.
 
     This creates a work file for each ma file and  also generates face/body
@@ -95,6 +95,8 @@ def ingest_ma_files_to_pipeline_(
         replace (bool): overwrite existing files
         blast_ (bool): execute blasts
         legs_to_ik (bool): execute legs ik switch (slow)
+        farm_workers (int): submit this many farm tasks to process the
+            files rather than processing them in this session
         verbose (int): print process data
     """
     ingest_ma_files_to_pipeline(**locals())
@@ -147,44 +149,41 @@ def search_ingested_files(
         format_ (str): what data to print out
         refresh (bool): reread actions from disk
     """
-    _works = []
-    for _work in find_action_works(
+    _records = []
+    for _record in fr_catalogue.find_action_records(
             type_=None if type_ == 'Any' else type_, day_filter=day,
             fbx_filter=fbx_filter, ma_filter=ma_filter, version=1,
             force=refresh):
-        try:
-            _work.get_vendor_file()
-        except CacheMissing:
-            print '- MISSING VENDOR FILE', _work.path
+        if not _record.vendor_ma:
+            print '- MISSING VENDOR FILE', _record.path
             continue
-        _works.append(_work)
+        _records.append(_record)
 
     print
 
     if format_ == 'Vendor MA':
-        _works.sort(key=operator.methodcaller('get_vendor_file'))
+        _records.sort(key=operator.attrgetter('vendor_ma'))
     elif format_ == 'FBX (dated)':
-        _sort = lambda work: work.get_export_fbx(dated=True)
-        _works.sort(key=_sort)
+        _records.sort(key=operator.attrgetter('dated_fbx'))
 
-    for _idx, _work in enumerate(_works):
+    for _idx, _record in enumerate(_records):
 
-        _prefix = '[{:d}/{:d}]'.format(_idx+1, len(_works))
+        _prefix = '[{:d}/{:d}]'.format(_idx+1, len(_records))
 
         if format_ == 'FBX (dated)':
-            print _prefix, _work.get_export_fbx(dated=True).path
+            print _prefix, _record.dated_fbx
 
         elif format_ == 'FBX':
-            print _prefix, _work.get_export_fbx().path
+            print _prefix, _record.fbx
 
         elif format_ == 'Vendor MA':
-            print _prefix, _work.get_vendor_file()
+            print _prefix, _record.vendor_ma
 
         elif format_ == 'Full':
-            print _prefix, _work.get_export_fbx().basename
-            print ' - MA', _work.get_vendor_file()
-            print ' - WORK', _work.path
-            print ' - FBX', _work.get_export_fbx().path
+            print _prefix, File(_record.fbx).basename
+            print ' - MA', _record.vendor_ma
+            print ' - WORK', _record.path
+            print ' - FBX', _record.fbx
             print
 
         else:
@@ -1,6 +1,5 @@
 """Tools to be run on maya startup."""
 
-import operator
 import logging
 import tempfile
 
@@ -10,8 +9,8 @@ from psyhive import icons, refresh, qt, py_gui
 from psyhive.qt import QtGui
 from psyhive.tools import track_usage
 from psyhive.utils import (
-    dprint, wrap_fn, get_single, lprint, File, str_to_seed, PyFile,
-    to_nice, store_result, ValueRange, Dir)
+    dprint, wrap_fn, get_single, lprint, File, str_to_seed, to_nice,
+    store_result, ValueRange, find_toolkits)
 
 from maya_psyhive import ui, shows
 from maya_psyhive.tools import fkik_switcher
@@ -302,56 +301,50 @@ def _ph_add_show_toolkits(parent, verbose=0):
 
     _shows_dir = File(shows.__file__).parent()
 
-    # Get list of toolkits
-    _toolkits = []
-    for _py in _shows_dir.find(extn='py', depth=1, type_='f'):
-        _file = PyFile(_py)
-        if _file.basename.startswith('_'):
-            continue
-        try:
-            _mod = _file.get_module(catch=True)
-        except ImportError:
-            continue
-        if not _mod:
-            continue
-        _toolkits.append((_file, _file.basename))
-    for _dir in _shows_dir.find(depth=1, type_='d'):
-        _toolkit = PyFile('{}/toolkit.py'.format(_dir))
-        if Dir(_dir).filename.startswith('_'):
-            continue
-        lprint(' - ADDING DIR', _dir, verbose=verbose)
-        try:
-            _mod = _toolkit.get_module(catch=True)
-        except ImportError:
-            continue
-        if not _mod:
-            continue
-        _name = _toolkit.parent().filename
-        _toolkits.append((_toolkit, _name))
-    _toolkits.sort(key=operator.itemgetter(1))
-    lprint('FOUND TOOLKITS', verbose=verbose)
-
-    # Build show toolkit buttons
-    for _toolkit, _name in _toolkits:
-        lprint(' - ADDING TOOLKIT', _name, verbose=verbose)
-        _mod = _toolkit.get_module()
-        _rand = str_to_seed(_name)
-        _icon = getattr(_mod, 'ICON', _rand.choice(icons.ANIMALS))
-        _label = getattr(_mod, 'LABEL', to_nice(_name))
-        _title = '{} tools'.format(_label)
-        _cmd = '\n'.join([
+    # Build show toolkit buttons - toolkits are read without importing
+    # them, and are only imported when they are first used
+    for _toolkit in find_toolkits(_shows_dir.path, verbose=verbose):
+        lprint(' - ADDING TOOLKIT', _toolkit.name, verbose=verbose)
+        _icon = _toolkit.get_icon()
+        _cmd_fmt = '\n'.join([
             'import {py_gui} as py_gui',
             '_path = "{file}"',
             '_title = "{title}"',
             'py_gui.MayaPyGui(_path, title=_title, all_defs=True)',
-        ]).format(py_gui=py_gui.__name__, file=_toolkit.path, title=_title)
-        cmds.menuItem(command=_cmd, image=_icon, label=_label, parent=_shows)
-
-        _btn_label = getattr(_mod, 'BUTTON_LABEL', _label)
+        ])
+        _cmd = _cmd_fmt.format(
+            py_gui=py_gui.__name__, file=_toolkit.path, title=_toolkit.title)
+        cmds.menuItem(command=_cmd, image=_icon, label=_toolkit.label,
+                      parent=_shows)
+
+        _btn_cmd = _cmd_fmt.format(
+            py_gui=py_gui.__name__, file=_toolkit.path, title=_toolkit.label)
         _btn = _add_psyhive_btn(
-            label=_btn_label, cmd=None, icon=_icon, tooltip=_title)
-        py_gui.MayaPyShelfButton(mod=_mod, parent='PsyHive', image=_icon,
-                                 label=_label, button=_btn)
+            label=_toolkit.button_label, cmd=_btn_cmd, icon=_icon,
+            tooltip=_toolkit.title)
+        _menu = cmds.popupMenu(parent=_btn, button=3)
+        cmds.popupMenu(
+            _menu, edit=True, postMenuCommandOnce=True,
+            postMenuCommand=wrap_fn(
+                _build_toolkit_shelf_menu, toolkit=_toolkit, menu=_menu,
+                button=_btn))
+
+
+def _build_toolkit_shelf_menu(toolkit, menu, button):
+    """Build right-click options for a toolkit shelf button.
+
+    This is executed the first time the menu is shown, so that the
+    toolkit is only imported when it is needed.
+
+    Args:
+        toolkit (ToolkitInfo): toolkit to build options for
+        menu (str): button popup menu
+        button (str): shelf button
+    """
+    cmds.setParent(menu, menu=True)
+    py_gui.MayaPyShelfButton(
+        mod=toolkit.get_module(), parent='PsyHive', image=toolkit.get_icon(),
+        label=toolkit.label, button=button)
 
 
 def _ph_add_shader_bro(menu):
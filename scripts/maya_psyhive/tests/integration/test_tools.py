@@ -1,6 +1,11 @@
 import os
+import shutil
+import sys
+import tempfile
 import unittest
 
+import numpy
+
 from maya import cmds
 from pymel.core import nodetypes as nt
 
@@ -13,6 +18,37 @@ from maya_psyhive.tools import (
     fkik_switcher, batch_cache, restore_img_plane, shader_bro)
 from maya_psyhive.tools.batch_cache.tmpl_cache import CTTShotRoot
 from maya_psyhive.tools.m_batch_rerender import rerender
+from maya_psyhive.tools.oculus_quest import map_comp, texture_convert
+
+_IMAGES = {}
+
+
+class _ArrayReader(object):
+    """Reads synthetic images from memory."""
+
+    def __init__(self, path):
+        self.pixels = _IMAGES[path]
+        self.height, self.width = self.pixels.shape[:2]
+
+    def read_rows(self, ybegin, yend):
+        return self.pixels[ybegin:yend]
+
+    def close(self):
+        pass
+
+
+class _ArrayWriter(object):
+    """Writes synthetic images to memory."""
+
+    def __init__(self, path, width, height):
+        self.pixels = _IMAGES[path] = numpy.zeros(
+            (height, width, 3), dtype=numpy.uint8)
+
+    def write_rows(self, ybegin, pixels):
+        self.pixels[ybegin:ybegin+len(pixels)] = pixels
+
+    def close(self):
+        pass
 
 _DEV_PROJ = pipe.find_project('hvanderbeek_0001P')
 _RIG_PATH = (
@@ -88,6 +124,59 @@ class TestTools(unittest.TestCase):
         _dialog = remove_rigs.launch([_ref], exec_=False)
         _dialog.close()
 
+    def test_oculus_quest_map_comp(self):
+
+        _IMAGES['diff'] = numpy.full((5, 4, 3), 0.25, dtype=numpy.float32)
+        _IMAGES['diff'][3:] = 2.0
+        _IMAGES['refl'] = numpy.full((5, 4, 3), 0.5, dtype=numpy.float32)
+        _outs = map_comp.composite_maps(
+            [['diff', 'refl', 'comp_a'], ['diff', 'diff', 'comp_b']],
+            reflection_mix=0.5, tile_rows=2, reader=_ArrayReader,
+            writer=_ArrayWriter, threads=2)
+        assert _outs == ['comp_a', 'comp_b']
+        _gamma = 1.0/(map_comp.COMP_GAMMA*map_comp.OUTPUT_GAMMA)
+        assert (_IMAGES['comp_a'][:3] == round(0.5**_gamma*255)).all()
+        assert (_IMAGES['comp_b'][:3] == round(0.375**_gamma*255)).all()
+        assert (_IMAGES['comp_a'][3:] == 255).all()
+
+    def test_oculus_quest_mipmap_scheduler(self):
+
+        _dir = '{}/psyhive/testing/mipmap'.format(tempfile.gettempdir())
+        if os.path.exists(_dir):
+            shutil.rmtree(_dir)
+        os.makedirs(_dir)
+        for _name, _data in [('a', 'AAA'), ('b', 'BBB'), ('c', 'AAA')]:
+            with open('{}/{}.png'.format(_dir, _name), 'w') as _file:
+                _file.write(_data)
+        _cmd = [sys.executable, '-c', 'import shutil, sys; '
+                'shutil.copy(sys.argv[1], sys.argv[2])',
+                '{input}', '{output}']
+
+        def _run(**kwargs):
+            _scheduler = texture_convert.MipmapScheduler(
+                converter=texture_convert.CommandConverter(_cmd),
+                threads=2, **kwargs)
+            for _name in 'abc':
+                _scheduler.add('{}/{}.png'.format(_dir, _name),
+                               '{}/{}.tif'.format(_dir, _name), 'sRGB')
+            return [os.path.basename(_path)
+                    for _path in _scheduler.run(progress=False)]
+
+        # Test convert and skip up to date textures
+        assert _run() == ['a.tif', 'b.tif', 'c.tif']
+        assert open(_dir+'/c.tif').read() == 'AAA'
+        assert _run() == []
+        shutil.copy(_dir+'/a.png', _dir+'/tmp.png')
+        shutil.move(_dir+'/tmp.png', _dir+'/a.png')
+        assert _run() == []
+        assert _run(force=True) == ['a.tif', 'b.tif', 'c.tif']
+
+        # Test changed content
+        with open(_dir+'/b.png', 'w') as _file:
+            _file.write('NEW')
+        assert _run() == ['b.tif']
+        assert open(_dir+'/b.tif').read() == 'NEW'
+
     @revert_dev_mode
     @use_tmp_ns
     def test_restore_image_plane(self):
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from psyhive.utils import touch
+from maya_psyhive.shows.frasier import fr_catalogue
+
+_TEST_DIR = '{}/psyhive/testing'.format(tempfile.gettempdir())
+
+
+def _build_record(dir_, name, type_='Vignette', version=1, mtime=None):
+    _path = '{}/{}_v{:03d}.ma'.format(dir_, name, version)
+    _day = time.strftime('%y%m%d', time.localtime(mtime)) if mtime else None
+    return fr_catalogue.ActionRecord(
+        path=_path, dir=dir_, root=os.path.dirname(dir_), task='animation',
+        type_=type_, name=name, desc='desc', iter=1, version=version,
+        vendor_ma=_path.replace('.ma', '_vendor.ma') if mtime else None,
+        mtime=mtime, day=_day, fbx=_path.replace('.ma', '.fbx'),
+        dated_fbx=None)
+
+
+class TestFrasier(unittest.TestCase):
+
+    def test_action_catalogue(self):
+
+        _dir = '{}/fr_catalogue'.format(_TEST_DIR)
+        if os.path.exists(_dir):
+            shutil.rmtree(_dir)
+        _catalogue = fr_catalogue.ActionCatalogue(
+            file_=_dir+'/catalogue.db', min_age=60)
+
+        _now = time.time()
+        _old = _now - 10*24*60*60
+        _dir_a, _dir_b = _dir+'/assetA/work', _dir+'/assetB/work'
+        _rec_a1 = _build_record(_dir_a, 'Run', mtime=_old)
+        _rec_a2 = _build_record(_dir_a, 'Jump', type_='Disposition',
+                                mtime=_now-60)
+        _rec_b1 = _build_record(_dir_b, 'Run', version=2, mtime=_now-60)
+        _rec_b2 = _build_record(_dir_b, 'Walk')
+        _catalogue._write_dir(_dir_a, [_rec_a1, _rec_a2], (_old, 0.0))
+        _catalogue._write_dir(_dir_b, [_rec_b1, _rec_b2], (_now, _now))
+
+        # Check indexed matching
+        assert _catalogue.find() == [_rec_a2, _rec_a1, _rec_b1, _rec_b2]
+        assert _catalogue.find(type_='Disposition') == [_rec_a2]
+        assert _catalogue.find(name='Run') == [_rec_a1, _rec_b1]
+        assert _catalogue.find(name='Run', version=2) == [_rec_b1]
+        assert _catalogue.find(root=_dir+'/assetB') == [_rec_b1, _rec_b2]
+        assert _catalogue.find(day=_rec_a1.day) == [_rec_a1]
+        assert not _catalogue.find(name='Missing')
+
+        # Check delivery time matching
+        assert _catalogue.find(after=_now-3600) == [_rec_a2, _rec_b1]
+        assert _catalogue.find(max_age=3600) == [_rec_a2, _rec_b1]
+        assert _catalogue.find(after=_old, max_age=30) == []
+        assert _catalogue.find(type_='Vignette', after=_old) == [
+            _rec_a1, _rec_b1]
+
+        # Check recently modified dirs aren't stored
+        _dirs = dict([
+            (_path, (_mtime, _cache_mtime))
+            for _path, _mtime, _cache_mtime in _catalogue._get_conn().execute(
+                'SELECT path, mtime, cache_mtime FROM dirs')])
+        assert _dirs == {_dir_a: (_old, 0.0)}
+
+        # Check dir records are replaced
+        _rec_a3 = _build_record(_dir_a, 'Run', version=2, mtime=_old)
+        _catalogue._write_dir(_dir_a, [_rec_a3], (_now, 0.0))
+        assert _catalogue.find(name='Run') == [_rec_a3, _rec_b1]
+        assert _catalogue.find(type_='Disposition') == []
+        assert not _catalogue._get_conn().execute(
+            'SELECT path FROM dirs').fetchall()
+        _catalogue._write_dir(_dir_b, [], None)
+        assert _catalogue.find() == [_rec_a3]
+
+        # Check reading dir mtimes
+        assert fr_catalogue._get_dir_mtimes(_dir+'/missing') is None
+        touch(_dir_a+'/test.ma')
+        _mtime, _cache_mtime = fr_catalogue._get_dir_mtimes(_dir_a)
+        assert _mtime == os.path.getmtime(_dir_a)
+        assert _cache_mtime == 0.0
+        touch(_dir_a+'/cache/test.abc')
+        assert fr_catalogue._get_dir_mtimes(_dir_a) == (
+            os.path.getmtime(_dir_a), os.path.getmtime(_dir_a+'/cache'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,7 @@ import tank
 from psyhive import tk, qt, pipe
 from psyhive.utils import (
     get_result_to_file_storer, Cacheable, lprint,
-    store_result_on_obj, store_result, dprint, abs_path)
+    store_result_on_obj, store_result, dprint, abs_path, MaFile)
 from maya_psyhive import ref
 
 
@@ -236,6 +236,13 @@ class CTTMayaShotWork(tk.TTMayaShotWork, Cacheable):
             (dict): namespace/path dependencies dict
         """
 
+        # Read ma files without opening them
+        if self.path.endswith('.ma'):
+            _deps = MaFile(self.path).read_dependencies()
+            if verbose:
+                pprint.pprint(_deps)
+            return _deps, False
+
         # Make sure scene is loaded
         _replaced_scene = False
         if not cmds.file(query=True, location=True) == self.path:
@@ -3,6 +3,8 @@
 from psyhive import qt
 from psyhive.utils import check_heart, lprint
 
+from .bc_tmpl_cache import read_shots_cache_data
+
 _COL = 'Plum'
 
 
@@ -217,11 +219,18 @@ class ShotgunHandler(_Handler):
             dialog (QDialog): parent dialog
         """
         print 'READING CACHE DATA', force
+
+        # Read uncached shots in a single request
+        _to_read = [_shot for _shot in shots
+                    if force or _shot not in self.cached_shots]
+        if _to_read:
+            read_shots_cache_data(_to_read, force=force)
+
         _pos = dialog.get_c() if dialog else None
         for _shot in qt.ProgressBar(
                 shots, 'Reading {:d} shot{}', col='SeaGreen',
                 show=progress, pos=_pos, parent=dialog):
-            _shot.read_cache_data(force=force)
+            _shot.read_cache_data()
             self.cached_shots.add(_shot)
 
     def _find_cache_data(
@@ -1,19 +1,21 @@
 """Tools for allow data to be cached on tk template objects."""
 
+import collections
 import operator
 import os
 import pprint
 
 from maya import cmds
 
-import tank
-
 from psyhive import tk2, qt, pipe
 from psyhive.utils import (
     get_result_to_file_storer, Cacheable, lprint,
-    store_result_on_obj, store_result, dprint, abs_path)
+    store_result_on_obj, store_result, dprint, abs_path, MaFile)
 from maya_psyhive import ref
 
+_CACHE_FIELDS = ["code", "name", "sg_status_list", "sg_metadata", "path"]
+_PAGE_SIZE = 500
+
 
 class BCRoot(tk2.TTRoot):
     """Used to stored cache shotgun request data for a shot."""
@@ -44,7 +46,6 @@ class BCRoot(tk2.TTRoot):
         """
         dprint('Finding latest caches', self)
 
-        _shotgun = tank.platform.current_engine().shotgun
         _project = pipe.cur_project()
 
         # Get shot data
@@ -55,17 +56,28 @@ class BCRoot(tk2.TTRoot):
             return {}
 
         # Request data from shotgun
-        _sg_data = _shotgun.find(
-            "PublishedFile", filters=[
+        _sg_data = tk2.sg_find(
+            "PublishedFile", force=force, filters=[
                 ["project", "is", [tk2.get_project_sg_data(_project)]],
                 ["sg_format", "is", 'alembic'],
                 ["entity", "is", [_shot_data]],
             ],
-            fields=["code", "name", "sg_status_list", "sg_metadata", "path"])
+            fields=_CACHE_FIELDS)
+
+        return self.process_cache_data(_sg_data)
+
+    def process_cache_data(self, sg_data):
+        """Process shotgun cache data for this shot.
+
+        Args:
+            sg_data (dict list): PublishedFile data for this shot
 
+        Returns:
+            (dict list): latest cache data
+        """
         # Remove omitted and non-latest versions
         _cache_data = {}
-        for _data in _sg_data:
+        for _data in sg_data:
             _cache = tk2.TTOutputVersion(
                 _data['path']['local_path'])
             _data['cache'] = _cache
@@ -130,6 +142,56 @@ class BCRoot(tk2.TTRoot):
         return _work_files
 
 
+def read_shots_cache_data(shots, force=False, page_size=_PAGE_SIZE):
+    """Read cache data for a list of shots.
+
+    The shots are read using a single paged shotgun request, and the
+    results are stored in the read_cache_data cache of each shot.
+
+    Args:
+        shots (BCRoot list): shots to read
+        force (bool): ignore stored shotgun responses
+        page_size (int): maximum number of items per request
+    """
+    _project = pipe.cur_project()
+
+    # Get shot data
+    _shot_datas = {}
+    for _shot, _shot_data in tk2.get_shots_sg_data(shots).items():
+        if not _shot_data:
+            print 'MISSING FROM SHOTGUN:', _shot
+            BCRoot.read_cache_data.set_result({}, _shot)
+            continue
+        _shot_datas[_shot] = _shot_data
+    if not _shot_datas:
+        return
+
+    # Request data from shotgun
+    _sg_data = collections.defaultdict(list)
+    _filters = [
+        ["project", "is", [tk2.get_project_sg_data(_project)]],
+        ["sg_format", "is", 'alembic'],
+        ["entity", "in", _shot_datas.values()],
+    ]
+    _page = 1
+    while True:
+        dprint('Finding latest caches', len(_shot_datas), 'page', _page)
+        _results = tk2.sg_find(
+            "PublishedFile", filters=_filters, force=force,
+            fields=_CACHE_FIELDS+["entity"], limit=page_size, page=_page)
+        for _data in _results:
+            _sg_data[_data['entity']['id']].append(_data)
+        if len(_results) < page_size:
+            break
+        _page += 1
+
+    # Store results
+    for _shot, _shot_data in _shot_datas.items():
+        _result = _shot.process_cache_data(
+            _sg_data[_shot_data['id']])
+        BCRoot.read_cache_data.set_result(_result, _shot)
+
+
 class BCOutputVersion(tk2.TTOutputVersion, Cacheable):
     """Asset with built in caching."""
 
@@ -238,6 +300,13 @@ class BCWork(tk2.TTWork, Cacheable):
             (dict): namespace/path dependencies dict
         """
 
+        # Read ma files without opening them
+        if self.path.endswith('.ma'):
+            _deps = MaFile(self.path).read_dependencies()
+            if verbose:
+                pprint.pprint(_deps)
+            return _deps, False
+
         # Make sure scene is loaded
         _replaced_scene = False
         if not cmds.file(query=True, location=True) == self.path:
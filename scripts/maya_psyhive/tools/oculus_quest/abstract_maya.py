@@ -16,10 +16,11 @@ import time
 import mtoa
 from maya import cmds, mel
 from maya import OpenMaya as om
+from maya.api import OpenMaya as om2
 
-from psyhive import qt
+from psyhive import qt, geo
 from psyhive.qt import QtCore
-from psyhive.utils import dprint, File, abs_path, test_path
+from psyhive.utils import dprint, File, abs_path, test_path, thread_map
 from maya_psyhive.utils import get_shp, load_plugin
 
 
@@ -402,9 +403,13 @@ def get_face_normals_for_object(node):
 def get_back_faces(node, view_point, front_faces=False, recurse=True):
     """
     Given a node, recursively get a list of all faces whose backs are visible from a view point
+
+    The mesh data for each node is read once and the faces are classified in a single vectorised pass.
+
     Args:
-        node (str): Name of the maya node to check
+        node (str|list): Name of the maya node to check, or a list of faces to check
         view_point (imath.V3f): Input view point position
+        front_faces (bool): Return faces facing the view point instead
         recurse (bool): Whether to recursively search from the top node.  Default is True.
 
     Returns:
@@ -413,20 +418,127 @@ def get_back_faces(node, view_point, front_faces=False, recurse=True):
     if recurse:
         nodes = cmds.ls(node, dag=True, type="mesh", l=True, noIntermediate=True)
     else:
-        nodes = [node]
+        nodes = node if isinstance(node, (list, tuple)) else [node]
     all_back_faces = []
-    for node in nodes:
-        face_normal_dict = get_face_normals_for_object(node)
-        for face, normal in face_normal_dict.iteritems():
-            if not front_faces:
-                if is_backfacing(face, normal, view_point):
-                    all_back_faces.append(face)
-            elif front_faces:
-                if not is_backfacing(face, normal, view_point):
-                    all_back_faces.append(face)
+    for mesh_node, face_ids in get_face_ids_for_components(nodes):
+        points, counts, indices = get_mesh_arrays(mesh_node)
+        normals = geo.get_face_normals(points, counts, indices)
+        centroids = geo.get_face_centroids(points, counts, indices)
+        mask = geo.get_back_face_mask(centroids, normals, view_point)
+        if front_faces:
+            mask = ~mask
+        if face_ids is not None:
+            face_ids = face_ids[mask[face_ids]]
+        else:
+            face_ids = numpy.flatnonzero(mask)
+        all_back_faces.extend(["{}.f[{:d}]".format(mesh_node, face_id) for face_id in face_ids])
     return all_back_faces
 
 
+def get_face_ids_for_components(components):
+    """
+    Group a list of meshes and faces by mesh.
+
+    Args:
+        components (list): Mesh nodes and/or faces, eg. ["pCube1", "pSphere1.f[2:10]"]
+
+    Returns:
+        list: (mesh node, face ids) pairs, where face ids is None if the whole mesh was given
+    """
+    sel = om2.MSelectionList()
+    for component in components:
+        sel.add(component)
+    face_ids = {}
+    for idx in range(sel.length()):
+        dag_path, component = sel.getComponent(idx)
+        mesh_node = dag_path.fullPathName()
+        if component.isNull():
+            face_ids[mesh_node] = None
+        elif face_ids.get(mesh_node, []) is not None:
+            ids = om2.MFnSingleIndexedComponent(component).getElements()
+            face_ids.setdefault(mesh_node, []).extend(ids)
+    return [
+        (mesh_node, None if ids is None else numpy.unique(numpy.array(ids, dtype=int)))
+        for mesh_node, ids in sorted(face_ids.items())]
+
+
+def get_mesh_arrays(node, world_space=True):
+    """
+    Read the points and faces of a mesh into numpy arrays.
+
+    Args:
+        node (str): Mesh node to read
+        world_space (bool): Read world space positions, otherwise object space
+
+    Returns:
+        tuple: point positions (P x 3 array), vertex count for each face, point index for each face vertex
+    """
+    sel = om2.MSelectionList()
+    sel.add(node)
+    mesh = om2.MFnMesh(sel.getDagPath(0))
+    space = om2.MSpace.kWorld if world_space else om2.MSpace.kObject
+    points = numpy.array([[pt.x, pt.y, pt.z] for pt in mesh.getPoints(space)])
+    counts, indices = mesh.getVertices()
+    return points, numpy.array(counts, dtype=int), numpy.array(indices, dtype=int)
+
+
+def get_uv_arrays(node):
+    """
+    Read the UVs of a mesh from the current UV set into numpy arrays.
+
+    Args:
+        node (str): Mesh node to read
+
+    Returns:
+        tuple: u values, v values, number of UVs assigned to each face (zero if unmapped), UV index for each
+            face vertex
+    """
+    sel = om2.MSelectionList()
+    sel.add(node)
+    mesh = om2.MFnMesh(sel.getDagPath(0))
+    us, vs = mesh.getUVs()
+    uv_counts, uv_ids = mesh.getAssignedUVs()
+    return (numpy.array(us, dtype=numpy.float64), numpy.array(vs, dtype=numpy.float64),
+            numpy.array(uv_counts, dtype=int), numpy.array(uv_ids, dtype=int))
+
+
+def apply_uv_shell_scales(node, us, vs, uv_shells, scales, pivots):
+    """
+    Scale the UV shells of a mesh about pivot points.
+
+    If the mesh has no construction history, all the new UVs are written in a single call. Otherwise, each
+    shell is edited with polyEditUV so that the change is kept in the history.
+
+    Args:
+        node (str): Mesh node to edit
+        us (numpy.ndarray): Current u values
+        vs (numpy.ndarray): Current v values
+        uv_shells (numpy.ndarray): Shell index of each UV (-1 if unused)
+        scales (numpy.ndarray): Scale for each shell
+        pivots (numpy.ndarray): u/v pivot for each shell (S x 2)
+
+    Returns:
+        None
+    """
+    shapes = cmds.ls(node, dag=True, long=True, type="mesh", noIntermediate=True)
+    if not cmds.listConnections("{}.inMesh".format(shapes[0]), source=True, destination=False):
+        new_us, new_vs = geo.scale_uv_shells(us, vs, uv_shells, scales, pivots)
+        sel = om2.MSelectionList()
+        sel.add(node)
+        mesh = om2.MFnMesh(sel.getDagPath(0))
+        mesh.setUVs(new_us.tolist(), new_vs.tolist())
+        mesh.updateSurface()
+        return
+
+    used = numpy.flatnonzero(uv_shells >= 0)
+    order = used[numpy.argsort(uv_shells[used], kind="mergesort")]
+    starts = numpy.searchsorted(uv_shells[order], numpy.arange(len(scales)+1))
+    for shell in numpy.flatnonzero(scales != 1.0):
+        uvs = get_face_ranges(node, order[starts[shell]:starts[shell+1]], component="map")
+        cmds.polyEditUV(uvs, pivotU=pivots[shell, 0], pivotV=pivots[shell, 1], scaleU=scales[shell],
+                        scaleV=scales[shell])
+
+
 def create_bbox(name, width, height, depth, translation=None, force=True):
     """
     Create a templated bounding box with bottom on the ground.  "translation" is applied on top.
@@ -527,25 +639,10 @@ def get_uv_area(node):
 
     """
     try:
-        sList = om.MSelectionList()
-        sList.add(node)
-        sIter = om.MItSelectionList(sList)
-        dagp = om.MDagPath()
-        mobj = om.MObject()
-        sIter.getDagPath(dagp, mobj)
-        pIter = om.MItMeshPolygon(dagp)
-        areaParam = om.MScriptUtil()
-        areaParam.createFromDouble(0.0)
-        areaPtr = areaParam.asDoublePtr()
-        totalArea = 0
-        while not pIter.isDone():
-            pIter.getUVArea(areaPtr)
-            area = om.MScriptUtil(areaPtr).asDouble()
-            totalArea += area
-            pIter.next()
-        return totalArea
-    except:
+        us, vs, uv_counts, uv_ids = get_uv_arrays(node)
+    except RuntimeError:
         raise Exception("Object is invalid! {}".format(node))
+    return float(geo.get_uv_face_areas(us, vs, uv_counts, uv_ids).sum())
 
 
 def unfold_uvs(nodes):
@@ -594,6 +691,9 @@ def set_world_space_texel_density(nodes, density, texture_resolution):
     """
     Set the World space texel density
 
+    The UVs and points of each mesh are read once, and the shells, areas and bounding boxes are calculated
+    as array operations before the new UVs are applied in one batch.
+
     Args:
         nodes (list): List of input nodes
         density (float): texel density multiplier
@@ -602,17 +702,18 @@ def set_world_space_texel_density(nodes, density, texture_resolution):
     Returns:
         None
     """
-    shell_list = get_uv_shells(nodes)
-    for uv_shell in shell_list:
-        selection_faces = cmds.polyListComponentConversion(uv_shell, toFace=True)
-        selection_faces = cmds.filterExpand(selection_faces, ex=False, sm=34)
-        current_density = calculate_texel_density(selection_faces, texture_resolution)
-        if current_density:
-            scale = density / current_density
-            ((umin, umax), (vmin, vmax)) = cmds.polyEvaluate(uv_shell, boundingBoxComponent2d=True)
-            pivot_u = (umin + umax) * 0.5
-            pivot_v = (vmin + vmax) * 0.5
-            cmds.polyEditUV(uv_shell, pivotU=pivot_u, pivotV=pivot_v, scaleU=scale, scaleV=scale)
+    for mesh in get_mesh_children(nodes):
+        us, vs, uv_counts, uv_ids = get_uv_arrays(mesh)
+        if not len(us):
+            continue
+        points, counts, indices = get_mesh_arrays(mesh)
+        uv_shells, face_shells, shell_count = geo.get_uv_shell_ids(uv_counts, uv_ids, len(us))
+        scales = geo.get_texel_density_scales(
+            geo.get_face_areas(points, counts, indices), geo.get_uv_face_areas(us, vs, uv_counts, uv_ids),
+            face_shells, shell_count, density, texture_resolution)
+        bboxes = geo.get_shell_bboxes(us, vs, uv_shells, shell_count)
+        pivots = numpy.stack([bboxes[:, 0] + bboxes[:, 1], bboxes[:, 2] + bboxes[:, 3]], axis=1) * 0.5
+        apply_uv_shell_scales(mesh, us, vs, uv_shells, scales, pivots)
 
 
 @time_operation
@@ -629,11 +730,12 @@ def get_uv_shells(nodes):
     meshes = get_mesh_children(nodes)
     result = []
     for mesh in meshes:
-        cmds.select("{}.f[*]".format(mesh))
-        # This gets the UV shell IDs, e.g.: [0, 1, 2, 3]
-        shell_list = cmds.polyEvaluate(mesh, activeUVShells=True)
-        for shell in shell_list:
-            result.append(cmds.polyEvaluate(mesh, uvsInShell=shell))
+        us, _, uv_counts, uv_ids = get_uv_arrays(mesh)
+        uv_shells, _, shell_count = geo.get_uv_shell_ids(uv_counts, uv_ids, len(us))
+        order = numpy.argsort(uv_shells, kind="mergesort")
+        starts = numpy.searchsorted(uv_shells[order], numpy.arange(shell_count+1))
+        for shell in range(shell_count):
+            result.append(get_face_ranges(mesh, order[starts[shell]:starts[shell+1]], component="map"))
     return result
 
 
@@ -2187,6 +2289,9 @@ def bake_textures(
     """
     Bake textures for the given node list, using the first node for the name.
 
+    Each bake uses its own tmp dir, so that several groups can be baked at once in separate processes, and the
+    outputs are converted concurrently.
+
     Args:
         input_nodes (list): Input list of nodes to bake into a single output
         texture_name (str): Full path to the output texture
@@ -2200,7 +2305,7 @@ def bake_textures(
 
     _enable_aovs = False
     _outputs = []
-    _tmp_dir = abs_path('{}/arnold_bake'.format(tempfile.gettempdir()))
+    _tmp_dir = abs_path('{}/arnold_bake/{}'.format(tempfile.gettempdir(), name))
 
     # Build tmp node
     _temp_node = name + "_TEMP"
@@ -2246,7 +2351,8 @@ def bake_textures(
     print' - GENERATED BAKE IN {:.02f}s'.format(time.time() - _start)
 
     # Move to output dir + convert to required extension
-    for _tmp_file, _out_file in _outputs:
+    def _move_output(output):
+        _tmp_file, _out_file = output
         print ' - MOVING', _tmp_file.path
         print ' - TARGET', _out_file.path
         assert _tmp_file.exists()
@@ -2255,6 +2361,7 @@ def bake_textures(
         else: # Convert + duplicate exr
             _oiio_convert(_tmp_file.path, _out_file.path)
             shutil.move(_tmp_file.path, _out_file.apply_extn('exr').path)
+    thread_map(_move_output, _outputs)
 
     return [_out_file.path for _, _out_file in _outputs]
 
@@ -2698,7 +2805,109 @@ def delete_occluded_faces(nodes, view_points, near_clip, far_clip):
             all_visible_faces.extend(point_visible_faces)
             # faces_dict.update({"visible_{}".format(pprint.pformat(point)): point_visible_faces})
 
-    # if True:
+    delete_faces_not_in_list(nodes, all_visible_faces)
+    # write_faces_to_file(faces_dict)
+
+
+@keep_selection
+@print_func_name
+def delete_occluded_faces_headless(nodes, view_points, near_clip, far_clip, resolution=256):
+    # type: (list, list, float, float, int) -> None
+    """
+    Find and delete all occluded faces without using the viewport, so this can run in mayapy.  Also deletes all
+    "invisible" nodes, meaning the nodes where no faces are visible from any view point.
+
+    Visibility is calculated from the mesh triangles with a depth buffer rendered in every direction from each
+    view point, at a sample density given by the resolution.
+
+        :param nodes: Nodes to process
+        :param view_points: Points to check visibility from
+        :param near_clip: Ignore geometry closer than this to a view point
+        :param far_clip: Ignore geometry further than this from a view point
+        :param resolution: Number of samples across each face of the cube map rendered at each view point
+        :rtype: None
+    """
+    mesh_nodes = get_mesh_children(nodes)
+    tris, face_ids, face_counts = get_triangle_arrays(mesh_nodes)
+    visible_ids = geo.find_visible_faces(
+        tris, view_points, face_ids=face_ids, resolution=resolution, near_clip=near_clip, far_clip=far_clip)
+
+    # Convert face ids to face ranges for each node
+    all_visible_faces = []
+    offset = 0
+    for node, face_count in face_counts:
+        node_ids = visible_ids[(visible_ids >= offset) & (visible_ids < offset + face_count)] - offset
+        all_visible_faces.extend(get_face_ranges(node, node_ids))
+        offset += face_count
+
+    delete_faces_not_in_list(nodes, all_visible_faces)
+
+
+def get_triangle_arrays(nodes):
+    """
+    Read the world space triangles of a list of meshes into numpy arrays.
+
+    Args:
+        nodes (list): Transforms of the meshes to read
+
+    Returns:
+        tuple: triangle positions (N x 3 x 3 array), index of the face each triangle belongs to (where faces are
+            numbered consecutively across all the nodes), list of (node, face count) pairs
+    """
+    all_tris = [numpy.zeros((0, 3, 3))]
+    all_face_ids = [numpy.zeros(0, dtype=int)]
+    face_counts = []
+    offset = 0
+    for node in nodes:
+        sel = om2.MSelectionList()
+        sel.add(node)
+        mesh = om2.MFnMesh(sel.getDagPath(0))
+        points = numpy.array([[pt.x, pt.y, pt.z] for pt in mesh.getPoints(om2.MSpace.kWorld)])
+        tri_counts, tri_verts = mesh.getTriangles()
+        tri_counts = numpy.array(tri_counts, dtype=int)
+        all_tris.append(points[numpy.array(tri_verts, dtype=int)].reshape(-1, 3, 3))
+        all_face_ids.append(offset + numpy.repeat(numpy.arange(len(tri_counts)), tri_counts))
+        face_counts.append((node, len(tri_counts)))
+        offset += len(tri_counts)
+
+    return numpy.concatenate(all_tris), numpy.concatenate(all_face_ids), face_counts
+
+
+def get_face_ranges(node, face_ids, component="f"):
+    """
+    Convert a sorted list of face indices to a compact list of face ranges.
+
+    Args:
+        node (str): Node the faces belong to
+        face_ids (list): Sorted face indices
+        component (str): Component type, eg. "map" for UVs
+
+    Returns:
+        list: Face ranges, eg. ["node.f[0:3]", "node.f[7]"]
+    """
+    face_ranges = []
+    face_ids = numpy.asarray(face_ids, dtype=int)
+    if not len(face_ids):
+        return face_ranges
+    breaks = numpy.flatnonzero(numpy.diff(face_ids) != 1) + 1
+    for run in numpy.split(face_ids, breaks):
+        if len(run) == 1:
+            face_ranges.append("{}.{}[{:d}]".format(node, component, run[0]))
+        else:
+            face_ranges.append("{}.{}[{:d}:{:d}]".format(node, component, run[0], run[-1]))
+    return face_ranges
+
+
+def delete_faces_not_in_list(nodes, all_visible_faces):
+    # type: (list, list) -> None
+    """
+    Delete all faces of the given nodes which aren't in the list of visible faces.  Also deletes any nodes which
+    have no visible faces.
+
+        :param nodes: Nodes to process
+        :param all_visible_faces: Faces to keep
+        :rtype: None
+    """
     current_nodes = get_mesh_children(nodes)
     # Get the full paths of the faces
     all_visible_faces = cmds.ls(all_visible_faces, long=True)
@@ -2726,7 +2935,6 @@ def delete_occluded_faces(nodes, view_points, near_clip, far_clip):
 
     cmds.delete(occluded_faces)
     # ########################################################################
-    # write_faces_to_file(faces_dict)
 
 
 def write_faces_to_file(faces):
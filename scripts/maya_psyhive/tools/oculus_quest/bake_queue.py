@@ -0,0 +1,210 @@
+"""
+Tools for baking texture map groups as a queue of background or farm tasks.
+
+The prepared bake scene, including its lights, cameras and render settings, is exported once up front, so that
+each group can be baked in a separate mayapy task without locking up the interface. A manifest lists the tasks in
+the queue, and each task opens the scene and bakes its own group, then writes a sidecar file next to its outputs. The sidecar records a key built from the geometry,
+uvs and bake settings, which is used to skip groups which have already been baked.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from maya import cmds
+
+import abstract_maya
+
+from psyhive import farm
+from psyhive.utils import abs_path, dprint, test_path
+from maya_psyhive.utils import load_plugin
+
+MANIFEST_NAME = "manifest.json"
+SIDECAR_EXTN = ".bake.json"
+
+
+def get_bake_key(nodes, resolution, outputs):
+    """
+    Get a key representing the result of baking a group of nodes.
+
+    This hashes the world space points and uvs of each node, so the key only changes if the geometry, uv layout
+    or bake settings change. Shading changes are not detected.
+
+    Args:
+        nodes (list): Nodes to bake
+        resolution (int): Bake resolution
+        outputs (dict): Output file for each bake mode
+
+    Returns:
+        str: Bake key
+    """
+    sha = hashlib.sha1()
+    sha.update(json.dumps([resolution, sorted(outputs)]))
+    for node in sorted(nodes):
+        sha.update(node)
+        points, counts, indices = abstract_maya.get_mesh_arrays(node)
+        us, vs, uv_counts, uv_ids = abstract_maya.get_uv_arrays(node)
+        for array in [points, counts, indices, us, vs, uv_counts, uv_ids]:
+            sha.update(array.tobytes())
+    return sha.hexdigest()
+
+
+def is_baked(outputs, key):
+    """
+    Test whether a group's outputs were baked with the given key.
+
+    Args:
+        outputs (dict): Output file for each bake mode
+        key (str): Bake key
+
+    Returns:
+        bool: Whether all outputs exist and are up to date
+    """
+    for output in outputs.values():
+        if not os.path.exists(output):
+            return False
+        try:
+            with open(output + SIDECAR_EXTN) as handle:
+                if json.load(handle).get("key") != key:
+                    return False
+        except (IOError, ValueError):
+            return False
+    return True
+
+
+def write_sidecars(outputs, key):
+    """
+    Record that a group's outputs were baked with the given key.
+
+    Args:
+        outputs (dict): Output file for each bake mode
+        key (str): Bake key
+    """
+    for output in outputs.values():
+        with open(output + SIDECAR_EXTN, "w") as handle:
+            json.dump({"key": key, "time": time.time()}, handle, indent=1, sort_keys=True)
+
+
+def export_bake_queue(tasks, queue_dir, skip_existing=True):
+    """
+    Export the bake scene and write a manifest listing the groups that need baking.
+
+    The scene should already be prepared for baking (ie. renderable camera and visibility options set).
+
+    Args:
+        tasks (list): Dicts describing each group, with name, nodes, resolution and outputs keys, where
+            outputs maps each bake mode to its output file
+        queue_dir (str): Directory to write scenes and manifest to
+        skip_existing (bool): Skip groups which are already baked with the same key
+
+    Returns:
+        str: Path to manifest, or None if there is nothing to bake
+    """
+    queue_dir = abs_path(queue_dir)
+    test_path(queue_dir)
+    scene = "{}/bake_scene.mb".format(queue_dir)
+    queued = []
+    for task in tasks:
+        key = get_bake_key(task["nodes"], task["resolution"], task["outputs"])
+        if skip_existing and is_baked(task["outputs"], key):
+            print "Skipping up to date bake '{}'".format(task["name"])
+            continue
+        queued.append(dict(task, key=key, scene=scene))
+
+    if not queued:
+        return None
+    export_bake_scene(scene)
+    manifest = "{}/{}".format(queue_dir, MANIFEST_NAME)
+    with open(manifest, "w") as handle:
+        json.dump({"tasks": queued}, handle, indent=1, sort_keys=True)
+    return manifest
+
+
+def export_bake_scene(scene):
+    """
+    Export the whole scene so that it can be baked in another process.
+
+    This includes the lights, cameras and render settings, so that background bakes match foreground bakes.
+
+    Args:
+        scene (str): Path to scene
+    """
+    cmds.file(scene, exportAll=True, type="mayaBinary", force=True, preserveReferences=False)
+
+
+def read_manifest(manifest):
+    """
+    Read the tasks in a bake queue.
+
+    Args:
+        manifest (str): Path to manifest
+
+    Returns:
+        list: Task dicts
+    """
+    with open(manifest) as handle:
+        return json.load(handle)["tasks"]
+
+
+def get_bake_queue_status(manifest):
+    """
+    Find which tasks in a bake queue have completed.
+
+    Args:
+        manifest (str): Path to manifest
+
+    Returns:
+        tuple: Names of completed tasks, names of pending tasks
+    """
+    done, pending = [], []
+    for task in read_manifest(manifest):
+        if is_baked(task["outputs"], task["key"]):
+            done.append(task["name"])
+        else:
+            pending.append(task["name"])
+    return done, pending
+
+
+def submit_bake_queue(manifest, local=True):
+    """
+    Submit each task in a bake queue as a separate mayapy task.
+
+    Args:
+        manifest (str): Path to manifest
+        local (bool): Execute on the local machine in the background rather than on the farm
+    """
+    tasks = read_manifest(manifest)
+    job = farm.MayaPyJob("Oculus bake {:d} map{}".format(len(tasks), "" if len(tasks) == 1 else "s"))
+    for task in tasks:
+        py = "\n".join([
+            "from maya_psyhive.tools.oculus_quest import bake_queue",
+            "bake_queue.run_bake_task('{manifest}', '{name}')",
+        ]).format(manifest=manifest, name=task["name"])
+        job.tasks.append(farm.MayaPyTask(py, label="Bake {}".format(task["name"])))
+    job.submit(local=local)
+
+
+def run_bake_task(manifest, name):
+    """
+    Bake a group from a bake queue.
+
+    This is executed in the mayapy task for the group.
+
+    Args:
+        manifest (str): Path to manifest
+        name (str): Name of group to bake
+    """
+    task = [task for task in read_manifest(manifest) if task["name"] == name][0]
+    if is_baked(task["outputs"], task["key"]):
+        dprint("Bake is already complete", name)
+        return
+
+    load_plugin("mtoa")
+    cmds.file(task["scene"], open=True, force=True)
+    outputs = abstract_maya.bake_textures(
+        name, task["nodes"], resolution=task["resolution"], default_file=task["outputs"].get("default"),
+        spec_file=task["outputs"].get("reflection"))
+    if not outputs:
+        raise RuntimeError("Failed to bake '{}'".format(name))
+    write_sidecars(task["outputs"], task["key"])
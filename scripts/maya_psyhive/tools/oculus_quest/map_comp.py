@@ -0,0 +1,168 @@
+"""
+Tools for compositing baked diffuse and reflection maps in process.
+
+This matches the mapcomp houdini asset used by houdini_comp: the reflection map is scaled by the reflection mix
+and added to the diffuse map in linear space, then the colorcorrect gamma and the output rop gamma are applied
+before writing an 8 bit image. Maps are processed in bands of rows so that memory use stays bounded for large
+maps, and many maps can be composited at once on a thread pool.
+"""
+
+import numpy
+
+from psyhive.utils import thread_map
+
+# Gammas applied by the colorcorrect node and output rop in houdini/mapcomp.hda
+COMP_GAMMA = 1.0909090909090908
+OUTPUT_GAMMA = 2.4
+
+TILE_ROWS = 256
+
+
+def srgb_to_linear(pixels):
+    """
+    Convert sRGB encoded pixels to linear.
+
+    Args:
+        pixels (numpy.ndarray): sRGB pixel values in the range 0-1
+
+    Returns:
+        numpy.ndarray: linear pixel values
+    """
+    return numpy.where(pixels <= 0.04045, pixels / 12.92, ((pixels + 0.055) / 1.055) ** 2.4)
+
+
+def composite_tile(diffuse, reflection, reflection_mix):
+    """
+    Composite a tile of linear diffuse and reflection pixels to 8 bit output pixels.
+
+    Args:
+        diffuse (numpy.ndarray): linear diffuse pixels
+        reflection (numpy.ndarray|None): linear reflection pixels (None to use diffuse only)
+        reflection_mix (float): weighting of reflection
+
+    Returns:
+        numpy.ndarray: output pixels as uint8
+    """
+    comp = diffuse.astype(numpy.float32)
+    if reflection is not None and reflection_mix:
+        comp += reflection * numpy.float32(reflection_mix)
+    numpy.clip(comp, 0.0, 1.0, out=comp)
+    comp **= numpy.float32(1.0 / (COMP_GAMMA * OUTPUT_GAMMA))
+    return numpy.rint(comp * 255).astype(numpy.uint8)
+
+
+class OiioImageReader(object):
+    """Reads bands of rows of an image as linear RGB float pixels using OpenImageIO."""
+
+    def __init__(self, path):
+        import OpenImageIO as oiio
+        self._input = oiio.ImageInput.open(path)
+        if not self._input:
+            raise IOError("Failed to read '{}': {}".format(path, oiio.geterror()))
+        spec = self._input.spec()
+        self.width = spec.width
+        self.height = spec.height
+        self._channels = min(spec.nchannels, 3)
+        self._format = oiio.FLOAT
+        self._srgb = spec.get_string_attribute("oiio:ColorSpace").lower() == "srgb"
+
+    def read_rows(self, ybegin, yend):
+        """
+        Args:
+            ybegin (int): first row
+            yend (int): row after the last row
+
+        Returns:
+            numpy.ndarray: pixels (rows x width x 3)
+        """
+        pixels = numpy.asarray(self._input.read_scanlines(ybegin, yend, 0, 0, self._channels, self._format))
+        pixels = pixels.reshape(yend - ybegin, self.width, self._channels)
+        if self._channels < 3:
+            pixels = pixels[:, :, [0, 0, 0]]
+        if self._srgb:
+            pixels = srgb_to_linear(pixels)
+        return pixels
+
+    def close(self):
+        self._input.close()
+
+
+class OiioImageWriter(object):
+    """Writes bands of rows of an 8 bit RGB image using OpenImageIO."""
+
+    def __init__(self, path, width, height):
+        import OpenImageIO as oiio
+        self._output = oiio.ImageOutput.create(path)
+        if not self._output:
+            raise IOError("Failed to write '{}': {}".format(path, oiio.geterror()))
+        self._output.open(path, oiio.ImageSpec(width, height, 3, oiio.UINT8))
+
+    def write_rows(self, ybegin, pixels):
+        """
+        Args:
+            ybegin (int): first row
+            pixels (numpy.ndarray): uint8 pixels (rows x width x 3)
+        """
+        self._output.write_scanlines(ybegin, ybegin + len(pixels), 0, pixels)
+
+    def close(self):
+        self._output.close()
+
+
+def composite_map(diffuse_map, reflection_map, output_map, reflection_mix=1.0, tile_rows=TILE_ROWS,
+                  reader=OiioImageReader, writer=OiioImageWriter):
+    """
+    Composite a diffuse and reflection map to an output map.
+
+    Args:
+        diffuse_map (str): Path to diffuse map
+        reflection_map (str): Path to reflection map (this isn't read if the mix is zero)
+        output_map (str): Path to output map
+        reflection_mix (float): Weighting of reflection
+        tile_rows (int): Number of rows to process at a time
+        reader (class): Image reader class
+        writer (class): Image writer class
+
+    Returns:
+        str: Path to output map
+    """
+    diffuse = reader(diffuse_map)
+    reflection = None
+    if reflection_mix and reflection_map != diffuse_map:
+        reflection = reader(reflection_map)
+        if (reflection.width, reflection.height) != (diffuse.width, diffuse.height):
+            raise ValueError("Resolution of '{}' does not match '{}'".format(reflection_map, diffuse_map))
+    output = writer(output_map, diffuse.width, diffuse.height)
+    try:
+        for ybegin in range(0, diffuse.height, tile_rows):
+            yend = min(ybegin + tile_rows, diffuse.height)
+            diffuse_rows = diffuse.read_rows(ybegin, yend)
+            if reflection_map == diffuse_map:
+                reflection_rows = diffuse_rows
+            else:
+                reflection_rows = reflection.read_rows(ybegin, yend) if reflection else None
+            output.write_rows(ybegin, composite_tile(diffuse_rows, reflection_rows, reflection_mix))
+    finally:
+        output.close()
+        diffuse.close()
+        if reflection:
+            reflection.close()
+    return output_map
+
+
+def composite_maps(map_combination_list, reflection_mix=1.0, threads=None, **kwargs):
+    """
+    Composite a list of diffuse, reflection, output triples on a thread pool.
+
+    Args:
+        map_combination_list (list): [diffuse, reflection, output] lists
+        reflection_mix (float): Weighting of reflection
+        threads (int): Number of maps to process at once
+
+    Returns:
+        list: Output maps
+    """
+    def _composite(triple):
+        print "Compositing '{}'".format(triple[2])
+        return composite_map(*triple, reflection_mix=reflection_mix, **kwargs)
+    return thread_map(_composite, map_combination_list, threads=threads)
@@ -5,15 +5,18 @@ import os
 import pprint
 import re
 import sys
+import time
 
 from maya import cmds
 
 import abstract_maya
+import bake_queue
 import cframe
 import houdini_comp
+import map_comp
 import texture_convert
 
-from psyhive import qt, tk, host
+from psyhive import qt, tk, host, geo
 from psyhive.qt import QtUiTools, QtCore, QtGui, QtWidgets, Qt
 from psyhive.utils import File, dprint, abs_path
 
@@ -23,10 +26,8 @@ OCULUS_BBOX = "OCULUS_BBOX"
 CENTER_CAM = "CENTER_CAM"
 
 # TODO: create mechanism to target UVs more finely.  Separate UI to specify UV percentage
-# TODO: write all vrscenes and render all for background rendering, versus writing the vrscenes before each render
 # TODO: Upgrade "skip existing" to be a listwidget
-# TODO: Change background render to not lock up the foreground.
-    # Update UI to be separate file, or change UI to be UI file (better)
+# TODO: Update UI to be separate file, or change UI to be UI file (better)
 
 # Source is where the geo comes from and provides the shading and full geometry for the color bake.
 # Bake is where the UVs are baked.  This needs to have combined UVs for pieces, even those with animation.
@@ -69,7 +70,21 @@ BAKE_GEO_ATTR = "bakeGeoType"
 #     return catch_error_internal
 
 
-def create_mipmap_textures(source_texture, mipmap_texture, colorspace, force=False):
+def create_mipmap_textures(source_texture, mipmap_texture, colorspace, force=False, scheduler=None):
+    """
+    Convert a texture, or each tile of a UDIM texture, to mipmaps.
+
+    Args:
+        source_texture (str): Source texture, which can contain a <UDIM> tag
+        mipmap_texture (str): Output mipmap texture, which can contain a <UDIM> tag
+        colorspace (str): Colorspace of source texture
+        force (bool): Convert textures even if they are up to date
+        scheduler (texture_convert.MipmapScheduler): Add conversions to this scheduler rather than converting
+            them immediately
+
+    Returns:
+        bool: Whether any textures were found
+    """
     mipmap_dir = os.path.dirname(mipmap_texture)
     ext = os.path.splitext(source_texture)[-1].lower()[1:]
 
@@ -88,22 +103,14 @@ def create_mipmap_textures(source_texture, mipmap_texture, colorspace, force=Fal
     source_texture_match = re.compile(source_texture_match_str)
     mipmap_texture_mask = mipmap_texture.replace("<UDIM>", "{udim}")
 
+    _scheduler = scheduler or texture_convert.MipmapScheduler(force=force)
     for texture in textures:
         udim = source_texture_match.match(texture.lower()).groupdict().get("udim", "")
         mm_texture = mipmap_texture_mask.format(udim=udim)
-
-        if os.path.exists(mm_texture):
-            if force:
-                os.remove(mm_texture)
-            else:
-                # If it's already mipped and the mip file is newer than the texture, continue
-                texture_timestamp = os.path.getmtime(texture)
-                mipmap_timestamp = os.path.getmtime(mm_texture)
-                if texture_timestamp < mipmap_timestamp:
-                    continue
-        print "## Converting '{}' -> '{}'".format(texture, mm_texture)
+        _scheduler.add(texture, mm_texture, colorspace)
+    if not scheduler:
+        _scheduler.run()
         sys.stdout.flush()
-        texture_convert.mipmap_texture(texture, mm_texture, colorspace)
 
     if textures:
         return True
@@ -145,6 +152,7 @@ def swap_mipmap_textures(mipmap=True):
 
 
 def mipmap_textures(force=False):
+    scheduler = texture_convert.MipmapScheduler(force=force)
     file_texture_dict = abstract_maya.get_file_texture_dict()
     for file_node, source_texture in file_texture_dict.iteritems():
         if re.search("mipmap", source_texture) or re.search("BAKE", source_texture) or not source_texture.endswith("png"):
@@ -153,9 +161,11 @@ def mipmap_textures(force=False):
             continue
         mipmap_texture = get_mipmap_texture_for_map(source_texture)
         colorspace = abstract_maya.get_file_node_colorspace(file_node)
-        retval = create_mipmap_textures(source_texture, mipmap_texture, colorspace, force=force)
+        retval = create_mipmap_textures(source_texture, mipmap_texture, colorspace, scheduler=scheduler)
         if retval:
             print "Swapping {} -> {}".format(source_texture, mipmap_texture)
+    scheduler.run()
+    sys.stdout.flush()
     swap_mipmap_textures(mipmap=True)
 
 
@@ -512,10 +522,15 @@ def get_bake_prefix():
     return "{}".format(BAKE)
 
 
-def combine_objects_into_uv_groups(map_count):
+def combine_objects_into_uv_groups(map_count, locality=0.0):
     """
+    Group the static bake objects so that each texture map gets a similar UV area.
+
+    Anim objects always go in the first map, so their UV area is counted against it.
+
     Args:
-        center (list): list with point info, e.g. [0, 0, 0]
+        map_count (int): Number of texture maps to split the objects between
+        locality (float): Weighting for keeping neighbouring objects in the same map
 
     Returns:
         list: Object groups created
@@ -526,39 +541,26 @@ def combine_objects_into_uv_groups(map_count):
     objects = abstract_maya.get_mesh_children(BAKE_STATIC)
     anim_objects = abstract_maya.get_mesh_children(BAKE_ANIM)
 
-    uv_area_list = [abstract_maya.get_uv_area(o) for o in objects]
+    items = []
+    for o in objects:
+        center = None
+        if locality:
+            center = abstract_maya.get_node_center(o)
+            center = (center[0], center[1], center[2])
+        items.append((o, abstract_maya.get_uv_area(o), center))
     anim_uv_area = sum([abstract_maya.get_uv_area(o) for o in anim_objects])
-    total_uv_area = sum(uv_area_list) + anim_uv_area
-    uv_area_per_map = total_uv_area / float(map_count)
-
-    object_uv_area_list = zip(objects, uv_area_list)
-    object_uv_area_list = sorted(object_uv_area_list, key=lambda x:x[1], reverse=True)
-    object_group_list = []
-    uv_map_area = []
-    for i in range(0, map_count):
-        uv_map_area.append(0)
-        object_group_list.append([])
 
     # Offset by the anim area, which always goes in index 0, and add the smallest object so there's always SOMETHING
     # in the space.
-    uv_map_area[0] = anim_uv_area
-    uv_map_area[0] += object_uv_area_list[-1][1]
-    object_group_list[0].append(object_uv_area_list[-1][0])
-    object_uv_area_list = object_uv_area_list[:-1]
-
-    uv_map_index = 1 % map_count
-    for node, uv_area in object_uv_area_list:
-        start_index = uv_map_index
-        miss = False
-        while 1:
-            if uv_map_area[uv_map_index] + uv_area < uv_area_per_map or miss and start_index == uv_map_index:
-                uv_map_area[uv_map_index] += uv_area
-                object_group_list[uv_map_index].append(node)
-                uv_map_index = (uv_map_index + 1) % map_count
-                break
-            else:
-                miss = True
-            uv_map_index = (uv_map_index + 1) % map_count
+    smallest = min(items, key=lambda x: x[1])
+    items.remove(smallest)
+    initial_areas = [0.0] * map_count
+    initial_areas[0] = anim_uv_area + smallest[1]
+    object_group_list, fills = geo.partition_by_area(
+        items, map_count, initial_areas=initial_areas, locality=locality)
+    object_group_list[0].insert(0, smallest[0])
+    for i, (object_group, fill) in enumerate(zip(object_group_list, fills)):
+        print "UV MAP {:d}: {:d} OBJECTS, {:.01f}% FILL".format(i, len(object_group), fill * 100)
 
     bake_prefix = get_bake_prefix()
     abstract_maya.delete_empty_child_groups(BAKE_STATIC)
@@ -668,11 +670,21 @@ def get_file_textures(output_directory, bake_reflection, resolution, image_forma
 
 def bake_textures(resolution, min_shading_rate, max_subdivs, admc_threshold, local_subdivs_mult, output_directory,
                   image_format, do_reflection=False, map_list=None,
-                  use_default_material=False, edge_padding=5):
+                  use_default_material=False, edge_padding=5, skip_existing=False,
+                  background=False, local=True):
     """
+    Bake a texture for each node group.
 
-    Returns:
+    In background mode, a scene is exported for each group and the bakes are submitted as separate mayapy tasks,
+    so the interface isn't locked while they run.
 
+    Args:
+        skip_existing (bool): Skip groups whose outputs were already baked from the same geometry and settings
+        background (bool): Bake in background tasks
+        local (bool): Run background tasks on the local machine rather than the farm
+
+    Returns:
+        str: Path to bake queue manifest (in background mode)
     """
     abstract_maya.set_renderable_camera(CENTER_CAM)
     abstract_maya.set_visibility_options(BAKE)
@@ -681,26 +693,38 @@ def bake_textures(resolution, min_shading_rate, max_subdivs, admc_threshold, loc
     node_group_dict = get_node_group_members()
 
     _bake_modes = get_bake_modes(do_reflection)
+    _tasks = []
+    for node_group in sorted(node_group_dict):
+        _outputs = {}
+        for _mode in _bake_modes:
+            if _mode not in ('default', 'reflection'):
+                raise ValueError(_mode)
+            _outputs[_mode] = get_file_texture_name(
+                node_group, resolution, _mode, output_directory,
+                image_format)
+        _tasks.append({
+            'name': node_group, 'nodes': node_group_dict.get(node_group),
+            'resolution': resolution, 'outputs': _outputs})
+
+    # Export groups for background bake
+    if background:
+        _queue_dir = '{}/bake_queue/{}'.format(output_directory, time.strftime('%y%m%d_%H%M%S'))
+        _manifest = bake_queue.export_bake_queue(_tasks, _queue_dir, skip_existing=skip_existing)
+        if not _manifest:
+            qt.notify('All textures are up to date')
+            return None
+        bake_queue.submit_bake_queue(_manifest, local=local)
+        qt.notify('Submitted {:d} bakes'.format(len(bake_queue.read_manifest(_manifest))))
+        return _manifest
+
     _fails = []
-    for node_group in qt.progress_bar(sorted(node_group_dict)):
+    for _task in qt.progress_bar(_tasks):
 
-        _bake_nodes = node_group_dict.get(node_group)
         print 'BAKE NODES', _bake_modes
-
-        # Get export paths
-        _default_file = None
-        _spec_file = None
-        for _mode in _bake_modes:
-            if _mode == 'default':
-                _default_file = get_file_texture_name(
-                    node_group, resolution, 'default', output_directory,
-                    image_format)
-            elif _mode == 'reflection':
-                _spec_file = get_file_texture_name(
-                    node_group, resolution, 'reflection', output_directory,
-                    image_format)
-            else:
-                raise ValueError(_mode)
+        _key = bake_queue.get_bake_key(_task['nodes'], resolution, _task['outputs'])
+        if skip_existing and bake_queue.is_baked(_task['outputs'], _key):
+            print "Skipping up to date bake '{}'".format(_task['name'])
+            continue
 
         # if map_list is not None and _default_file not in map_list:
         #     print("Skipping because unchecked: '{}' ...".format(_default_file))
@@ -708,10 +732,14 @@ def bake_textures(resolution, min_shading_rate, max_subdivs, admc_threshold, loc
 
         # Execute bake
         _texs = abstract_maya.bake_textures(
-            node_group, _bake_nodes, default_file=_default_file,
-            resolution=resolution, spec_file=_spec_file)
+            _task['name'], _task['nodes'],
+            default_file=_task['outputs'].get('default'),
+            resolution=resolution,
+            spec_file=_task['outputs'].get('reflection'))
         if not _texs:
-            _fails.append([node_group, _default_file])
+            _fails.append([_task['name'], _task['outputs'].get('default')])
+        else:
+            bake_queue.write_sidecars(_task['outputs'], _key)
 
     if _fails:
         pprint.pprint(_fails)
@@ -740,17 +768,22 @@ def delete_occluded_faces(
         far_clip,
         horizontal_steps=4,
         vertical_steps=1,
-        manual_points=[]
+        manual_points=[],
+        headless=False
     ):
 
     """
     Delete faces occluded from the oculus area
 
+    If headless is set, visibility is calculated from the mesh data rather than using the viewport, so this
+    can run in mayapy or on the farm.
+
     Returns:
         None
     """
     # Camera Settings
-    abstract_maya.turn_on_double_sided()
+    if not headless:
+        abstract_maya.turn_on_double_sided()
 
     # Get the meshes we are working with
     nodes = abstract_maya.get_mesh_children(node)
@@ -760,7 +793,10 @@ def delete_occluded_faces(
     view_points.extend(manual_points)
 
     # Do the deletion
-    abstract_maya.delete_occluded_faces(nodes, view_points, near_clip=near_clip, far_clip=far_clip)
+    if headless:
+        abstract_maya.delete_occluded_faces_headless(nodes, view_points, near_clip=near_clip, far_clip=far_clip)
+    else:
+        abstract_maya.delete_occluded_faces(nodes, view_points, near_clip=near_clip, far_clip=far_clip)
 
 
 def save_preferences(**kwargs):
@@ -789,7 +825,16 @@ def load_preferences():
 
 
 @abstract_maya.print_func_name
-def composite_maps(output_directory, resolution, image_format, reflection_mix, bake_reflection):
+def composite_maps(output_directory, resolution, image_format, reflection_mix, bake_reflection, use_houdini=False):
+    """
+    Composite the diffuse and reflection maps for each node group.
+
+    Maps are composited in process, unless use_houdini is set or OpenImageIO isn't available, in which case
+    they're composited by launching hython.
+
+    Returns:
+        bool: Whether the composite was executed
+    """
     print "COMPOSITING MAPS:\n"
     output_format = "png"
     if not bake_reflection:
@@ -806,9 +851,19 @@ def composite_maps(output_directory, resolution, image_format, reflection_mix, b
                 output_map = os.path.splitext(output_map)[0] + "." + output_format
                 map_conversion_list.append([diffuse_map, reflection_map, output_map])
 
+    if not use_houdini:
+        try:
+            import OpenImageIO  # pylint: disable=unused-import
+        except ImportError:
+            print "OpenImageIO not available - compositing maps with houdini"
+            use_houdini = True
+
     # Call to houdini to comp maps
-    result = houdini_comp.houdini_comp(map_conversion_list, reflection_mix)
-    return result
+    if use_houdini:
+        return houdini_comp.houdini_comp(map_conversion_list, reflection_mix)
+
+    map_comp.composite_maps(map_conversion_list, reflection_mix)
+    return True
 
 
 @abstract_maya.print_func_name
@@ -1074,6 +1129,11 @@ class MayaOptimizeUV(QtWidgets.QMainWindow):
                     "combines that geometry into fewer pieces and assigns "
                     "shaders to that as well, reactivates deformers for the "
                     "animations.", style2],
+            ["Bake in Background", lambda x=self.bake_textures: x(background=True),
+                    "<html>Export a scene for each of the top nodes and bake them as "
+                    "background tasks, so maya isn't locked during the bake.  Run "
+                    "'Bake Shading and Lighting' with 'skip existing' checked once "
+                    "the bakes complete to assign the textures.", style2],
             ["Composite Maps", lambda x=self.composite_maps: x(),
                      "<html>Search for reflection maps and, if they exist, composite them together with diffuse.", style2],
             ["Export FBX", lambda x=self.export_fbx: x(),
@@ -1329,14 +1389,16 @@ class MayaOptimizeUV(QtWidgets.QMainWindow):
     @abstract_maya.print_func_name
     @abstract_maya.keep_current_camera
 
-    def bake_textures(self):
+    def bake_textures(self, background=False):
         try:
             self.create_bake_structure()
             map_list = self.get_active_map_list()
             bake_textures(self.resolution, self.min_shading_rate, self.max_subdivs, self.admc_threshold,
                           self.local_subdivs_mult, self.output_directory, self.image_format, self.bake_reflection,
-                          map_list, self.use_default_material, self.edge_padding)
-            self.bake_finished()
+                          map_list, self.use_default_material, self.edge_padding,
+                          skip_existing=self.skip_existing_maps, background=background)
+            if not background:
+                self.bake_finished()
         except:
             self.update_output_files()
             raise
@@ -1,16 +1,31 @@
+import hashlib
+import json
+import shutil
 import subprocess
 import os
+import threading
 import time
 
+from psyhive.utils import thread_imap_unordered
+
 CREATE_NO_WINDOW = 0x08000000
 
+# Increment to force textures to be reconverted after changing the conversion
+CONVERTER_VERSION = 1
+MANIFEST_NAME = ".mipmap_manifest.json"
+
+_PRINT_LOCK = threading.Lock()
+
+
 def run_process(cmd):
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, creationflags=CREATE_NO_WINDOW)
+    kwargs = {"creationflags": CREATE_NO_WINDOW} if os.name == "nt" else {}
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
     (stdout, stderr) = p.communicate()
-    print "############################"
-    print " ".join(cmd)
-    print "############################"
-    print stdout
+    with _PRINT_LOCK:
+        print "############################"
+        print " ".join(cmd)
+        print "############################"
+        print stdout
     return stdout, stderr
 
 
@@ -116,3 +131,198 @@ def mipmap_texture(input_texture, output_texture, colorspace):
         mipmap_texture_colorsafe(input_texture, output_texture)
     else:
         raise Exception("Colorspace '{}' not recognized for texture '{}'".format(colorspace, input_texture))
+
+
+def get_file_hash(path, block_size=2**20):
+    """
+    Get a hash of the contents of a file.
+
+    Args:
+        path (str): File to read
+        block_size (int): Number of bytes to read at a time
+
+    Returns:
+        str: sha1 hex digest
+    """
+    sha = hashlib.sha1()
+    with open(path, "rb") as handle:
+        while True:
+            block = handle.read(block_size)
+            if not block:
+                break
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class CommandConverter(object):
+    """
+    Converter which runs an external command for each texture.
+
+    The command is a list of args which are formatted with the input texture, output texture and colorspace,
+    eg. ["maketx", "{input}", "-o", "{output}"].
+    """
+
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self.name = " ".join(cmd)
+
+    def __call__(self, input_texture, output_texture, colorspace):
+        run_process([arg.format(input=input_texture, output=output_texture, colorspace=colorspace)
+                     for arg in self.cmd])
+        if not os.path.exists(output_texture):
+            raise Exception("Failed to convert '{}' -> '{}'".format(input_texture, output_texture))
+
+
+class MipmapScheduler(object):
+    """
+    Converts a batch of textures to mipmaps on a bounded pool of workers.
+
+    Each converted texture is keyed by a hash of the source contents plus the conversion parameters, and the
+    keys are stored in a manifest file alongside the outputs. This means textures are only reconverted if their
+    contents change, rather than if their modification time changes (eg. after a copy). Sources with identical
+    contents are only converted once, and the result is copied to any other outputs.
+    """
+
+    def __init__(self, converter=None, threads=None, force=False):
+        """
+        Args:
+            converter (fn): Function taking an input texture, output texture and colorspace - by default this
+                is mipmap_texture
+            threads (int): Number of conversions to run at once
+            force (bool): Convert textures even if they are up to date
+        """
+        self.converter = converter or mipmap_texture
+        self.threads = threads
+        self.force = force
+        self.jobs = []
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def add(self, input_texture, output_texture, colorspace):
+        """
+        Add a texture to be converted.
+
+        Args:
+            input_texture (str): Source texture
+            output_texture (str): Path to write mipmap to
+            colorspace (str): Colorspace of source texture
+        """
+        self.jobs.append((input_texture, output_texture, colorspace))
+
+    def run(self, progress=True):
+        """
+        Convert any textures which are out of date.
+
+        Args:
+            progress (bool): Show a progress bar while converting
+
+        Returns:
+            list: Output textures which were written
+        """
+        # Hash each distinct source once
+        sources = sorted(set(job[0] for job in self.jobs))
+        hashes = dict(thread_imap_unordered(get_file_hash, sources, threads=self.threads))
+
+        # Group jobs which would produce identical outputs
+        groups = {}
+        for input_texture, output_texture, colorspace in self.jobs:
+            key = self.get_key(hashes[input_texture], colorspace)
+            if not self.force and self._read_key(output_texture) == key:
+                continue
+            groups.setdefault(key, []).append((input_texture, output_texture, colorspace))
+        groups = sorted(groups.items())
+
+        results = thread_imap_unordered(self._convert, groups, threads=self.threads)
+        if progress:
+            from psyhive import qt
+            for _ in qt.progress_bar(range(len(groups)), "Converting {:d} texture{}"):
+                next(results)
+        else:
+            for _ in results:
+                pass
+
+        return sorted(job[1] for _, jobs in groups for job in jobs)
+
+    def get_key(self, source_hash, colorspace):
+        """
+        Get key for converting a source texture with the current parameters.
+
+        Args:
+            source_hash (str): Hash of source contents
+            colorspace (str): Colorspace of source texture
+
+        Returns:
+            str: Conversion key
+        """
+        converter = getattr(self.converter, "name", getattr(self.converter, "__name__", str(self.converter)))
+        data = json.dumps([source_hash, colorspace, converter, CONVERTER_VERSION])
+        return hashlib.sha1(data).hexdigest()
+
+    def _convert(self, group):
+        """
+        Convert the first texture in a group and copy the result to the rest of the group.
+
+        Args:
+            group (tuple): Conversion key, list of jobs
+        """
+        key, jobs = group
+        input_texture, output_texture, colorspace = jobs[0]
+        with _PRINT_LOCK:
+            print "## Converting '{}' -> '{}'".format(input_texture, output_texture)
+        if os.path.exists(output_texture):
+            os.remove(output_texture)
+        self.converter(input_texture, output_texture, colorspace)
+        self._write_key(output_texture, key)
+        for _, copy_texture, _ in jobs[1:]:
+            shutil.copyfile(output_texture, copy_texture)
+            self._write_key(copy_texture, key)
+
+    def _get_manifest(self, output_texture):
+        """
+        Get the manifest for the directory containing the given output.
+
+        Args:
+            output_texture (str): Output texture path
+
+        Returns:
+            tuple: Manifest path, dict of keys by file name
+        """
+        path = os.path.join(os.path.dirname(output_texture), MANIFEST_NAME)
+        if path not in self._manifests:
+            try:
+                with open(path) as handle:
+                    self._manifests[path] = json.load(handle)
+            except (IOError, ValueError):
+                self._manifests[path] = {}
+        return path, self._manifests[path]
+
+    def _read_key(self, output_texture):
+        """
+        Read the conversion key which was used to write an output.
+
+        Args:
+            output_texture (str): Output texture path
+
+        Returns:
+            str|None: Conversion key, if the output exists
+        """
+        if not os.path.exists(output_texture):
+            return None
+        with self._lock:
+            return self._get_manifest(output_texture)[1].get(os.path.basename(output_texture))
+
+    def _write_key(self, output_texture, key):
+        """
+        Store the conversion key used to write an output.
+
+        The manifest is written after every conversion, so an interrupted run can be resumed.
+
+        Args:
+            output_texture (str): Output texture path
+            key (str): Conversion key
+        """
+        with self._lock:
+            path, manifest = self._get_manifest(output_texture)
+            manifest[os.path.basename(output_texture)] = key
+            with open(path, "w") as handle:
+                json.dump(manifest, handle, indent=1, sort_keys=True)
@@ -136,8 +136,10 @@ class _YetiCacheToolsUi(qt.HUiDialog3):
     def _callback__CacheWriteAssets(self):
         _samples = self.ui.Samples.value()
         _apply_on_complete = self.ui.ApplyOnComplete.isChecked()
+        _on_farm = self.ui.CacheOnFarm.isChecked()
         _outs = write_cache_from_sel_assets(
-            apply_on_complete=_apply_on_complete, samples=_samples)
+            apply_on_complete=_apply_on_complete, samples=_samples,
+            on_farm=_on_farm)
         self._redraw__Step()
 
     def _callback__CacheWriteAssetsHelp(self):
@@ -148,8 +150,10 @@ class _YetiCacheToolsUi(qt.HUiDialog3):
     def _callback__CacheWriteNode(self):
         _samples = self.ui.Samples.value()
         _apply_on_complete = self.ui.ApplyOnComplete.isChecked()
+        _on_farm = self.ui.CacheOnFarm.isChecked()
         write_cache_from_sel_yetis(
-            apply_on_complete=_apply_on_complete, samples=_samples)
+            apply_on_complete=_apply_on_complete, samples=_samples,
+            on_farm=_on_farm)
         self._redraw__Step()
 
     def _callback__CacheWriteNodeHelp(self):
@@ -160,8 +164,10 @@ class _YetiCacheToolsUi(qt.HUiDialog3):
     def _callback__CacheWriteAllNodes(self):
         _samples = self.ui.Samples.value()
         _apply_on_complete = self.ui.ApplyOnComplete.isChecked()
+        _on_farm = self.ui.CacheOnFarm.isChecked()
         write_cache_from_all_yetis(
-            apply_on_complete=_apply_on_complete, samples=_samples)
+            apply_on_complete=_apply_on_complete, samples=_samples,
+            on_farm=_on_farm)
         self._redraw__Step()
 
     def _callback__CacheWriteAllNodesHelp(self):
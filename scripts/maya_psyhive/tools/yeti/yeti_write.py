@@ -1,14 +1,21 @@
-"""Tools for managing yeti caching."""
+"""Tools for managing yeti caching.
 
+Caches are written a chunk of frames at a time to a tmp dir, and each
+chunk is moved into place as soon as it completes. A manifest is kept
+next to each output recording which frames have been written, so that
+a partially written cache can be resumed.
+"""
+
+import json
 import os
 import shutil
 import tempfile
 
 from maya import cmds
 
-from psyhive import tk2, host, qt, icons
+from psyhive import tk2, host, qt, icons, farm
 from psyhive.utils import (
-    abs_path, Seq, safe_zip, lprint, Dir, dprint, get_plural)
+    abs_path, Seq, safe_zip, lprint, dprint, get_plural, test_path)
 
 from maya_psyhive import ref
 from maya_psyhive import open_maya as hom
@@ -17,15 +24,23 @@ from maya_psyhive.utils import restore_sel, restore_frame
 from maya_psyhive.tools.yeti.yeti_read import apply_cache
 
 
+_CHUNK_SIZE = 10
+
+
 @restore_frame
 @restore_sel
-def _cache_yetis(yetis, apply_on_complete=False, samples=3, verbose=0):
+def _cache_yetis(yetis, apply_on_complete=False, samples=3, on_farm=False,
+                 local=False, verbose=0):
     """Cache a list of yeti nodes.
 
     Args:
         yetis (HFnDependencyNode list): nodes to cache
-        apply_on_complete (bool): apply cache on completion
+        apply_on_complete (bool): apply cache on completion (on the farm,
+            caches are applied on submission, and are read once the
+            tasks have written them)
         samples (int): samples per frame
+        on_farm (bool): cache each node in a separate mayapy task
+        local (bool): execute farm tasks on the local machine
         verbose (int): print process data
     """
     from . import yeti_ui
@@ -34,49 +49,33 @@ def _cache_yetis(yetis, apply_on_complete=False, samples=3, verbose=0):
     _work = tk2.cur_work()
     _yetis, _outs, _namespaces = _prepare_yetis_and_outputs(
         yetis=yetis, work=_work)
-
-    # Get cache path - if multiple namespace need to cache to tmp
-    _tmp_fmt = abs_path('{}/yetiTmp/<NAME>.%04d.cache'.format(
-        tempfile.gettempdir()))
-    if len(_yetis) > 1:
-        _cache_path = _tmp_fmt
-        _tmp_dir = Dir(os.path.dirname(_tmp_fmt))
-        _tmp_dir.delete(force=True)
-        _tmp_dir.test_path()
-    else:
-        assert len(_outs) == 1
-        _cache_path = _outs[0].path
-    print "CACHE PATH", _cache_path
+    _paths = [_out.path for _out in _outs]
+
+    # Submit caches to farm
+    if on_farm:
+        _submit_cache_job(
+            yetis=[str(_yeti) for _yeti in _yetis], paths=_paths,
+            samples=samples, local=local)
+        _msg = 'Submitted {:d} yeti node{} to cache.'.format(
+            len(_yetis), get_plural(_yetis))
+        if apply_on_complete:
+            _apply_caches(yetis=_yetis, caches=_outs)
+            _msg += ('\n\nThe caches have been applied, and will be read '
+                     'once the farm tasks have written them.')
+        qt.notify(
+            _msg+'\n\nSee script editor for details.',
+            title='Cache submitted', icon=yeti_ui.ICON,
+            parent=yeti_ui.DIALOG)
+        return _outs
 
     # Generate caches
-    dprint('GENERATING CACHES', _cache_path)
-    print ' - SAMPLES', samples
-    for _yeti in _yetis:
-        _yeti.plug('cacheFileName').set_val('')
-        _yeti.plug('fileMode').set_val(0)
-        _yeti.plug('overrideCacheWithInputs').set_val(False)
-    cmds.select(_yetis)
-    cmds.pgYetiCommand(
-        writeCache=_cache_path, range=host.t_range(), samples=samples)
-    dprint('GENERATED CACHES', _cache_path)
-
-    # Move tmp caches to outputs
-    if len(_yetis) > 1:
-        dprint('MOVING CACHES FROM TMP')
-        for _yeti, _out in safe_zip(_yetis, _outs):
-            print ' - MOVING', _out.path
-            _name = str(_yeti).replace(":", "_")
-            _tmp_seq = Seq(_tmp_fmt.replace('<NAME>', _name))
-            for _frame, _tmp_path in safe_zip(
-                    _tmp_seq.get_frames(), _tmp_seq.get_paths()):
-                lprint('   -', _frame, _tmp_path, verbose=verbose)
-                shutil.move(_tmp_path, _out[_frame])
+    write_yeti_caches(
+        yetis=[str(_yeti) for _yeti in _yetis], paths=_paths,
+        frames=host.t_frames(), samples=samples, verbose=verbose)
 
     # Apply cache to yeti nodes
     if apply_on_complete:
-        dprint('APPLYING CACHES TO YETIS')
-        for _yeti, _cache in safe_zip(_yetis, _outs):
-            apply_cache(cache=_cache, yeti=_yeti)
+        _apply_caches(yetis=_yetis, caches=_outs)
 
     qt.notify(
         'Cached {:d} yeti node{}.\n\nSee script editor for details.'.format(
@@ -86,6 +85,252 @@ def _cache_yetis(yetis, apply_on_complete=False, samples=3, verbose=0):
     return _outs
 
 
+def _apply_caches(yetis, caches):
+    """Apply caches to the yeti nodes they were written from.
+
+    Args:
+        yetis (HFnDependencyNode list): yeti nodes
+        caches (TTOutputFileSeq list): cache for each node
+    """
+    dprint('APPLYING CACHES TO YETIS')
+    for _yeti, _cache in safe_zip(yetis, caches):
+        apply_cache(cache=_cache, yeti=_yeti)
+
+
+def _get_chunks(frames, chunk_size):
+    """Split a list of frames into chunks of consecutive frames.
+
+    Args:
+        frames (int list): frames to split
+        chunk_size (int): maximum frames in a chunk
+
+    Returns:
+        (int list list): chunks
+    """
+    _chunks = []
+    for _frame in sorted(frames):
+        if (
+                _chunks and
+                _chunks[-1][-1] == _frame-1 and
+                len(_chunks[-1]) < chunk_size):
+            _chunks[-1].append(_frame)
+        else:
+            _chunks.append([_frame])
+    return _chunks
+
+
+def _get_manifest_path(path):
+    """Get path to the manifest for the given cache.
+
+    Args:
+        path (str): path to cache sequence
+
+    Returns:
+        (str): path to manifest
+    """
+    _seq = Seq(path)
+    return '{}/.{}.json'.format(_seq.dir, _seq.basename)
+
+
+def _read_manifest(path):
+    """Read manifest for the given cache.
+
+    Args:
+        path (str): path to cache sequence
+
+    Returns:
+        (dict): manifest data (empty if there is no manifest)
+    """
+    try:
+        with open(_get_manifest_path(path)) as _handle:
+            return json.load(_handle)
+    except (IOError, ValueError):
+        return {}
+
+
+def _write_manifest(path, yeti, samples, frames, complete=False):
+    """Write manifest for the given cache.
+
+    Args:
+        path (str): path to cache sequence
+        yeti (str): yeti node being cached
+        samples (int): samples per frame
+        frames (int list): frames which have been written
+        complete (bool): whether all frames have been written
+    """
+    _manifest = _get_manifest_path(path)
+    test_path(os.path.dirname(_manifest))
+    with open(_manifest, 'w') as _handle:
+        json.dump({'yeti': yeti, 'samples': samples,
+                   'frames': sorted(frames), 'complete': complete},
+                  _handle, indent=1, sort_keys=True)
+
+
+def _read_written_frames(path, yeti, samples):
+    """Read frames of a cache which have already been written.
+
+    Frames are only used if the manifest was written with the same
+    settings and the frame exists on disk.
+
+    Args:
+        path (str): path to cache sequence
+        yeti (str): yeti node being cached
+        samples (int): samples per frame
+
+    Returns:
+        (int set): written frames
+    """
+    _data = _read_manifest(path)
+    if _data.get('yeti') != yeti or _data.get('samples') != samples:
+        return set()
+    return set([
+        _frame for _frame in _data.get('frames', [])
+        if os.path.exists(path % _frame)])
+
+
+def is_partial_cache(path):
+    """Test whether a cache was only partially written.
+
+    Args:
+        path (str): path to cache sequence
+
+    Returns:
+        (bool): whether cache has an incomplete manifest
+    """
+    _data = _read_manifest(path)
+    return bool(_data) and not _data.get('complete')
+
+
+def write_yeti_caches(yetis, paths, frames, samples=3,
+                      chunk_size=_CHUNK_SIZE, verbose=0):
+    """Write caches for a list of yeti nodes.
+
+    Frames already recorded in each cache's manifest are skipped, and the
+    remaining frames are written in chunks. All nodes which need a chunk
+    are cached in the same pgYetiCommand call, and each frame is moved to
+    its output and recorded in the manifest as soon as its chunk
+    completes.
+
+    Args:
+        yetis (str list): yeti nodes to cache
+        paths (str list): output sequence path for each node
+        frames (int list): frames to cache
+        samples (int): samples per frame
+        chunk_size (int): maximum frames to cache per pgYetiCommand call
+        verbose (int): print process data
+    """
+    _frames = set(frames)
+    _written = {}
+    for _yeti, _path in safe_zip(yetis, paths):
+        _written[_yeti] = _read_written_frames(
+            path=_path, yeti=_yeti, samples=samples) & _frames
+        if _written[_yeti]:
+            print ' - RESUMING {} ({:d}/{:d} FRAMES WRITTEN)'.format(
+                _yeti, len(_written[_yeti]), len(_frames))
+        test_path(os.path.dirname(_path))
+    _todo = set()
+    for _yeti in yetis:
+        _todo |= _frames - _written[_yeti]
+
+    dprint('GENERATING CACHES')
+    print ' - SAMPLES', samples
+    for _yeti in yetis:
+        cmds.setAttr(_yeti+'.cacheFileName', '', type='string')
+        cmds.setAttr(_yeti+'.fileMode', 0)
+        cmds.setAttr(_yeti+'.overrideCacheWithInputs', False)
+
+    _tmp_dir = tempfile.mkdtemp(prefix='yetiTmp')
+    try:
+        for _chunk in _get_chunks(_todo, chunk_size=chunk_size):
+
+            # Cache nodes which need any of these frames
+            _yetis = [_yeti for _yeti in yetis
+                      if set(_chunk) - _written[_yeti]]
+            _tmp_fmt = abs_path('{}/<NAME>.%04d.cache'.format(_tmp_dir))
+            if len(_yetis) == 1:
+                _tmp_fmt = _tmp_fmt.replace(
+                    '<NAME>', _yetis[0].replace(':', '_'))
+            print ' - CACHING FRAMES {:d}-{:d}'.format(_chunk[0], _chunk[-1])
+            cmds.select(_yetis)
+            cmds.pgYetiCommand(
+                writeCache=_tmp_fmt, range=(_chunk[0], _chunk[-1]),
+                samples=samples)
+
+            # Move frames to outputs
+            for _yeti in _yetis:
+                _path = paths[yetis.index(_yeti)]
+                _tmp_seq = _tmp_fmt.replace('<NAME>', _yeti.replace(':', '_'))
+                for _frame in _chunk:
+                    lprint('   -', _yeti, _frame, verbose=verbose)
+                    if _frame in _written[_yeti]:
+                        continue
+                    shutil.move(_tmp_seq % _frame, _path % _frame)
+                    _written[_yeti].add(_frame)
+                _write_manifest(
+                    path=_path, yeti=_yeti, samples=samples,
+                    frames=_written[_yeti])
+    finally:
+        shutil.rmtree(_tmp_dir, ignore_errors=True)
+
+    for _yeti, _path in safe_zip(yetis, paths):
+        _write_manifest(path=_path, yeti=_yeti, samples=samples,
+                        frames=_written[_yeti], complete=True)
+    dprint('GENERATED CACHES')
+
+
+def _submit_cache_job(yetis, paths, samples, local=False, group_size=1):
+    """Submit yeti caching to the farm.
+
+    A copy of the current scene is saved next to the caches, and the
+    nodes are split into groups which are each cached in a separate
+    mayapy task.
+
+    Args:
+        yetis (str list): yeti nodes to cache
+        paths (str list): output sequence path for each node
+        samples (int): samples per frame
+        local (bool): execute tasks on the local machine
+        group_size (int): number of nodes to cache in each task
+    """
+    _scene = abs_path('{}/.yeti_cache_scene.mb'.format(Seq(paths[0]).dir))
+    print 'SAVING SCENE', _scene
+    cmds.file(_scene, exportAll=True, type='mayaBinary', force=True,
+              preserveReferences=True)
+
+    _start, _end = host.t_range(int)
+    _job = farm.MayaPyJob('Cache {:d} yeti node{}'.format(
+        len(yetis), get_plural(yetis)))
+    for _idx in range(0, len(yetis), group_size):
+        _yetis = yetis[_idx: _idx+group_size]
+        _paths = paths[_idx: _idx+group_size]
+        _py = '\n'.join([
+            'from maya_psyhive.tools.yeti import yeti_write',
+            'yeti_write.run_cache_task(',
+            '    scene={scene!r}, yetis={yetis!r}, paths={paths!r},',
+            '    frames=range({start:d}, {end:d}+1), samples={samples:d})',
+        ]).format(scene=_scene, yetis=_yetis, paths=_paths, start=_start,
+                  end=_end, samples=samples)
+        _job.tasks.append(farm.MayaPyTask(
+            _py, label='Cache {}'.format(', '.join(_yetis))))
+    _job.submit(local=local)
+
+
+def run_cache_task(scene, yetis, paths, frames, samples):
+    """Write yeti caches from a farm task.
+
+    Args:
+        scene (str): scene to open
+        yetis (str list): yeti nodes to cache
+        paths (str list): output sequence path for each node
+        frames (int list): frames to cache
+        samples (int): samples per frame
+    """
+    cmds.loadPlugin('pgYetiMaya', quiet=True)
+    cmds.file(scene, open=True, force=True)
+    write_yeti_caches(yetis=yetis, paths=paths, frames=frames,
+                      samples=samples)
+
+
 def yeti_to_output(yeti, work=None):
     """Get output for the given yeti node.
 
@@ -109,6 +354,9 @@ def yeti_to_output(yeti, work=None):
 def _prepare_yetis_and_outputs(yetis, work):
     """Make sure all yetis are yeti shapes nodes and warn on output overwrite.
 
+    If an existing output was only partially written, the user is given
+    the option to resume it.
+
     Args:
         yetis (HFnDependencyNode list): nodes to cache
         work (TTWorkFileBase): work file being cached from
@@ -142,15 +390,21 @@ def _prepare_yetis_and_outputs(yetis, work):
             _buttons = ['Yes', 'Cancel']
             if len(yetis) > 1:
                 _buttons.insert(1, 'Yes to all')
+            _partial = is_partial_cache(_out.path)
+            if _partial:
+                _buttons.insert(0, 'Resume')
             _start, _end = _out.find_range()
             _result = 'Yes' if _force else qt.raise_dialog(
-                'Replace existing {} cache ({:d}-{:d})?\n\n{}'.format(
-                    _yeti, _start, _end, _out.path),
+                'Replace existing {}{} cache ({:d}-{:d})?\n\n{}'.format(
+                    'partial ' if _partial else '', _yeti, _start, _end,
+                    _out.path),
                 title='Replace existing', buttons=_buttons,
                 icon=icons.EMOJI.find("Ghost"))
 
             # Apply result
-            if _result == 'Yes to all':
+            if _result == 'Resume':
+                continue
+            elif _result == 'Yes to all':
                 _force = True
             elif _result == 'Yes':
                 pass
@@ -158,11 +412,14 @@ def _prepare_yetis_and_outputs(yetis, work):
                 raise qt.DialogCancelled
 
             _out.delete(force=True)
+            if os.path.exists(_get_manifest_path(_out.path)):
+                os.remove(_get_manifest_path(_out.path))
 
     return _yetis, _outs, _namespaces
 
 
-def write_cache_from_sel_assets(apply_on_complete=False, samples=3):
+def write_cache_from_sel_assets(
+        apply_on_complete=False, samples=3, on_farm=False):
     """Cache selected asset.
 
     All yeti nodes in the selected asset are cached.
@@ -172,6 +429,7 @@ def write_cache_from_sel_assets(apply_on_complete=False, samples=3):
     Args:
         apply_on_complete (bool): apply cache on completion
         samples (int): samples per frame
+        on_farm (bool): cache each node in a separate farm task
 
     Returns:
         (TTOutputFileSeq list): caches generated
@@ -194,10 +452,11 @@ def write_cache_from_sel_assets(apply_on_complete=False, samples=3):
         return None
 
     return _cache_yetis(_yetis, apply_on_complete=apply_on_complete,
-                        samples=samples)
+                        samples=samples, on_farm=on_farm)
 
 
-def write_cache_from_sel_yetis(apply_on_complete=False, samples=3):
+def write_cache_from_sel_yetis(
+        apply_on_complete=False, samples=3, on_farm=False):
     """Write a yeti cache from selected yeti nodes.
 
     All selected pgYetiMaya nodes are cached.
@@ -208,6 +467,7 @@ def write_cache_from_sel_yetis(apply_on_complete=False, samples=3):
     Args:
         apply_on_complete (bool): apply cache on completion
         samples (int): samples per frame
+        on_farm (bool): cache each node in a separate farm task
 
     Returns:
         (TTOutputFileSeq list): caches generated
@@ -220,15 +480,17 @@ def write_cache_from_sel_yetis(apply_on_complete=False, samples=3):
                           "more yeti nodes.", parent=yeti_ui.DIALOG)
         return None
     return _cache_yetis(_yetis, apply_on_complete=apply_on_complete,
-                        samples=samples)
+                        samples=samples, on_farm=on_farm)
 
 
-def write_cache_from_all_yetis(apply_on_complete=False, samples=3):
+def write_cache_from_all_yetis(
+        apply_on_complete=False, samples=3, on_farm=False):
     """Write a yeti cache from all yeti nodes in the scene.
 
     Args:
         apply_on_complete (bool): apply cache on completion
         samples (int): samples per frame
+        on_farm (bool): cache each node in a separate farm task
 
     Returns:
         (TTOutputFileSeq list): caches generated
@@ -241,4 +503,4 @@ def write_cache_from_all_yetis(apply_on_complete=False, samples=3):
                           parent=yeti_ui.DIALOG)
         return None
     return _cache_yetis(_yetis, apply_on_complete=apply_on_complete,
-                        samples=samples)
+                        samples=samples, on_farm=on_farm)
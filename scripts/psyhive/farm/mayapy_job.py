@@ -176,4 +176,7 @@ def _get_job_environ(local=False):
     print "PSYQ_PLUGIN_PATH", _plugin_path
     _result["PSYQ_PLUGIN_PATH"] = _plugin_path
 
+    # Use stored shotgun responses without updating them
+    _result["PSYHIVE_SG_CACHE_READ_ONLY"] = "1"
+
     return _result
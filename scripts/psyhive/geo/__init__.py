@@ -0,0 +1,14 @@
+"""Tools for processing geometry stored in numpy arrays.
+
+These don't depend on any dcc, so they can be run in batch or tested
+outside of maya.
+"""
+
+from .geo_mesh import (
+    get_back_face_mask, get_face_centroids, get_face_normals,
+    get_face_areas)
+from .geo_occlusion import find_visible_faces
+from .geo_pack import partition_by_area
+from .geo_uv import (
+    get_uv_shell_ids, get_uv_face_areas, get_shell_bboxes,
+    get_shell_totals, get_texel_density_scales, scale_uv_shells)
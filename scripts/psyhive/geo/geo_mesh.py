@@ -0,0 +1,124 @@
+"""Tools for analysing polygon meshes stored in numpy arrays.
+
+Meshes are described in the same way as maya's MFnMesh, ie. an array of
+point positions, an array of vertex counts for each face, and an array
+of point indices for each face vertex.
+"""
+
+import numpy
+
+
+def get_back_face_mask(centroids, normals, view_point):
+    """Find which faces are facing away from the given view point.
+
+    Args:
+        centroids (ndarray): face centroids (N x 3)
+        normals (ndarray): face normals (N x 3)
+        view_point (tuple): view point position
+
+    Returns:
+        (ndarray): boolean mask of back faces
+    """
+    _look = centroids - numpy.asarray(
+        [view_point[0], view_point[1], view_point[2]], dtype=numpy.float64)
+    return numpy.einsum('ij,ij->i', normals, _look) >= 0
+
+
+def get_face_areas(points, counts, indices):
+    """Get area of each face.
+
+    Args:
+        points (ndarray): point positions (P x 3)
+        counts (ndarray): number of vertices in each face
+        indices (ndarray): point index of each face vertex
+
+    Returns:
+        (ndarray): face areas
+    """
+    return numpy.linalg.norm(
+        _get_newell_vectors(points, counts, indices), axis=1)*0.5
+
+
+def get_face_centroids(points, counts, indices):
+    """Get centroid of each face (ie. the mean of its vertices).
+
+    Args:
+        points (ndarray): point positions (P x 3)
+        counts (ndarray): number of vertices in each face
+        indices (ndarray): point index of each face vertex
+
+    Returns:
+        (ndarray): face centroids (N x 3)
+    """
+    _points = numpy.asarray(points, dtype=numpy.float64)
+    _counts = numpy.asarray(counts, dtype=int)
+    _sums = numpy.add.reduceat(
+        _points[numpy.asarray(indices, dtype=int)],
+        _get_face_starts(_counts), axis=0)
+    return _sums/_counts[:, None]
+
+
+def get_face_normals(points, counts, indices):
+    """Get normal of each face.
+
+    Normals are calculated using Newell's method, so they are well
+    defined for non-planar faces, and are normalised. Degenerate faces
+    have a zero normal.
+
+    Args:
+        points (ndarray): point positions (P x 3)
+        counts (ndarray): number of vertices in each face
+        indices (ndarray): point index of each face vertex
+
+    Returns:
+        (ndarray): face normals (N x 3)
+    """
+    _normals = _get_newell_vectors(points, counts, indices)
+    _lengths = numpy.linalg.norm(_normals, axis=1)
+    _lengths[_lengths == 0] = 1.0
+    return _normals/_lengths[:, None]
+
+
+def _get_face_starts(counts):
+    """Get index of first face vertex of each face.
+
+    Args:
+        counts (ndarray): number of vertices in each face
+
+    Returns:
+        (ndarray): start indices
+    """
+    return numpy.cumsum(counts) - counts
+
+
+def _get_newell_vectors(points, counts, indices):
+    """Get Newell's normal vector of each face.
+
+    The length of each vector is twice the area of the face.
+
+    Args:
+        points (ndarray): point positions (P x 3)
+        counts (ndarray): number of vertices in each face
+        indices (ndarray): point index of each face vertex
+
+    Returns:
+        (ndarray): unnormalised face normals (N x 3)
+    """
+    _points = numpy.asarray(points, dtype=numpy.float64)
+    _counts = numpy.asarray(counts, dtype=int)
+    _starts = _get_face_starts(_counts)
+
+    # Find next vertex of each face vertex, wrapping within each face
+    _next = numpy.arange(1, len(indices)+1)
+    _next[_starts + _counts - 1] = _starts
+    _indices = numpy.asarray(indices, dtype=int)
+    _cur_pts = _points[_indices]
+    _next_pts = _points[_indices[_next]]
+
+    _diff = _cur_pts - _next_pts
+    _sum = _cur_pts + _next_pts
+    _terms = numpy.stack([
+        _diff[:, 1]*_sum[:, 2],
+        _diff[:, 2]*_sum[:, 0],
+        _diff[:, 0]*_sum[:, 1]], axis=1)
+    return numpy.add.reduceat(_terms, _starts, axis=0)
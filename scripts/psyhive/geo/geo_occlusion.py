@@ -0,0 +1,216 @@
+"""Tools for finding which triangles are visible from a set of points.
+
+Visibility is calculated by rendering a depth buffer for each face of a
+cube map centred on each view point, so every direction is covered at
+the same sample density.
+"""
+
+import numpy
+
+from psyhive.utils import lprint
+
+# Rotations to camera space (rows are right, up, forward)
+_CUBE_ROTATIONS = [
+    numpy.array(_rot, dtype=numpy.float64) for _rot in [
+        [[0, 0, -1], [0, 1, 0], [1, 0, 0]],
+        [[0, 0, 1], [0, 1, 0], [-1, 0, 0]],
+        [[1, 0, 0], [0, 0, -1], [0, 1, 0]],
+        [[1, 0, 0], [0, 0, 1], [0, -1, 0]],
+        [[1, 0, 0], [0, 1, 0], [0, 0, 1]],
+        [[-1, 0, 0], [0, 1, 0], [0, 0, -1]],
+    ]]
+_MAX_SAMPLES = 2**20
+
+
+def find_visible_faces(
+        tris, view_points, face_ids=None, resolution=256, near_clip=0.01,
+        far_clip=None, verbose=0):
+    """Find faces which are visible from any of the given view points.
+
+    Args:
+        tris (ndarray): triangle vertex positions (N x 3 x 3)
+        view_points (list): view point positions
+        face_ids (ndarray): face index of each triangle (if triangles
+            have been read from polygons) - by default each triangle
+            is treated as a face
+        resolution (int): width/height of each cube map face in samples
+        near_clip (float): ignore geometry closer than this
+        far_clip (float): ignore geometry further than this
+        verbose (int): print process data
+
+    Returns:
+        (ndarray): sorted indices of visible faces
+    """
+    _near_clip = max(near_clip, 1e-6)
+    _tris = numpy.asarray(tris, dtype=numpy.float64).reshape(-1, 3, 3)
+    _face_ids = (numpy.arange(len(_tris)) if face_ids is None
+                 else numpy.asarray(face_ids))
+    _visible = numpy.zeros(len(_tris), dtype=bool)
+    for _point in view_points:
+        _rel_tris = _tris - numpy.asarray(
+            [_point[0], _point[1], _point[2]], dtype=numpy.float64)
+        for _rot in _CUBE_ROTATIONS:
+            _idxs = _render_visible_tris(
+                numpy.einsum('ij,nkj->nki', _rot, _rel_tris),
+                resolution=resolution, near_clip=_near_clip,
+                far_clip=far_clip)
+            _visible[_idxs] = True
+        lprint(' - VIEW POINT', _point, _visible.sum(), verbose=verbose)
+    return numpy.unique(_face_ids[_visible])
+
+
+def _clip_near(tris, idxs, near_clip):
+    """Clip triangles against the near clip plane.
+
+    Triangles with one vertex behind the plane are split into two
+    triangles, and triangles with two vertices behind the plane are
+    shortened.
+
+    Args:
+        tris (ndarray): camera space triangles (N x 3 x 3)
+        idxs (ndarray): triangle indices
+        near_clip (float): near clip distance
+
+    Returns:
+        (tuple): clipped triangles, triangle indices
+    """
+    _behind = tris[:, :, 2] < near_clip
+    _count = _behind.sum(axis=1)
+    _results = [(tris[_count == 0], idxs[_count == 0])]
+
+    for _n_behind in (1, 2):
+        _mask = _count == _n_behind
+        if not _mask.any():
+            continue
+        _tris = tris[_mask]
+
+        # Roll vertices so that the odd one out is first
+        _odd = _behind[_mask] if _n_behind == 1 else ~_behind[_mask]
+        _shift = numpy.argmax(_odd, axis=1)
+        _order = (numpy.arange(3)[None, :] + _shift[:, None]) % 3
+        _tris = _tris[numpy.arange(len(_tris))[:, None], _order]
+        _pt_a, _pt_b, _pt_c = _tris[:, 0], _tris[:, 1], _tris[:, 2]
+
+        # Find intersections of edges AB/AC with plane
+        _t_ab = ((near_clip - _pt_a[:, 2]) /
+                 (_pt_b[:, 2] - _pt_a[:, 2]))[:, None]
+        _t_ac = ((near_clip - _pt_a[:, 2]) /
+                 (_pt_c[:, 2] - _pt_a[:, 2]))[:, None]
+        _pt_ab = _pt_a + (_pt_b - _pt_a)*_t_ab
+        _pt_ac = _pt_a + (_pt_c - _pt_a)*_t_ac
+
+        _idxs = idxs[_mask]
+        if _n_behind == 1:
+            _results.append((
+                numpy.stack([_pt_ab, _pt_b, _pt_c], axis=1), _idxs))
+            _results.append((
+                numpy.stack([_pt_ab, _pt_c, _pt_ac], axis=1), _idxs))
+        else:
+            _results.append((
+                numpy.stack([_pt_a, _pt_ab, _pt_ac], axis=1), _idxs))
+
+    return (numpy.concatenate([_tris for _tris, _ in _results]),
+            numpy.concatenate([_idxs for _, _idxs in _results]))
+
+
+def _render_visible_tris(tris, resolution, near_clip, far_clip=None):
+    """Find triangles visible in a 90 degree camera looking down +z.
+
+    Args:
+        tris (ndarray): camera space triangles (N x 3 x 3)
+        resolution (int): width/height of depth buffer
+        near_clip (float): near clip distance
+        far_clip (float): far clip distance
+
+    Returns:
+        (ndarray): indices of visible triangles
+    """
+    _x, _y, _z = tris[:, :, 0], tris[:, :, 1], tris[:, :, 2]
+
+    # Discard triangles outside frustum
+    _outside = (
+        (_z < near_clip).all(axis=1) |
+        (_x > _z).all(axis=1) | (_x < -_z).all(axis=1) |
+        (_y > _z).all(axis=1) | (_y < -_z).all(axis=1))
+    if far_clip:
+        _outside |= (_z > far_clip).all(axis=1)
+    _idxs = numpy.flatnonzero(~_outside)
+    if not len(_idxs):
+        return _idxs
+    _tris, _idxs = _clip_near(tris[_idxs], _idxs, near_clip)
+
+    # Sort near to far so that hidden samples are discarded early
+    _order = numpy.argsort(_tris[:, :, 2].min(axis=1))
+    _tris, _idxs = _tris[_order], _idxs[_order]
+
+    # Project to sample space
+    _inv_z = 1.0/_tris[:, :, 2]
+    _half = resolution*0.5
+    _sx = _tris[:, :, 0]*_inv_z*_half + _half
+    _sy = _tris[:, :, 1]*_inv_z*_half + _half
+
+    # Find sample bounding boxes (samples are at pixel centres)
+    _x0 = numpy.clip(
+        numpy.ceil(_sx.min(axis=1) - 0.5), 0, resolution).astype(int)
+    _x1 = numpy.clip(
+        numpy.floor(_sx.max(axis=1) - 0.5), -1, resolution-1).astype(int)
+    _y0 = numpy.clip(
+        numpy.ceil(_sy.min(axis=1) - 0.5), 0, resolution).astype(int)
+    _y1 = numpy.clip(
+        numpy.floor(_sy.max(axis=1) - 0.5), -1, resolution-1).astype(int)
+    _width = numpy.maximum(_x1 - _x0 + 1, 0)
+    _counts = _width*numpy.maximum(_y1 - _y0 + 1, 0)
+
+    _depth = numpy.full(resolution*resolution, -numpy.inf)
+    _owner = numpy.full(resolution*resolution, -1, dtype=int)
+    _min_inv_z = 1.0/far_clip if far_clip else 0.0
+
+    # Rasterise in chunks to bound memory use
+    _start = 0
+    _cumulative = numpy.cumsum(_counts)
+    while _start < len(_tris):
+        _offset = _cumulative[_start-1] if _start else 0
+        _end = max(numpy.searchsorted(
+            _cumulative, _offset + _MAX_SAMPLES, side='right'), _start+1)
+        _chunk = numpy.arange(_start, _end)
+        _start = _end
+
+        _rep = numpy.repeat(_chunk, _counts[_chunk])
+        if not len(_rep):
+            continue
+        _local = numpy.arange(len(_rep)) - numpy.repeat(
+            _cumulative[_chunk] - _counts[_chunk] - _offset,
+            _counts[_chunk])
+        _px = _x0[_rep] + _local % _width[_rep]
+        _py = _y0[_rep] + _local // _width[_rep]
+
+        # Find barycentric coords of samples
+        _ax, _bx, _cx = _sx[_rep, 0], _sx[_rep, 1], _sx[_rep, 2]
+        _ay, _by, _cy = _sy[_rep, 0], _sy[_rep, 1], _sy[_rep, 2]
+        _area = (_bx - _ax)*(_cy - _ay) - (_by - _ay)*(_cx - _ax)
+        _valid = _area != 0
+        _area[~_valid] = 1.0
+        _qx, _qy = _px + 0.5, _py + 0.5
+        _w_a = ((_bx - _qx)*(_cy - _qy) - (_by - _qy)*(_cx - _qx))/_area
+        _w_b = ((_cx - _qx)*(_ay - _qy) - (_cy - _qy)*(_ax - _qx))/_area
+        _w_c = 1.0 - _w_a - _w_b
+        _sample_inv_z = (
+            _w_a*_inv_z[_rep, 0] + _w_b*_inv_z[_rep, 1] +
+            _w_c*_inv_z[_rep, 2])
+        _inside = (
+            _valid & (_w_a >= 0) & (_w_b >= 0) & (_w_c >= 0) &
+            (_sample_inv_z >= _min_inv_z))
+
+        # Discard samples behind the current depth buffer
+        _pixel = _py*resolution + _px
+        _inside &= _sample_inv_z > _depth[_pixel]
+        _pixel = _pixel[_inside]
+        _sample_inv_z = _sample_inv_z[_inside]
+        _rep = _rep[_inside]
+
+        # Write samples far to near, so nearest sample is written last
+        _order = numpy.argsort(_sample_inv_z)
+        _depth[_pixel[_order]] = _sample_inv_z[_order]
+        _owner[_pixel[_order]] = _rep[_order]
+
+    return numpy.unique(_idxs[_owner[_owner >= 0]])
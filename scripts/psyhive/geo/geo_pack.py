@@ -0,0 +1,200 @@
+"""Tools for partitioning items between bins of equal capacity.
+
+This is used to spread objects across texture maps so that each map
+receives a similar uv area.
+"""
+
+import numpy
+
+from psyhive.utils import lprint
+
+
+def partition_by_area(
+        items, bin_count, initial_areas=None, locality=0.0,
+        max_moves=None, verbose=0):
+    """Partition items between bins so that their total areas balance.
+
+    Items are first placed largest first into the emptiest bin (LPT),
+    and then the fullest bin is repeatedly relieved by moving or
+    swapping items with other bins until no move improves the balance.
+
+    If a locality weight is given, an item placed in a bin is penalised
+    by its distance from the area-weighted centre of the items already
+    in that bin, relative to the size of the scene. A weight of 1.0
+    treats crossing the whole scene as costing one bin's worth of area.
+    During refinement, locality only chooses between moves which
+    improve the balance.
+
+    Args:
+        items (tuple list): name, area, centre of each item - centres
+            are only read if locality is applied
+        bin_count (int): number of bins
+        initial_areas (float list): area already used in each bin
+        locality (float): weighting for keeping nearby items together
+        max_moves (int): limit number of refinement moves
+        verbose (int): print process data
+
+    Returns:
+        (tuple): names in each bin, fill ratio of each bin (ie. area
+            relative to an even split of the total area)
+    """
+    _names = [_item[0] for _item in items]
+    _areas = numpy.array([_item[1] for _item in items], dtype=numpy.float64)
+    _loads = numpy.zeros(bin_count)
+    if initial_areas is not None:
+        _loads += numpy.asarray(initial_areas, dtype=numpy.float64)
+    _target = (_areas.sum() + _loads.sum())/bin_count or 1.0
+
+    # Read centres
+    _centres = _weight = None
+    if locality and len(items):
+        _centres = numpy.array(
+            [_item[2] for _item in items],
+            dtype=numpy.float64).reshape(len(items), -1)
+        _extent = _centres.ptp(axis=0).max() or 1.0
+        _weight = locality*_target/_extent
+
+    # Place largest items first into emptiest bin
+    _bins = numpy.zeros(len(items), dtype=int)
+    _sums = (numpy.zeros((bin_count, _centres.shape[1]))
+             if _weight else None)
+    _item_loads = numpy.zeros(bin_count)
+    for _idx in numpy.argsort(-_areas, kind='mergesort'):
+        _cost = _loads.copy()
+        if _weight:
+            _cost += _weight*_get_dists(
+                _centres[_idx], _sums, _item_loads)
+        _bin = int(numpy.argmin(_cost))
+        _bins[_idx] = _bin
+        _loads[_bin] += _areas[_idx]
+        _item_loads[_bin] += _areas[_idx]
+        if _weight:
+            _sums[_bin] += _centres[_idx]*_areas[_idx]
+
+    # Refine by relieving fullest bin
+    _moves = 0
+    while max_moves is None or _moves < max_moves:
+        if not _relieve_fullest_bin(
+                _areas, _bins, _loads, centres=_centres, weight=_weight):
+            break
+        _moves += 1
+    lprint('REFINED PARTITION IN {:d} MOVES'.format(_moves),
+           verbose=verbose)
+
+    _groups = [[] for _ in range(bin_count)]
+    for _name, _bin in zip(_names, _bins):
+        _groups[_bin].append(_name)
+    _fills = (_loads/_target).tolist()
+    for _idx, (_group, _fill) in enumerate(zip(_groups, _fills)):
+        lprint(' - BIN {:d} {:d} ITEMS {:.01f}% FILL'.format(
+            _idx, len(_group), _fill*100), verbose=verbose)
+    return _groups, _fills
+
+
+def _get_dists(centre, sums, loads):
+    """Get distance from a point to the centre of each bin.
+
+    Empty bins are treated as being at zero distance.
+
+    Args:
+        centre (ndarray): point to test
+        sums (ndarray): area-weighted sum of item centres in each bin
+        loads (ndarray): area of items in each bin
+
+    Returns:
+        (ndarray): distance to each bin
+    """
+    _dists = numpy.zeros(len(loads))
+    _full = loads > 0
+    _dists[_full] = numpy.linalg.norm(
+        sums[_full]/loads[_full, None] - centre, axis=1)
+    return _dists
+
+
+def _relieve_fullest_bin(areas, bins, loads, centres=None, weight=None):
+    """Apply the best move or swap which reduces the fullest bin.
+
+    A move is only accepted if both bins involved end up below the
+    current fullest load, so the sum of squared loads always falls and
+    refinement is guaranteed to finish.
+
+    Args:
+        areas (ndarray): area of each item
+        bins (ndarray): bin of each item (updated)
+        loads (ndarray): load of each bin (updated)
+        centres (ndarray): centre of each item
+        weight (float): locality weighting
+
+    Returns:
+        (bool): whether a move was applied
+    """
+    _full = int(numpy.argmax(loads))
+    _gaps = loads[_full] - loads
+    _in_full = numpy.flatnonzero(bins == _full)
+    _others = numpy.flatnonzero(bins != _full)
+    if not len(_in_full):
+        return False
+
+    # Build candidates as (item in full bin, other item or -1, bin)
+    _src = numpy.repeat(_in_full, len(loads))
+    _dest = numpy.tile(numpy.arange(len(loads)), len(_in_full))
+    _swap = numpy.full(len(_src), -1, dtype=int)
+    _src = numpy.concatenate([
+        _src, numpy.repeat(_in_full, len(_others))])
+    _swap = numpy.concatenate([_swap, numpy.tile(_others, len(_in_full))])
+    _dest = numpy.concatenate([
+        _dest, numpy.tile(bins[_others], len(_in_full))])
+
+    # Find which candidates improve the balance
+    _delta = areas[_src] - numpy.where(_swap >= 0, areas[_swap], 0.0)
+    _valid = (_dest != _full) & (_delta > 0) & (_delta < _gaps[_dest])
+    if not _valid.any():
+        return False
+    _src, _swap, _dest, _delta = (
+        _src[_valid], _swap[_valid], _dest[_valid], _delta[_valid])
+
+    # Choose best candidate
+    _score = numpy.maximum(
+        loads[_full] - _delta, loads[_dest] + _delta)
+    if weight:
+        _bin_dists = numpy.zeros((len(areas), len(loads)))
+        _bin_dists[_in_full] = _get_bin_dists(
+            _in_full, bins, areas, centres, len(loads))
+        _score = _score + weight*(
+            _bin_dists[_src, _dest] - _bin_dists[_src, _full])
+    _best = int(numpy.argmin(_score))
+
+    bins[_src[_best]] = _dest[_best]
+    if _swap[_best] >= 0:
+        bins[_swap[_best]] = _full
+    loads[_full] -= _delta[_best]
+    loads[_dest[_best]] += _delta[_best]
+    return True
+
+
+def _get_bin_dists(items, bins, areas, centres, bin_count):
+    """Get distance from items to the area-weighted centre of each bin.
+
+    Empty bins are treated as being at zero distance.
+
+    Args:
+        items (ndarray): items to test
+        bins (ndarray): bin of each item
+        areas (ndarray): area of each item
+        centres (ndarray): centre of each item
+        bin_count (int): number of bins
+
+    Returns:
+        (ndarray): distance from each item to each bin (N x B)
+    """
+    _loads = numpy.bincount(bins, weights=areas, minlength=bin_count)
+    _sums = numpy.stack([
+        numpy.bincount(bins, weights=areas*centres[:, _axis],
+                       minlength=bin_count)
+        for _axis in range(centres.shape[1])], axis=1)
+    _dists = numpy.zeros((len(items), bin_count))
+    _full = _loads > 0
+    _bin_centres = _sums[_full]/_loads[_full, None]
+    _dists[:, _full] = numpy.linalg.norm(
+        centres[items][:, None, :] - _bin_centres[None], axis=2)
+    return _dists
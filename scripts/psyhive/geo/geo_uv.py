@@ -0,0 +1,208 @@
+"""Tools for analysing uv shells of meshes stored in numpy arrays.
+
+Uvs are described in the same way as maya's MFnMesh, ie. arrays of u and
+v values, an array of the number of uvs assigned to each face (zero for
+unmapped faces), and an array of uv indices for each face vertex.
+"""
+
+import numpy
+
+
+def get_shell_bboxes(us, vs, uv_shells, shell_count):
+    """Get the uv bounding box of each shell.
+
+    Args:
+        us (ndarray): u values
+        vs (ndarray): v values
+        uv_shells (ndarray): shell index of each uv (-1 if unused)
+        shell_count (int): number of shells
+
+    Returns:
+        (ndarray): umin, umax, vmin, vmax of each shell (S x 4)
+    """
+    _bboxes = numpy.zeros((shell_count, 4))
+    _used = numpy.flatnonzero(numpy.asarray(uv_shells) >= 0)
+    if not len(_used):
+        return _bboxes
+    _order = _used[numpy.argsort(uv_shells[_used], kind='mergesort')]
+    _shells = uv_shells[_order]
+    _starts = numpy.flatnonzero(numpy.r_[True, _shells[1:] != _shells[:-1]])
+    _shell_ids = _shells[_starts]
+    _us = numpy.asarray(us, dtype=numpy.float64)[_order]
+    _vs = numpy.asarray(vs, dtype=numpy.float64)[_order]
+    _bboxes[_shell_ids, 0] = numpy.minimum.reduceat(_us, _starts)
+    _bboxes[_shell_ids, 1] = numpy.maximum.reduceat(_us, _starts)
+    _bboxes[_shell_ids, 2] = numpy.minimum.reduceat(_vs, _starts)
+    _bboxes[_shell_ids, 3] = numpy.maximum.reduceat(_vs, _starts)
+    return _bboxes
+
+
+def get_shell_totals(values, face_shells, shell_count):
+    """Sum per-face values for each shell.
+
+    Args:
+        values (ndarray): value for each face (eg. area)
+        face_shells (ndarray): shell index of each face (-1 if unmapped)
+        shell_count (int): number of shells
+
+    Returns:
+        (ndarray): total for each shell
+    """
+    _mapped = numpy.asarray(face_shells) >= 0
+    return numpy.bincount(
+        face_shells[_mapped], weights=numpy.asarray(values)[_mapped],
+        minlength=shell_count)
+
+
+def get_texel_density_scales(
+        face_areas, uv_face_areas, face_shells, shell_count, density,
+        resolution):
+    """Get uv scale for each shell required to match a texel density.
+
+    Args:
+        face_areas (ndarray): world space area of each face
+        uv_face_areas (ndarray): uv area of each face
+        face_shells (ndarray): shell index of each face (-1 if unmapped)
+        shell_count (int): number of shells
+        density (float): target texel density
+        resolution (int): texture resolution
+
+    Returns:
+        (ndarray): scale for each shell (1.0 if density can't be read)
+    """
+    _area_3d = get_shell_totals(face_areas, face_shells, shell_count)
+    _area_uv = get_shell_totals(uv_face_areas, face_shells, shell_count)
+    _scales = numpy.ones(shell_count)
+    _valid = (_area_3d > 0) & (_area_uv > 0)
+    _cur_density = (
+        numpy.sqrt(_area_uv[_valid])/numpy.sqrt(_area_3d[_valid])*resolution)
+    _scales[_valid] = density/_cur_density
+    return _scales
+
+
+def get_uv_face_areas(us, vs, uv_counts, uv_ids):
+    """Get the uv area of each face.
+
+    Args:
+        us (ndarray): u values
+        vs (ndarray): v values
+        uv_counts (ndarray): number of uvs assigned to each face
+        uv_ids (ndarray): uv index of each face vertex
+
+    Returns:
+        (ndarray): uv area of each face (zero for unmapped faces)
+    """
+    _counts = numpy.asarray(uv_counts, dtype=int)
+    _areas = numpy.zeros(len(_counts))
+    _mapped = numpy.flatnonzero(_counts)
+    if not len(_mapped):
+        return _areas
+    _starts = numpy.cumsum(_counts) - _counts
+    _next = numpy.arange(1, len(uv_ids)+1)
+    _next[_starts[_mapped] + _counts[_mapped] - 1] = _starts[_mapped]
+    _uv_ids = numpy.asarray(uv_ids, dtype=int)
+    _us = numpy.asarray(us, dtype=numpy.float64)
+    _vs = numpy.asarray(vs, dtype=numpy.float64)
+    _cross = (_us[_uv_ids]*_vs[_uv_ids[_next]] -
+              _us[_uv_ids[_next]]*_vs[_uv_ids])
+    _areas[_mapped] = numpy.abs(
+        numpy.add.reduceat(_cross, _starts[_mapped]))*0.5
+    return _areas
+
+
+def get_uv_shell_ids(uv_counts, uv_ids, uv_count):
+    """Find uv shells using a union-find over uvs sharing faces.
+
+    Shells are numbered in order of their lowest uv index, which matches
+    the order maya uses.
+
+    Args:
+        uv_counts (ndarray): number of uvs assigned to each face
+        uv_ids (ndarray): uv index of each face vertex
+        uv_count (int): number of uvs
+
+    Returns:
+        (tuple): shell index of each uv (-1 if unused), shell index of
+            each face (-1 if unmapped), number of shells
+    """
+    _counts = numpy.asarray(uv_counts, dtype=int)
+    _uv_ids = numpy.asarray(uv_ids, dtype=int)
+    _face_idxs = numpy.repeat(numpy.arange(len(_counts)), _counts)
+    _starts = numpy.cumsum(_counts) - _counts
+
+    # Link each face vertex uv to the first uv of its face
+    _parents = numpy.arange(uv_count)
+    _first = _uv_ids[_starts[_face_idxs]]
+    _parents = _union(_parents, _first, _uv_ids)
+
+    # Number shells consecutively
+    _used = numpy.zeros(uv_count, dtype=bool)
+    _used[_uv_ids] = True
+    _roots, _uv_shells = numpy.unique(_parents, return_inverse=True)
+    _used_roots = numpy.zeros(len(_roots), dtype=bool)
+    _used_roots[_uv_shells[_used]] = True
+    _renumber = numpy.cumsum(_used_roots) - 1
+    _uv_shells = numpy.where(_used, _renumber[_uv_shells], -1)
+
+    _face_shells = numpy.full(len(_counts), -1, dtype=int)
+    _mapped = _counts > 0
+    _face_shells[_mapped] = _uv_shells[_uv_ids[_starts[_mapped]]]
+    return _uv_shells, _face_shells, int(_used_roots.sum())
+
+
+def scale_uv_shells(us, vs, uv_shells, scales, pivots):
+    """Scale uv shells about pivot points.
+
+    Args:
+        us (ndarray): u values
+        vs (ndarray): v values
+        uv_shells (ndarray): shell index of each uv (-1 if unused)
+        scales (ndarray): scale for each shell
+        pivots (ndarray): u/v pivot for each shell (S x 2)
+
+    Returns:
+        (tuple): scaled u values, scaled v values
+    """
+    _us = numpy.array(us, dtype=numpy.float64)
+    _vs = numpy.array(vs, dtype=numpy.float64)
+    _used = numpy.flatnonzero(numpy.asarray(uv_shells) >= 0)
+    _shells = uv_shells[_used]
+    _scales = numpy.asarray(scales)[_shells]
+    _pivots = numpy.asarray(pivots, dtype=numpy.float64)[_shells]
+    _us[_used] = _pivots[:, 0] + (_us[_used] - _pivots[:, 0])*_scales
+    _vs[_used] = _pivots[:, 1] + (_vs[_used] - _pivots[:, 1])*_scales
+    return _us, _vs
+
+
+def _union(parents, nodes_a, nodes_b):
+    """Merge the sets containing each pair of nodes.
+
+    This uses vectorised hooking of roots onto the lower root followed
+    by path compression, repeated until all pairs share a root.
+
+    Args:
+        parents (ndarray): parent of each node
+        nodes_a (ndarray): first node of each pair
+        nodes_b (ndarray): second node of each pair
+
+    Returns:
+        (ndarray): root of each node
+    """
+    _parents = parents.copy()
+    while True:
+        _root_a = _parents[nodes_a]
+        _root_b = _parents[nodes_b]
+        _diff = _root_a != _root_b
+        if not _diff.any():
+            break
+        _low = numpy.minimum(_root_a[_diff], _root_b[_diff])
+        _high = numpy.maximum(_root_a[_diff], _root_b[_diff])
+        numpy.minimum.at(_parents, _high, _low)
+
+        # Compress paths so each node points at its root
+        while True:
+            _grand = _parents[_parents]
+            if (_grand == _parents).all():
+                break
+            _parents = _grand
+    return _parents
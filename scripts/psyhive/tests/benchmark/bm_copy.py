@@ -0,0 +1,71 @@
+"""Benchmark for copying image sequences.
+
+Compares copying frames one at a time with shutil.copy against the
+concurrent copy engine. Gains are largest when copying from a network
+share, where each copy spends most of its time waiting on latency -
+point $PSYHIVE_BM_COPY_DIR at a share to measure this.
+
+Usage:
+
+    python -m psyhive.tests.benchmark.bm_copy
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from psyhive.utils import Seq, copy_files, test_path
+
+
+def run(frames=200, size_mb=4, threads=8):
+    """Run the benchmark.
+
+    Args:
+        frames (int): number of frames to copy
+        size_mb (int): size of each frame in megabytes
+        threads (int): number of copy threads
+
+    Returns:
+        (dict): timings in seconds
+    """
+    _dir = os.environ.get(
+        'PSYHIVE_BM_COPY_DIR',
+        '{}/psyhive/bm_copy'.format(tempfile.gettempdir()))
+    if os.path.exists(_dir):
+        shutil.rmtree(_dir)
+    _src = Seq(_dir+'/src/src.%04d.exr')
+    test_path(_src.dir)
+    _data = os.urandom(size_mb*1024*1024)
+    for _frame in range(1, frames+1):
+        with open(_src[_frame], 'wb') as _file:
+            _file.write(_data)
+    print 'COPYING {:d} FRAMES ({:d}MB EACH)'.format(frames, size_mb)
+
+    _timings = {}
+    _serial = Seq(_dir+'/serial/serial.%04d.exr')
+    test_path(_serial.dir)
+    _start = time.time()
+    for _frame in _src.get_frames():
+        shutil.copy(_src[_frame], _serial[_frame])
+    _timings['serial'] = time.time() - _start
+
+    for _name, _verify in [('threaded', False), ('verified', True)]:
+        _dest = Seq('{}/{}/{}.%04d.exr'.format(_dir, _name, _name))
+        _start = time.time()
+        copy_files([(_src[_frame], _dest[_frame])
+                    for _frame in _src.get_frames()],
+                   threads=threads, verify=_verify, verbose=0)
+        _timings[_name] = time.time() - _start
+
+    for _name in ['serial', 'threaded', 'verified']:
+        print ' - {:<8} {:8.02f}s {:8.01f}MB/s'.format(
+            _name, _timings[_name],
+            frames*size_mb*1.048576/max(_timings[_name], 0.000001))
+    shutil.rmtree(_dir)
+
+    return _timings
+
+
+if __name__ == '__main__':
+    run()
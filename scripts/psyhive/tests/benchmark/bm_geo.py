@@ -0,0 +1,125 @@
+"""Benchmark for the numpy geometry tools.
+
+Measures back face classification, uv shell analysis, texture map
+partitioning and headless occlusion culling of a synthetic environment,
+made of boxes scattered around the view points.
+
+Usage:
+
+    python -m psyhive.tests.benchmark.bm_geo
+"""
+
+import time
+
+import numpy
+
+from psyhive import geo
+
+_BOX_TRIS = numpy.array([
+    [[0, 0, 0], [1, 0, 0], [1, 1, 0]], [[0, 0, 0], [1, 1, 0], [0, 1, 0]],
+    [[0, 0, 1], [1, 1, 1], [1, 0, 1]], [[0, 0, 1], [0, 1, 1], [1, 1, 1]],
+    [[0, 0, 0], [0, 1, 1], [0, 0, 1]], [[0, 0, 0], [0, 1, 0], [0, 1, 1]],
+    [[1, 0, 0], [1, 0, 1], [1, 1, 1]], [[1, 0, 0], [1, 1, 1], [1, 1, 0]],
+    [[0, 0, 0], [0, 0, 1], [1, 0, 1]], [[0, 0, 0], [1, 0, 1], [1, 0, 0]],
+    [[0, 1, 0], [1, 1, 1], [0, 1, 1]], [[0, 1, 0], [1, 1, 0], [1, 1, 1]],
+], dtype=numpy.float64)
+
+
+def _build_boxes(count, spread=200.0, seed=0):
+    """Build triangles for randomly placed boxes.
+
+    Args:
+        count (int): number of boxes
+        spread (float): size of area to scatter boxes over
+        seed (int): random seed
+
+    Returns:
+        (ndarray): triangles (N x 3 x 3)
+    """
+    _rng = numpy.random.RandomState(seed)
+    _pos = _rng.uniform(-spread, spread, (count, 1, 1, 3))
+    _pos[..., 1] = 0
+    _scale = _rng.uniform(0.5, 3.0, (count, 1, 1, 1))
+    return (_BOX_TRIS[None]*_scale + _pos).reshape(-1, 3, 3)
+
+
+def run(boxes=10000, view_points=13, resolution=256, map_count=8):
+    """Run the benchmark.
+
+    Args:
+        boxes (int): number of boxes in environment
+        view_points (int): number of view points
+        resolution (int): cube map resolution
+        map_count (int): number of texture maps to partition boxes into
+
+    Returns:
+        (dict): timings in seconds
+    """
+    _tris = _build_boxes(boxes)
+    _view_points = [(_idx*2.0, 1.5, 0.0) for _idx in range(view_points)]
+    print 'PROCESSING {:d} TRIANGLES FROM {:d} VIEW POINTS'.format(
+        len(_tris), view_points)
+
+    _timings = {}
+
+    # Classify back faces
+    _start = time.time()
+    _points = _tris.reshape(-1, 3)
+    _counts = numpy.full(len(_tris), 3, dtype=int)
+    _indices = numpy.arange(len(_points))
+    _mask = geo.get_back_face_mask(
+        geo.get_face_centroids(_points, _counts, _indices),
+        geo.get_face_normals(_points, _counts, _indices), (0, 1.5, 0))
+    _timings['back faces'] = time.time() - _start
+    print ' - {:<10} {:8.02f}s ({:d} back faces)'.format(
+        'back faces', _timings['back faces'], _mask.sum())
+
+    # Analyse uv shells, sharing uvs between coincident points so that
+    # each box is a shell
+    _uv_pts, _uv_ids = numpy.unique(
+        _points, axis=0, return_inverse=True)
+    _us, _vs = _uv_pts[:, 0], _uv_pts[:, 2]
+    _start = time.time()
+    _uv_shells, _face_shells, _shell_count = geo.get_uv_shell_ids(
+        _counts, _uv_ids, len(_uv_pts))
+    _scales = geo.get_texel_density_scales(
+        geo.get_face_areas(_points, _counts, _indices),
+        geo.get_uv_face_areas(_us, _vs, _counts, _uv_ids),
+        _face_shells, _shell_count, density=1024, resolution=1024)
+    _bboxes = geo.get_shell_bboxes(_us, _vs, _uv_shells, _shell_count)
+    geo.scale_uv_shells(
+        _us, _vs, _uv_shells, _scales, _bboxes[:, [0, 2]])
+    _timings['uv shells'] = time.time() - _start
+    print ' - {:<10} {:8.02f}s ({:d} shells)'.format(
+        'uv shells', _timings['uv shells'], _shell_count)
+
+    # Partition boxes into texture maps
+    _box_areas = geo.get_shell_totals(
+        geo.get_face_areas(_points, _counts, _indices), _face_shells,
+        _shell_count)
+    _box_centres = numpy.stack([
+        _bboxes[:, 0] + _bboxes[:, 1], _bboxes[:, 2] + _bboxes[:, 3]],
+        axis=1)*0.5
+    _items = [(_idx, _box_areas[_idx], _box_centres[_idx])
+              for _idx in range(min(boxes, 1000))]
+    for _locality in [0.0, 0.5]:
+        _label = 'pack {:.01f}'.format(_locality)
+        _start = time.time()
+        _, _fills = geo.partition_by_area(
+            _items, map_count, locality=_locality)
+        _timings[_label] = time.time() - _start
+        print ' - {:<10} {:8.02f}s ({:.02f}-{:.02f} fill)'.format(
+            _label, _timings[_label], min(_fills), max(_fills))
+
+    _start = time.time()
+    _visible = geo.find_visible_faces(
+        _tris, _view_points, resolution=resolution)
+    _timings['occlusion'] = time.time() - _start
+    print ' - {:<10} {:8.02f}s ({:d} visible)'.format(
+        'occlusion', _timings['occlusion'], len(_visible))
+
+    return _timings
+
+
+if __name__ == '__main__':
+    run()
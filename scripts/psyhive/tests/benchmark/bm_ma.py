@@ -0,0 +1,84 @@
+"""Benchmark for scanning maya ascii files without maya.
+
+Writes a synthetic scene with a large amount of mesh data and times
+reading its references, which stops at the end of the header, and its
+playback range and alembic paths, which require a full pass.
+
+Usage:
+
+    python -m psyhive.tests.benchmark.bm_ma
+"""
+
+import os
+import tempfile
+import time
+
+from psyhive.utils import MaFile, test_path
+
+
+def _write_ma(path, meshes=2000, points=500):
+    """Write a synthetic maya ascii scene.
+
+    Args:
+        path (str): path to write to
+        meshes (int): number of meshes
+        points (int): number of points in each mesh
+    """
+    test_path(os.path.dirname(path))
+    _pts = ' '.join(['0.5 -0.5 0.25']*points)
+    with open(path, 'w') as _handle:
+        _handle.write('//Maya ASCII 2018 scene\n')
+        for _idx in range(20):
+            _handle.write(
+                'file -r -ns "char{idx:d}" -dr 1 -rfn "char{idx:d}RN" '
+                '-typ "mayaAscii" "P:/assets/char{idx:d}.ma";\n'.format(
+                    idx=_idx))
+        _handle.write('fileInfo "application" "maya";\n')
+        for _idx in range(meshes):
+            _handle.write('createNode mesh -n "mesh{:d}Shape";\n'.format(
+                _idx))
+            _handle.write('\tsetAttr -s {:d} ".vt[0:{:d}]"\n\t\t{};\n'.format(
+                points, points-1, _pts))
+            _handle.write(
+                'createNode ExocortexAlembicFile -n "char{idx:d}:abc";\n'
+                '\tsetAttr ".fileName" -type "string" '
+                '"P:/cache/char{idx:d}.abc";\n'.format(idx=_idx % 20))
+        _handle.write(
+            'createNode script -n "sceneConfigurationScriptNode";\n'
+            '\tsetAttr ".b" -type "string" "playbackOptions -min 1001 '
+            '-max 1100 -ast 1001 -aet 1100 ";\n')
+
+
+def run(meshes=2000, points=500):
+    """Run the benchmark.
+
+    Args:
+        meshes (int): number of meshes in synthetic scene
+        points (int): number of points in each mesh
+
+    Returns:
+        (dict): timings in seconds
+    """
+    _path = '{}/psyhive/bm_ma/scene.ma'.format(tempfile.gettempdir())
+    _write_ma(_path, meshes=meshes, points=points)
+    _ma = MaFile(_path)
+    print 'SCANNING {} ({:.01f}MB)'.format(
+        _path, os.path.getsize(_path)/1000.0/1000.0)
+
+    _timings = {}
+    for _name, _fn in [
+            ('refs', _ma.read_refs),
+            ('range', _ma.read_range),
+            ('abcs', lambda: _ma.read_attrs(
+                'ExocortexAlembicFile', ['fileName']))]:
+        _start = time.time()
+        _fn()
+        _timings[_name] = time.time() - _start
+        print ' - {:<8} {:8.03f}s'.format(_name, _timings[_name])
+    os.remove(_path)
+
+    return _timings
+
+
+if __name__ == '__main__':
+    run()
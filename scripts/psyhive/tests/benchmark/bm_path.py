@@ -0,0 +1,90 @@
+"""Benchmark for the abs_path fast path and memo.
+
+Builds a synthetic tree on disk, runs find over it and then normalises
+each result with abs_path (as Seq/TTBase constructors do), comparing
+against abs_path with the fast path and memo disabled.
+
+Usage:
+
+    python -m psyhive.tests.benchmark.bm_path
+"""
+
+# pylint: disable=protected-access
+
+import os
+import shutil
+import tempfile
+import time
+
+from psyhive.utils import find, abs_path, touch
+from psyhive.utils.path import p_tools
+
+_TREE = '{}/psyhive/benchmark/abs_path'.format(tempfile.gettempdir())
+
+
+def _build_tree(dirs=20, files=1000, force=False):
+    """Build a synthetic tree of files.
+
+    Args:
+        dirs (int): number of dirs
+        files (int): number of files in each dir
+        force (bool): rebuild existing tree
+
+    Returns:
+        (str): path to tree root
+    """
+    _root = '{}/{:d}x{:d}'.format(_TREE, dirs, files)
+    if os.path.exists(_root):
+        if not force:
+            return _root
+        shutil.rmtree(_root)
+    for _dir_idx in range(dirs):
+        _dir = '{}/dir{:03d}'.format(_root, _dir_idx)
+        touch(_dir+'/.keep')
+        for _file_idx in range(files):
+            open('{}/file.{:04d}.exr'.format(_dir, _file_idx), 'w').close()
+    return _root
+
+
+def run(dirs=20, files=1000, repeats=3):
+    """Run the benchmark.
+
+    Args:
+        dirs (int): number of dirs in tree
+        files (int): number of files in each dir
+        repeats (int): number of times to normalise the results
+
+    Returns:
+        (dict): timings in seconds
+    """
+    _root = _build_tree(dirs=dirs, files=files)
+
+    _start = time.time()
+    _paths = find(_root)
+    _find_time = time.time() - _start
+    _rel_paths = [_path[len(_root)+1:] for _path in _paths]
+    print 'FIND {:d} PATHS {:.02f}s'.format(len(_paths), _find_time)
+
+    _timings = {}
+    for _name, _fn in [
+            ('uncached', p_tools._abs_path),
+            ('cached', abs_path),
+    ]:
+        p_tools._ABS_PATH_CACHE.clear()
+        _start = time.time()
+        for _ in range(repeats):
+            for _path in _paths:
+                _fn(_path)
+            for _path in _rel_paths:
+                _fn(_path, root=_root)
+        _timings[_name] = time.time() - _start
+        print ' - {:<8} {:8.02f}s'.format(_name, _timings[_name])
+
+    print ' - SPEEDUP {:.01f}x'.format(
+        _timings['uncached']/max(_timings['cached'], 0.000001))
+
+    return _timings
+
+
+if __name__ == '__main__':
+    run()
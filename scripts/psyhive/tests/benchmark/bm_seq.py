@@ -0,0 +1,111 @@
+"""Benchmark for grouping render output frames into sequences.
+
+Compares the single pass group_files_by_seq index against the previous
+approach of testing each file against every sequence found so far.
+
+Usage:
+
+    python -m psyhive.tests.benchmark.bm_seq
+"""
+
+import collections
+import time
+
+from psyhive.utils import Seq, seq_from_frame, group_files_by_seq
+
+
+def _build_paths(passes=40, frames=2500):
+    """Build a list of paths representing a synthetic render output tree.
+
+    Args:
+        passes (int): number of render passes (ie. sequences)
+        frames (int): number of frames in each pass
+
+    Returns:
+        (str list): sorted list of file paths
+    """
+    _paths = []
+    for _pass in range(passes):
+        _dir = '/synthetic/output/pass{:02d}'.format(_pass)
+        for _frame in range(1, frames+1):
+            _paths.append('{}/pass{:02d}.{:04d}.exr'.format(
+                _dir, _pass, _frame))
+        _paths.append('{}/pass{:02d}.json'.format(_dir, _pass))
+    return sorted(_paths)
+
+
+def _group_legacy(paths):
+    """Group the given paths using the previous contains approach.
+
+    Args:
+        paths (str list): paths to group
+
+    Returns:
+        (dict): seq path/frames
+    """
+    _seqs = collections.defaultdict(set)
+    for _path in paths:
+        _matched = False
+        for _seq in _seqs:
+            if _seq.contains(_path):
+                _seqs[_seq].add(_seq.get_frame(_path))
+                _matched = True
+                break
+        if _matched:
+            continue
+        _seq = seq_from_frame(_path, catch=True, class_=Seq)
+        if _seq:
+            _seqs[_seq].add(_seq.get_frame(_path))
+    return dict([(_seq.path, sorted(_frames))
+                 for _seq, _frames in _seqs.items()])
+
+
+def _group_indexed(paths):
+    """Group the given paths using the single pass index.
+
+    Args:
+        paths (str list): paths to group
+
+    Returns:
+        (dict): seq path/frames
+    """
+    return dict([(_path, _frames)
+                 for _path, _frames in group_files_by_seq(paths)
+                 if _frames is not None])
+
+
+def run(passes=40, frames=2500, legacy=True):
+    """Run the benchmark.
+
+    Args:
+        passes (int): number of render passes (ie. sequences)
+        frames (int): number of frames in each pass
+        legacy (bool): include the legacy approach (this is slow)
+
+    Returns:
+        (dict): timings in seconds
+    """
+    _paths = _build_paths(passes=passes, frames=frames)
+    print 'GROUPING {:d} FILES ({:d} PASSES)'.format(len(_paths), passes)
+
+    _timings = {}
+    _results = {}
+    _fns = [('indexed', _group_indexed)]
+    if legacy:
+        _fns.append(('legacy', _group_legacy))
+    for _name, _fn in _fns:
+        _start = time.time()
+        _results[_name] = _fn(_paths)
+        _timings[_name] = time.time() - _start
+        print ' - {:<8} {:8.02f}s'.format(_name, _timings[_name])
+
+    if legacy:
+        assert _results['indexed'] == _results['legacy']
+        print ' - SPEEDUP {:.01f}x'.format(
+            _timings['legacy']/max(_timings['indexed'], 0.000001))
+
+    return _timings
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,138 @@
+"""Benchmark for concurrent tank template tree traversal.
+
+Builds a local stand-in for a shot tree (shots/steps/output types/
+names/versions/outputs/files) and traverses it level by level, as
+find_shots and TTStepRoot.find_output_files do, with latency injected
+into every directory listing to simulate a network share. Compares
+serial traversal with the thread pool.
+
+Usage:
+
+    python -m psyhive.tests.benchmark.bm_tk2
+"""
+
+import os
+import tempfile
+import time
+
+from psyhive.utils import find, thread_map, touch
+from psyhive.utils.path import p_tools
+
+_TREE = '{}/psyhive/benchmark/tk2'.format(tempfile.gettempdir())
+
+
+class _LatentLister(object):
+    """Dir lister which adds latency to each listing.
+
+    This can be passed to find using the index arg.
+    """
+
+    def __init__(self, latency):
+        """Constructor.
+
+        Args:
+            latency (float): latency to add to each listing (in secs)
+        """
+        self.latency = latency
+
+    def scandir(self, dir_):
+        """List the contents of the given dir.
+
+        Args:
+            dir_ (str): dir to list
+
+        Returns:
+            (DirEntry list): dir entries
+        """
+        time.sleep(self.latency)
+        return list(p_tools._scandir(dir_))  # pylint: disable=protected-access
+
+
+def _build_tree(shots=10, steps=3, types=2, names=2, versions=3, files=20):
+    """Build stand-in shot tree.
+
+    Args:
+        shots (int): number of shots
+        steps (int): number of steps per shot
+        types (int): number of output types per step
+        names (int): number of output names per type
+        versions (int): number of versions per name
+        files (int): number of files in each output
+
+    Returns:
+        (str): path to tree root
+    """
+    _root = '{}/{:d}_{:d}_{:d}_{:d}_{:d}_{:d}'.format(
+        _TREE, shots, steps, types, names, versions, files)
+    if os.path.exists(_root):
+        return _root
+    for _shot in range(shots):
+        for _step in range(steps):
+            for _type in range(types):
+                for _name in range(names):
+                    for _ver in range(versions):
+                        _dir = '/'.join([
+                            _root, 'shot{:03d}'.format(_shot),
+                            'step{:d}'.format(_step),
+                            'type{:d}'.format(_type),
+                            'name{:d}'.format(_name),
+                            'v{:03d}'.format(_ver+1), 'exr'])
+                        touch(_dir+'/.keep')
+                        for _frame in range(files):
+                            open('{}/out.{:04d}.exr'.format(
+                                _dir, _frame), 'w').close()
+    return _root
+
+
+def _traverse(root, lister, threads):
+    """Traverse the given tree level by level.
+
+    Args:
+        root (str): tree root
+        lister (_LatentLister): dir lister
+        threads (int): number of worker threads
+
+    Returns:
+        (str list): files found
+    """
+    _dirs = [root]
+    for _ in range(6):  # Shot/step/type/name/version/output
+        _dirs = sum(thread_map(
+            lambda _dir: find(_dir, depth=1, type_='d', index=lister),
+            _dirs, threads=threads), [])
+    return sum(thread_map(
+        lambda _dir: find(_dir, depth=1, type_='f', index=lister),
+        _dirs, threads=threads), [])
+
+
+def run(latency=0.005, threads=(1, 4, 8, 16)):
+    """Run the benchmark.
+
+    Args:
+        latency (float): latency to add to each dir listing (in secs)
+        threads (int list): thread counts to test
+
+    Returns:
+        (dict): timings in seconds for each thread count
+    """
+    _root = _build_tree()
+    _lister = _LatentLister(latency=latency)
+    print 'TRAVERSING {} ({:.01f}ms LATENCY)'.format(_root, latency*1000)
+
+    _timings = {}
+    _results = {}
+    for _threads in threads:
+        _start = time.time()
+        _results[_threads] = _traverse(
+            _root, lister=_lister, threads=_threads)
+        _timings[_threads] = time.time() - _start
+        print ' - {:3d} THREADS {:8.02f}s ({:d} FILES)'.format(
+            _threads, _timings[_threads], len(_results[_threads]))
+
+    assert len(set([tuple(_result) for _result in _results.values()])) == 1
+
+    return _timings
+
+
+if __name__ == '__main__':
+    run()
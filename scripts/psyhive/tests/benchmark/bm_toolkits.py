@@ -0,0 +1,94 @@
+"""Benchmark for show toolkit discovery at maya startup.
+
+Compares importing every show toolkit to read its metadata (the previous
+startup behaviour) against reading the metadata from the toolkits' ast.
+Each mode is timed in a fresh interpreter, so that modules imported by
+one mode don't affect the other. Run this from mayapy to include the cost
+of importing the toolkits' maya dependencies.
+
+Usage:
+
+    python -m psyhive.tests.benchmark.bm_toolkits
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from psyhive.utils import PyFile, find, find_toolkits, abs_path
+
+_SHOWS_DIR = abs_path('{}/../../../maya_psyhive/shows'.format(
+    os.path.dirname(__file__)))
+
+
+def _import_toolkits(dir_):
+    """Import all toolkits in the given dir.
+
+    Args:
+        dir_ (str): dir to search
+
+    Returns:
+        (int): number of toolkits which imported
+    """
+    _pys = find(dir_, extn='py', depth=1, type_='f')
+    _pys += ['{}/toolkit.py'.format(_dir)
+             for _dir in find(dir_, depth=1, type_='d')]
+    _count = 0
+    for _py in _pys:
+        if os.path.basename(_py).startswith('_') or not os.path.exists(_py):
+            continue
+        try:
+            _mod = PyFile(_py).get_module(catch=True)
+        except ImportError:
+            continue
+        if _mod:
+            _count += 1
+    return _count
+
+
+def _run_mode(mode, dir_):
+    """Time discovering toolkits in this interpreter.
+
+    Args:
+        mode (str): discovery mode (import/static)
+        dir_ (str): dir to search
+    """
+    _start = time.time()
+    if mode == 'import':
+        _count = _import_toolkits(dir_)
+    elif mode == 'static':
+        _count = len(find_toolkits(dir_))
+    else:
+        raise ValueError(mode)
+    print '{:.06f} {:d}'.format(time.time() - _start, _count)
+
+
+def run(dir_=_SHOWS_DIR):
+    """Run the benchmark.
+
+    Args:
+        dir_ (str): dir containing show toolkits
+
+    Returns:
+        (dict): timings in seconds
+    """
+    print 'DISCOVERING TOOLKITS', dir_
+    _timings = {}
+    for _mode in ['import', 'static']:
+        _out = subprocess.check_output([
+            sys.executable, '-m', 'psyhive.tests.benchmark.bm_toolkits',
+            _mode, dir_])
+        _dur, _count = _out.strip().split('\n')[-1].split()
+        _timings[_mode] = float(_dur)
+        print ' - {:<8} {:8.03f}s {:3d} toolkit{}'.format(
+            _mode, _timings[_mode], int(_count),
+            '' if _count == '1' else 's')
+    return _timings
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        _run_mode(mode=sys.argv[1], dir_=sys.argv[2])
+    else:
+        run()
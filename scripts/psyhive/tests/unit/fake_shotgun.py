@@ -0,0 +1,100 @@
+"""Offline stand-in for a shotgun connection, used to test queries."""
+
+import copy
+
+
+class FakeShotgun(object):
+    """Stores entities in memory and supports a subset of find.
+
+    Each call to find is counted, so that tests can check how many
+    round trips a query makes.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self.entities = []
+        self.find_count = 0
+
+    def create(self, entity_type, data):
+        """Add an entity.
+
+        Args:
+            entity_type (str): entity type (eg. Shot)
+            data (dict): entity fields
+
+        Returns:
+            (dict): entity data
+        """
+        _data = copy.copy(data)
+        _data['type'] = entity_type
+        _data['id'] = len(self.entities)+1
+        self.entities.append(_data)
+        return _data
+
+    def find(self, entity_type, filters, fields=None, limit=0, page=0):
+        """Find entities.
+
+        Supports is, is_not and in filters.
+
+        Args:
+            entity_type (str): entity type to find
+            filters (list): list of (field, operator, value) filters
+            fields (str list): fields to return (in addition to type/id)
+            limit (int): maximum number of results
+            page (int): page of results to return (starting from 1)
+
+        Returns:
+            (dict list): matching entities
+        """
+        self.find_count += 1
+        _matches = [
+            _entity for _entity in self.entities
+            if _entity['type'] == entity_type and
+            all(_passes_filter(_entity, _filter) for _filter in filters)]
+        if limit:
+            _start = (max(page, 1)-1)*limit
+            _matches = _matches[_start: _start+limit]
+
+        _results = []
+        for _entity in _matches:
+            _result = {'type': _entity['type'], 'id': _entity['id']}
+            for _field in fields or []:
+                _result[_field] = _entity.get(_field)
+            _results.append(_result)
+        return _results
+
+
+def _get_cmp_val(val):
+    """Get value for comparison, so entities are compared by type/id.
+
+    Args:
+        val (any): value to read
+
+    Returns:
+        (any): comparison value
+    """
+    if isinstance(val, dict):
+        return val.get('type'), val.get('id')
+    return val
+
+
+def _passes_filter(entity, filter_):
+    """Test whether an entity passes the given filter.
+
+    Args:
+        entity (dict): entity to test
+        filter_ (list): (field, operator, value) filter
+
+    Returns:
+        (bool): whether entity passes
+    """
+    _field, _op, _val = filter_
+    _entity_val = _get_cmp_val(entity.get(_field))
+    if _op in ('is', 'is_not'):
+        if isinstance(_val, list) and len(_val) == 1:
+            _val = _val[0]
+        _match = _entity_val == _get_cmp_val(_val)
+        return _match if _op == 'is' else not _match
+    if _op == 'in':
+        return _entity_val in [_get_cmp_val(_item) for _item in _val]
+    raise NotImplementedError(_op)
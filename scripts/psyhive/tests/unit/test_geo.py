@@ -0,0 +1,174 @@
+import unittest
+
+import numpy
+
+from psyhive import geo
+
+# Unit cube centred on origin with outward facing quads
+_CUBE_POINTS = [
+    [-0.5, -0.5, 0.5], [0.5, -0.5, 0.5], [-0.5, 0.5, 0.5], [0.5, 0.5, 0.5],
+    [-0.5, 0.5, -0.5], [0.5, 0.5, -0.5], [-0.5, -0.5, -0.5],
+    [0.5, -0.5, -0.5]]
+_CUBE_COUNTS = [4, 4, 4, 4, 4, 4]
+_CUBE_INDICES = [
+    0, 1, 3, 2, 2, 3, 5, 4, 4, 5, 7, 6, 6, 7, 1, 0, 1, 7, 5, 3,
+    6, 0, 2, 4]
+
+
+def _get_quad(depth, size):
+    """Build a square facing the z axis from two triangles.
+
+    Args:
+        depth (float): z position
+        size (float): half width of square
+
+    Returns:
+        (list): triangles
+    """
+    _pt_a = [-size, -size, depth]
+    _pt_b = [size, -size, depth]
+    _pt_c = [size, size, depth]
+    _pt_d = [-size, size, depth]
+    return [[_pt_a, _pt_b, _pt_c], [_pt_a, _pt_c, _pt_d]]
+
+
+class TestMesh(unittest.TestCase):
+
+    def test_face_normals(self):
+
+        _normals = geo.get_face_normals(
+            _CUBE_POINTS, _CUBE_COUNTS, _CUBE_INDICES)
+        assert numpy.allclose(_normals, [
+            [0, 0, 1], [0, 1, 0], [0, 0, -1], [0, -1, 0], [1, 0, 0],
+            [-1, 0, 0]])
+        _centroids = geo.get_face_centroids(
+            _CUBE_POINTS, _CUBE_COUNTS, _CUBE_INDICES)
+        assert numpy.allclose(_centroids, _normals*0.5)
+
+        # Test mixed face sizes
+        _points = [[0, 0, 0], [1, 0, 0], [0, 1, 0], [2, 0, 0], [3, 0, 0],
+                   [3, 0, 1], [2.5, 0, 2], [2, 0, 1]]
+        _counts = [3, 5]
+        _indices = [0, 1, 2, 3, 7, 6, 5, 4]
+        _normals = geo.get_face_normals(_points, _counts, _indices)
+        assert numpy.allclose(_normals, [[0, 0, 1], [0, 1, 0]])
+        _centroids = geo.get_face_centroids(_points, _counts, _indices)
+        assert numpy.allclose(_centroids[1], [2.5, 0, 0.8])
+        _areas = geo.get_face_areas(_points, _counts, _indices)
+        assert numpy.allclose(_areas, [0.5, 1.5])
+
+    def test_back_face_mask(self):
+
+        _normals = geo.get_face_normals(
+            _CUBE_POINTS, _CUBE_COUNTS, _CUBE_INDICES)
+        _centroids = geo.get_face_centroids(
+            _CUBE_POINTS, _CUBE_COUNTS, _CUBE_INDICES)
+        _mask = geo.get_back_face_mask(_centroids, _normals, (0, 0, 5))
+        assert _mask.tolist() == [False, True, True, True, True, True]
+        _mask = geo.get_back_face_mask(_centroids, _normals, (2, 2, 2))
+        assert _mask.tolist() == [False, False, True, True, False, True]
+
+
+class TestOcclusion(unittest.TestCase):
+
+    def test_find_visible_faces(self):
+
+        # Test occluded face
+        _tris = _get_quad(2, 1) + _get_quad(4, 0.5)
+        _face_ids = [0, 0, 1, 1]
+        assert geo.find_visible_faces(
+            _tris, [(0, 0, 0)], face_ids=_face_ids).tolist() == [0]
+        assert geo.find_visible_faces(
+            _tris, [(0, 0, 0), (0, 0, 10)],
+            face_ids=_face_ids).tolist() == [0, 1]
+        assert geo.find_visible_faces(
+            _tris, [(0, 0, 0)], far_clip=1.5).tolist() == []
+
+        # Test partially occluded face
+        _tris = _get_quad(2, 0.5) + _get_quad(4, 2)
+        assert geo.find_visible_faces(
+            _tris, [(0, 0, 0)]).tolist() == [0, 1, 2, 3]
+
+        # Test face crossing near clip plane (eg. floor)
+        _floor = [[[-10, -1, -10], [10, -1, -10], [0, -1, 10]]]
+        assert geo.find_visible_faces(_floor, [(0, 0, 0)]).tolist() == [0]
+
+        # Test every direction is covered
+        _rng = numpy.random.RandomState(0)
+        _dirs = _rng.normal(size=(50, 3))
+        _dirs /= numpy.linalg.norm(_dirs, axis=1)[:, None]
+        _tris = _dirs[:, None, :]*5 + _rng.uniform(-0.5, 0.5, (50, 3, 3))
+        assert len(geo.find_visible_faces(_tris, [(0, 0, 0)])) == 50
+
+
+class TestPack(unittest.TestCase):
+
+    def test_partition_by_area(self):
+
+        # Test LPT alone would leave bins unbalanced (5+4 vs 3+3+3)
+        _items = [(_name, _area, None) for _name, _area in [
+            ('a', 5), ('b', 4), ('c', 3), ('d', 3), ('e', 3)]]
+        _groups, _fills = geo.partition_by_area(_items, 2)
+        assert sorted(sorted(_group) for _group in _groups) == [
+            ['a', 'b'], ['c', 'd', 'e']]
+        assert numpy.allclose(_fills, [1, 1])
+
+        # Test initial areas
+        _groups, _fills = geo.partition_by_area(
+            _items, 3, initial_areas=[10, 0, 0])
+        assert _groups[0] == []
+        assert numpy.allclose(_fills, [30.0/28, 24.0/28, 30.0/28])
+
+        # Test locality keeps clusters together
+        _items = []
+        for _cluster, _x in [('a', -100), ('b', 100)]:
+            for _idx in range(4):
+                _items.append(('{}{:d}'.format(_cluster, _idx), 1.0,
+                               (_x + _idx, 0, 0)))
+        _items.sort(key=lambda _item: _item[0][-1])
+        _groups, _fills = geo.partition_by_area(_items, 2, locality=1.0)
+        assert sorted(sorted(_group) for _group in _groups) == [
+            ['a0', 'a1', 'a2', 'a3'], ['b0', 'b1', 'b2', 'b3']]
+        assert numpy.allclose(_fills, [1, 1])
+
+
+class TestUV(unittest.TestCase):
+
+    def test_uv_shells(self):
+
+        # Two quads sharing an edge, a separate quad and an unmapped face
+        _us = numpy.array([0, 1, 0, 1, 0, 1, 5, 9, 7, 7])
+        _vs = numpy.array([0, 0, 1, 1, 2, 2, 5, 5, 7, 9])
+        _uv_counts = numpy.array([4, 0, 4, 3])
+        _uv_ids = numpy.array([0, 1, 3, 2, 2, 3, 5, 4, 6, 7, 8])
+        _uv_shells, _face_shells, _count = geo.get_uv_shell_ids(
+            _uv_counts, _uv_ids, len(_us))
+        assert _count == 2
+        assert _uv_shells.tolist() == [0, 0, 0, 0, 0, 0, 1, 1, 1, -1]
+        assert _face_shells.tolist() == [0, -1, 0, 1]
+
+        _uv_areas = geo.get_uv_face_areas(_us, _vs, _uv_counts, _uv_ids)
+        assert numpy.allclose(_uv_areas, [1, 0, 1, 4])
+        _bboxes = geo.get_shell_bboxes(_us, _vs, _uv_shells, _count)
+        assert numpy.allclose(_bboxes, [[0, 1, 0, 2], [5, 9, 5, 7]])
+
+        # Check scales match world space density
+        _areas = numpy.array([4, 10, 4, 1])
+        _scales = geo.get_texel_density_scales(
+            _areas, _uv_areas, _face_shells, _count, density=100,
+            resolution=100)
+        assert numpy.allclose(_scales, [2, 0.5])
+        _scales = geo.get_texel_density_scales(
+            [0, 0, 0, 1], _uv_areas, _face_shells, _count, density=100,
+            resolution=100)
+        assert numpy.allclose(_scales, [1, 0.5])
+
+        _pivots = _bboxes[:, [0, 2]]
+        _new_us, _new_vs = geo.scale_uv_shells(
+            _us, _vs, _uv_shells, [2, 0.5], _pivots)
+        assert _new_us.tolist() == [0, 2, 0, 2, 0, 2, 5, 7, 6, 7]
+        assert _new_vs.tolist() == [0, 0, 2, 2, 4, 4, 5, 5, 6, 9]
+
+
+if __name__ == '__main__':
+    unittest.main()
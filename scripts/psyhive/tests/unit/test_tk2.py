@@ -1,6 +1,10 @@
+import os
+import tempfile
+import time
 import unittest
 
 from psyhive import tk2, pipe
+from psyhive.tests.unit.fake_shotgun import FakeShotgun
 
 
 class TestTk2(unittest.TestCase):
@@ -24,6 +28,90 @@ class TestTk2(unittest.TestCase):
             _shot.set_frame_range(_rng, use_cut=True)
             assert _shot.get_frame_range(use_cut=True) == _rng
 
+    def test_get_shots_sg_data(self):
+
+        _root = pipe.PROJECTS_ROOT + '/hvanderbeek_0001P/sequences/dev'
+        _shots = [tk2.TTShot('{}/dev{:04d}'.format(_root, _idx))
+                  for _idx in range(12)]
+        _proj = _shots[0].project
+        _proj_data = {'type': 'Project', 'id': 1, 'name': _proj.name}
+        tk2.get_project_sg_data.set_result(_proj_data, _proj)
+
+        os.environ['PSYHIVE_DISABLE_SG_CACHE'] = '1'
+        _sg = FakeShotgun()
+        for _shot in _shots[:10]:
+            _sg.create('Shot', {'code': _shot.name, 'project': _proj_data})
+        _sg.create('Shot', {'code': _shots[0].name, 'project': {
+            'type': 'Project', 'id': 2}})
+
+        _results = tk2.get_shots_sg_data(_shots, sg=_sg, page_size=4)
+        assert _sg.find_count == 5
+        assert _results[_shots[10]] is None
+        assert _results[_shots[0]]['id'] == 1
+        for _shot in _shots[:10]:
+            assert tk2.get_shot_sg_data(_shot) == _results[_shot]
+        del os.environ['PSYHIVE_DISABLE_SG_CACHE']
+
+    def test_sg_cache(self):
+
+        _sg = FakeShotgun()
+        _proj = _sg.create('Project', {'sg_code': 'test'})
+        _sg.create('Shot', {'code': 'dev0000', 'project': _proj})
+        _file = tempfile.mktemp(suffix='.db')
+        _cache = tk2.SGCache(_file, ttls={'Shot': 0.2})
+        _filters = [['project', 'is', [_proj]], ['code', 'is', 'dev0000']]
+
+        # Test responses are stored
+        _data = _cache.find(_sg, 'Shot', _filters, fields=['code'])
+        assert _data[0]['code'] == 'dev0000'
+        assert _cache.find(_sg, 'Shot', _filters, fields=['code']) == _data
+        assert _sg.find_count == 1
+        _cache.find(_sg, 'Shot', _filters)
+        assert _sg.find_count == 2
+
+        # Test read only shares responses beyond their normal expiry
+        time.sleep(0.3)
+        _ro_cache = tk2.SGCache(_file, read_only=True, ttls={'Shot': 0.2})
+        assert _ro_cache.find(_sg, 'Shot', _filters, fields=['code']) == _data
+        assert _sg.find_count == 2
+        _ro_cache.find(_sg, 'Project', [])
+        _ro_cache.find(_sg, 'Project', [])
+        assert _sg.find_count == 4
+        _ro_cache.read_only_ttl = 0.2
+        _ro_cache.find(_sg, 'Shot', _filters, fields=['code'])
+        assert _sg.find_count == 5
+
+        # Test expiry/invalidate
+        _cache.find(_sg, 'Shot', _filters, fields=['code'])
+        assert _sg.find_count == 6
+        _cache.find(_sg, 'Project', [])
+        _cache.invalidate('Project')
+        _cache.find(_sg, 'Project', [])
+        assert _sg.find_count == 8
+        _ro_cache.find(_sg, 'Project', [])
+        assert _sg.find_count == 8
+        _ro_cache.invalidate('Project')
+        _ro_cache.find(_sg, 'Project', [])
+        assert _sg.find_count == 9
+
+        # Test empty responses expire quickly
+        _cache.empty_ttl = 0.2
+        _missing = [['project', 'is', [_proj]], ['code', 'is', 'dev0010']]
+        assert not _cache.find(_sg, 'Shot', _missing)
+        assert not _cache.find(_sg, 'Shot', _missing)
+        assert _sg.find_count == 10
+        _sg.create('Shot', {'code': 'dev0010', 'project': _proj})
+        time.sleep(0.3)
+        assert _cache.find(_sg, 'Shot', _missing)
+        assert _sg.find_count == 11
+
+        # Test read only doesn't create a missing db
+        _ro_cache = tk2.SGCache(_file+'.missing', read_only=True)
+        _ro_cache.find(_sg, 'Project', [])
+        assert _sg.find_count == 12
+        assert not os.path.exists(_file+'.missing')
+        os.remove(_file)
+
 
 if __name__ == '__main__':
     unittest.main()
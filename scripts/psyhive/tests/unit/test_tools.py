@@ -1,6 +1,14 @@
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
 
+from six.moves import BaseHTTPServer, socketserver
+
 from psyhive.tools.err_catcher import Traceback
+from psyhive.tools.usage import UsageQueue
 
 _TRACEBACK_1 = r"""
 Traceback (most recent call last):
@@ -84,5 +92,118 @@ class TestErrCatcher(unittest.TestCase):
             Traceback(_tb)
 
 
+class _KibanaHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Stand-in for the elasticsearch http api."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        _exists = self.path.strip('/') in self.server.indices
+        self._respond(200 if _exists else 404)
+
+    def do_POST(self):
+        _body = self._read_body()
+        _lines = _body.strip().split('\n')
+        self.server.docs += [json.loads(_line) for _line in _lines[1::2]]
+        self._respond(200, json.dumps({'errors': False}))
+
+    def do_PUT(self):
+        self._read_body()
+        self.server.indices.add(self.path.strip('/'))
+        self._respond(200, '{}')
+
+    def log_message(self, *args):
+        pass
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers['Content-Length']))
+
+    def _respond(self, status, body=''):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _KibanaServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Stand-in elasticsearch server."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(
+            self, ('127.0.0.1', 0), _KibanaHandler)
+        self.docs = []
+        self.indices = set()
+
+
+class TestUsage(unittest.TestCase):
+
+    def test_usage_queue(self):
+
+        _server = _KibanaServer()
+        _thread = threading.Thread(target=_server.serve_forever)
+        _thread.daemon = True
+        _thread.start()
+        _url = 'http://127.0.0.1:{:d}'.format(_server.server_port)
+        _spill = tempfile.mkdtemp()
+
+        # Test flush
+        _queue = UsageQueue(
+            url=_url, spill_dir=_spill, max_docs=3, max_wait=60)
+        _queue.put('test-index', {'function': 'a'})
+        _queue.put('test-index', {'function': 'b'})
+        assert not _server.docs
+        _queue.flush()
+        assert [_doc['function'] for _doc in _server.docs] == ['a', 'b']
+        assert _server.indices == set(['test-index'])
+
+        # Test background send when queue is full
+        for _name in 'cde':
+            _queue.put('test-index', {'function': _name})
+        for _ in range(50):
+            if len(_server.docs) == 5:
+                break
+            time.sleep(0.1)
+        assert len(_server.docs) == 5
+
+        # Test spill when server unreachable
+        _dead = UsageQueue(
+            url='http://127.0.0.1:{:d}'.format(_get_free_port()),
+            spill_dir=_spill, max_wait=60)
+        _dead.put('test-index', {'function': 'f'})
+        _dead.flush()
+        assert os.path.exists(_dead.spill_file)
+        _dead.put('test-index', {'function': 'g'})
+        _dead.flush()
+        assert _dead.spilled == 2
+        assert not _dead.sent
+
+        # Test spilled docs are replayed once
+        _queue.flush()
+        assert [_doc['function'] for _doc in _server.docs[5:]] == ['f', 'g']
+        assert not os.listdir(_spill)
+        assert _queue.sent == 7
+        _queue.flush()
+        assert _queue.sent == 7
+
+        _dead.stop()
+        _queue.stop()
+        _server.shutdown()
+        _server.server_close()
+
+
+def _get_free_port():
+    """Get a port with nothing listening on it.
+
+    Returns:
+        (int): port
+    """
+    _server = _KibanaServer()
+    _port = _server.server_port
+    _server.server_close()
+    return _port
+
+
 if __name__ == '__main__':
     unittest.main()
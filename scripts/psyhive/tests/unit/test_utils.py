@@ -5,14 +5,19 @@ import shutil
 import tempfile
 import time
 import unittest
+import weakref
 
 from psyhive import pipe
+from psyhive.utils.ma_file import scan_ma
 from psyhive.utils import (
     passes_filter, apply_filter, abs_path, obj_write, obj_read, PyFile,
     store_result, restore_cwd, MissingDocs, rel_path, to_nice, wrap_fn,
     text_to_py_file, touch, get_single, find, Dir, File, get_time_t,
     get_owner, Cacheable, get_result_storer, Seq, store_result_on_obj,
-    get_result_to_file_storer, to_pascal)
+    get_result_to_file_storer, to_pascal, cache_report, clear_cache,
+    find_seqs, group_files_by_seq, find_iter, DirIndex, thread_map,
+    thread_imap_unordered, write_file, read_file, MaFile, WorkQueue,
+    Frame, comp_frames, find_toolkits)
 
 _TEST_DIR = '{}/psyhive/testing'.format(tempfile.gettempdir())
 
@@ -34,6 +39,11 @@ class TestCache(unittest.TestCase):
         assert _val != _test.get_rand(2)
         assert _val != _Test().get_rand(1)
 
+        # Test set_result
+        _test.get_rand.set_result(5, _test, 3)
+        assert _test.get_rand(3) == 5
+        assert _test.get_rand(arg=3) == 5
+
         # Test ignore_args
         @get_result_storer(ignore_args=True)
         def _test(a):
@@ -76,6 +86,67 @@ class TestCache(unittest.TestCase):
         assert _inst.test() == _result
         assert _inst.test(vers=12123) == _result
 
+        # Test result is discarded with obj
+        _ref = weakref.ref(_inst)
+        del _inst
+        assert _ref() is None
+
+    def test_result_storer_limits(self):
+
+        # Test max entries
+        _calls = []
+
+        @get_result_storer(max_entries=2)
+        def _test(arg):
+            _calls.append(arg)
+            return random.random()
+        _val = _test(1)
+        _test(2)
+        assert _test(1) == _val
+        _test(3)  # Should evict 2 (least recently used)
+        assert _test(1) == _val
+        assert _calls == [1, 2, 3]
+        _test(2)
+        assert _calls == [1, 2, 3, 2]
+
+        # Test max bytes
+        @get_result_storer(max_bytes=10000)
+        def _test(arg):
+            return 'x'*4000 + str(random.random())
+        _val = _test(1)
+        _test(2)
+        _test(3)
+        assert _test(1) != _val
+
+        # Test ttl
+        @get_result_storer(ttl=0.5)
+        def _test(arg):
+            return random.random()
+        _val = _test(1)
+        assert _test(1) == _val
+        time.sleep(1)
+        assert _test(1) != _val
+
+    def test_cache_report(self):
+
+        @store_result
+        def _test_cache_report(arg):
+            return random.random()
+        _val = _test_cache_report(1)
+        _test_cache_report(1)
+        _test_cache_report(2)
+        _stats = get_single(cache_report('_test_cache_report', verbose=0))
+        assert _stats['hits'] == 1
+        assert _stats['misses'] == 2
+        assert _stats['entries'] == 2
+        assert _stats['size']
+
+        # Test clear
+        assert clear_cache(_test_cache_report) == 1
+        assert _test_cache_report(1) != _val
+        assert clear_cache('_test_cache_report') == 1
+        assert not get_single(cache_report('_test_cache_report'))['entries']
+
 
 class TestPyFile(unittest.TestCase):
 
@@ -141,6 +212,73 @@ class TestPyFile(unittest.TestCase):
         assert _def.find_arg('b').default == [1, 2, 3]
         assert _def.find_arg('c').default == {'a': 1}
 
+    def test_find_toolkits(self):
+
+        _dir = _TEST_DIR+'/toolkits'
+        if os.path.exists(_dir):
+            shutil.rmtree(_dir)
+        for _path, _body in [
+                ('showa.py', 'import os\nLABEL = "Show A"\n'
+                             'BUTTON_LABEL = "show\\na"\nICON = None\n'),
+                ('showb.py', 'import os\nICON = os.getcwd()\n'),
+                ('showc.py', 'import psyhive_missing_mod\n'),
+                ('_private.py', ''),
+                ('showd/__init__.py', 'import psyhive_missing_mod\n'),
+                ('showd/toolkit.py', ''),
+                ('showe/__init__.py', ''),
+                ('showe/toolkit.py', 'from . import missing\n'
+                                     'raise RuntimeError\n'),
+        ]:
+            write_file(file_='{}/{}'.format(_dir, _path), text=_body)
+
+        _toolkits = find_toolkits(_dir)
+        assert [_toolkit.name for _toolkit in _toolkits] == [
+            'showa', 'showb', 'showe']
+        _show_a, _show_b, _show_e = _toolkits
+        assert _show_a.label == 'Show A'
+        assert _show_a.button_label == 'show\na'
+        assert _show_a.title == 'Show A tools'
+        assert _show_a.get_icon() is None
+        assert _show_b.label == 'Showb'
+        assert _show_e.path.endswith('showe/toolkit.py')
+
+
+class TestMaFile(unittest.TestCase):
+
+    def test(self):
+
+        _ma = MaFile(abs_path('example.ma', root=os.path.dirname(__file__)))
+        assert _ma.read_refs() == [
+            ('archer', 'P:/projects/test/assets/archer/rig/'
+             'archer_rig_v003.ma', 'archerRN'),
+            ('cam', 'P:/projects/test/shots/dev0000/camera_v001.ma',
+             'camRN')]
+        assert _ma.read_range() == (1001, 1100)
+        assert _ma.read_file_info()['comment'] == 'A "quoted" comment'
+        assert _ma.read_attrs(
+            'ExocortexAlembicFile', ['fileName', 'fn']) == {
+                'archer:abcFile': 'P:/projects/test/shots/dev0000/cache/'
+                                  'archer_v001.abc',
+                'local_abc': 'P:/projects/test/shots/dev0000/cache/'
+                             'local_v001.abc'}
+        assert _ma.read_dependencies() == {
+            'refs': {
+                'archer': 'P:/projects/test/assets/archer/rig/'
+                          'archer_rig_v003.ma',
+                'cam': 'P:/projects/test/shots/dev0000/camera_v001.ma'},
+            'abcs': {
+                'archer': 'P:/projects/test/shots/dev0000/cache/'
+                          'archer_v001.abc'}}
+
+    def test_stops_early(self):
+
+        _lines = open(abs_path(
+            'example.ma', root=os.path.dirname(__file__))).readlines()
+        _iter = iter(_lines)
+        scan_ma(_iter, refs=True, file_info=True)
+        _remaining = len(list(_iter))
+        assert _remaining == len(_lines) - 18
+
 
 class TestPath(unittest.TestCase):
 
@@ -170,6 +308,15 @@ class TestPath(unittest.TestCase):
             assert abs_path('./test.txt', root='/a/b/c') == 'A:/b/c/test.txt'
             assert abs_path('../test.txt', root='/a/b/c') == 'A:/b/test.txt'
 
+        # Test memo respects cwd
+        _dir = abs_path(os.path.dirname(__file__))
+        os.chdir(_dir)
+        assert abs_path('test.txt') == _dir + '/test.txt'
+        assert abs_path('/aa/bb/../cc') == '/aa/cc'
+        assert abs_path('/aa/bb/../cc') == '/aa/cc'
+        assert abs_path('/aa/bb/cc') == '/aa/bb/cc'
+        assert abs_path('C:/a/b', win=True) == r'C:\a\b'
+
         _root = r'Z:/dev/global/code/pipeline/bootstrap/hv-test/python'
         _path = (
             r'Z:/dev/global/code/pipeline/bootstrap/hv-test/python\psyhive\\'
@@ -195,6 +342,21 @@ class TestPath(unittest.TestCase):
         assert get_single(find(_test_dir)) == _test_file
         assert get_single(find(_test_dir, full_path=False)) == 'test.txt'
 
+        # Test find_iter
+        touch('{}/A/B/test.jpg'.format(_test_dir))
+        assert sorted(find_iter(_test_dir)) == find(_test_dir)
+        assert find(_test_dir, full_path=False) == [
+            'A', 'A/B', 'A/B/test.jpg', 'test.txt']
+        assert find(_test_dir, full_path=False, depth=2) == [
+            'A', 'A/B', 'test.txt']
+        assert find(_test_dir, full_path=False, type_='f') == [
+            'A/B/test.jpg', 'test.txt']
+        assert find(_test_dir, full_path=False, type_='d') == ['A', 'A/B']
+        assert find(_test_dir, full_path=False, extn='jpg') == [
+            'A/B/test.jpg']
+        assert find(_test_dir, class_=File, type_='f')[0] == File(
+            _test_dir+'/A/B/test.jpg')
+
     def test_delete(self):
 
         _tmp = File('{}/test.file'.format(tempfile.gettempdir()))
@@ -239,6 +401,38 @@ class TestDir(unittest.TestCase):
         assert not _file_b.parent().exists()
 
 
+class TestDirIndex(unittest.TestCase):
+
+    def test(self):
+
+        _dir = '{}/dir_index'.format(_TEST_DIR)
+        if os.path.exists(_dir):
+            shutil.rmtree(_dir)
+        touch(_dir+'/A/test.txt')
+        touch(_dir+'/test.txt')
+        _index = DirIndex(_dir+'.db', min_age=0)
+        _index.clear()
+
+        # Test listings are read from index
+        assert find(_dir, index=_index) == find(_dir)
+        assert _index.misses == 2
+        assert not _index._pending  # pylint: disable=protected-access
+        assert find(_dir, index=_index, type_='f') == find(_dir, type_='f')
+        assert _index.misses == 2
+        assert _index.hits == 2
+
+        # Test new index instance reads existing listings
+        _index = DirIndex(_dir+'.db', min_age=0)
+        assert find(_dir, index=_index, type_='d') == [_dir+'/A']
+        assert not _index.misses
+
+        # Test dir change causes rescan
+        time.sleep(0.1)
+        touch(_dir+'/A/test2.txt')
+        assert find(_dir, index=_index, type_='f') == find(_dir, type_='f')
+        assert _index.misses == 1
+
+
 class TestSeq(unittest.TestCase):
 
     def test_contains(self):
@@ -247,6 +441,63 @@ class TestSeq(unittest.TestCase):
         _file = 'P:/dev0000_animation_persp_v004.1019.jpg'
         assert _seq.contains(_file)
 
+    def test_copy_to(self):
+
+        _dir = '{}/copy_to'.format(_TEST_DIR)
+        if os.path.exists(_dir):
+            shutil.rmtree(_dir)
+        _src = Seq(_dir+'/src/src.%04d.exr')
+        for _frame in range(1, 6):
+            write_file(_src[_frame], 'frame {:d}'.format(_frame))
+        _dest = Seq(_dir+'/dest/dest.%04d.exr')
+        _stats = _src.copy_to(
+            _dest, threads=2, verify=True, progress=False)
+        assert (_stats.files, _stats.skipped) == (5, 0)
+        assert _stats.bytes_ == 35
+        assert _dest.get_frames() == range(1, 6)
+        assert read_file(_dest[3]) == 'frame 3'
+
+        # Test resume skips matching frames and removes stale partials
+        os.remove(_dest[2])
+        write_file(_dest[4], 'part', force=True)
+        for _frame in [1, 2]:
+            write_file(_dest[_frame]+'.partial', 'part')
+        _stats = _src.copy_to(
+            _dest, threads=2, resume=True, progress=False)
+        assert (_stats.files, _stats.skipped) == (2, 3)
+        assert read_file(_dest[4]) == 'frame 4'
+        assert _dest.get_frames() == range(1, 6)
+        assert not [_file for _file in os.listdir(_dir+'/dest')
+                    if _file.endswith('.partial')]
+
+    def test_find_seqs(self):
+
+        _dir = '{}/find_seqs'.format(_TEST_DIR)
+        if os.path.exists(_dir):
+            shutil.rmtree(_dir)
+        for _frame in [1, 2, 3, 10000]:
+            touch('{}/beauty/beauty.{:04d}.exr'.format(_dir, _frame))
+        touch('{}/beauty/beauty.001.exr'.format(_dir))
+        touch('{}/beauty/notes.txt'.format(_dir))
+        touch('{}/a.b.0010.jpg'.format(_dir))
+        _seqs = find_seqs(_dir)
+        assert [_seq.path for _seq in _seqs] == [
+            abs_path(_dir+'/a.b.%04d.jpg'),
+            abs_path(_dir+'/beauty/beauty.%04d.exr')]
+        assert _seqs[1].get_frames() == [1, 2, 3, 10000]
+
+    def test_group_files_by_seq(self):
+
+        _groups = group_files_by_seq([
+            '/a/b.0001.exr', '/a/c.txt', '/a/b.0002.exr', '/a/b.001.exr',
+            '/a/b.c.12345.exr', '/a/d.1.2'])
+        assert _groups == [
+            ('/a/b.%04d.exr', [1, 2]),
+            ('/a/c.txt', None),
+            ('/a/b.%03d.exr', [1]),
+            ('/a/b.c.%04d.exr', [12345]),
+            ('/a/d.%01d.2', [1])]
+
 
 class TestUtils(unittest.TestCase):
 
@@ -254,6 +505,38 @@ class TestUtils(unittest.TestCase):
 
         assert apply_filter(['a', 'b'], None) == ['a', 'b']
 
+    def test_comp_frames(self):
+
+        # Test paste with anchor and clipping
+        _out = Frame(8, 6)
+        _out.paste(Frame(3, 2, '\xff'*18), pos=(7, 1), anchor='TR')
+        assert _out.get_pixel(3, 1) == (0, 0, 0)
+        assert _out.get_pixel(4, 1) == (255, 255, 255)
+        assert _out.get_pixel(6, 2) == (255, 255, 255)
+        assert _out.get_pixel(7, 1) == (0, 0, 0)
+        assert _out.get_pixel(4, 3) == (0, 0, 0)
+        _out = Frame(8, 6)
+        _out.paste(Frame(3, 3, '\x80'*27), pos=(-1, 4))
+        assert _out.get_pixel(0, 4) == (128, 128, 128)
+        assert _out.get_pixel(1, 5) == (128, 128, 128)
+        assert _out.get_pixel(2, 5) == (0, 0, 0)
+
+        # Test comp keeps frame order, with short overlay input
+        def _comp(base, overlay):
+            if overlay:
+                base.paste(overlay, pos=(1, 1))
+            return base
+
+        _bases = [Frame(4, 4, chr(_idx)*48) for _idx in range(10)]
+        _overlays = [Frame(2, 2, chr(100+_idx)*12) for _idx in range(7)]
+        _frames = list(comp_frames(
+            _comp, [iter(_bases), iter(_overlays)], threads=4))
+        assert len(_frames) == 10
+        for _idx, _frame in enumerate(_frames):
+            assert _frame.get_pixel(0, 0) == (_idx, )*3
+            _val = 100+_idx if _idx < 7 else _idx
+            assert _frame.get_pixel(2, 2) == (_val, )*3
+
     def test_get_time_t(self):
 
         get_time_t(time.time())
@@ -294,6 +577,82 @@ class TestUtils(unittest.TestCase):
         # Test quotes
         assert passes_filter('this is text', '"This is"')
 
+    def test_work_queue(self):
+
+        _dir = '{}/work_queue'.format(_TEST_DIR)
+        if os.path.exists(_dir):
+            shutil.rmtree(_dir)
+        _items = ['item{:d}'.format(_idx) for _idx in range(20)]
+
+        # Test concurrent workers claim each item once
+        _queue = WorkQueue(_dir)
+        _claims = []
+
+        def _work(_):
+            for _item in _items:
+                _lease = _queue.claim(_item)
+                if not _lease:
+                    continue
+                with _lease:
+                    time.sleep(random.random()*0.005)
+                    _claims.append(_item)
+        thread_map(_work, range(4), threads=4)
+        assert sorted(_claims) == sorted(_items)
+        assert _queue.get_status(_items)[0] == _items
+
+        # Test expired lease can be reclaimed
+        _queue.reset(_items[:2])
+        _lease = _queue.claim(_items[0])
+        assert _lease
+        assert not _queue.claim(_items[0])
+        assert _queue.get_status(_items[:2]) == (
+            [], [_items[0]], [_items[1]])
+        _queue.lease_time = 0.0
+        _new_lease = _queue.claim(_items[0])
+        assert _new_lease
+
+        # Test expired lease doesn't affect new owner
+        _queue.lease_time = 60.0
+        assert not _lease.renew()
+        _lease.release()
+        assert not _lease.complete()
+        assert _new_lease.is_held()
+        assert not _queue.is_done(_items[0])
+        assert _new_lease.complete()
+        assert _queue.is_done(_items[0])
+
+        # Test reset without leases
+        _lease = _queue.claim(_items[1])
+        _queue.reset(_items[:2], leases=False)
+        assert not _queue.is_done(_items[0])
+        assert _lease.is_held()
+
+    def test_thread_map(self):
+
+        def _test(val):
+            time.sleep(random.random()*0.01)
+            return val*2
+        assert thread_map(_test, range(20), threads=4) == range(0, 40, 2)
+
+        # Test nested calls
+        assert thread_map(
+            lambda _val: thread_map(_test, [_val, _val]),
+            range(5), threads=4) == [[_val*2, _val*2] for _val in range(5)]
+
+        # Test error
+        def _test(val):
+            if val == 5:
+                raise ValueError(val)
+            return val
+        with self.assertRaises(ValueError):
+            thread_map(_test, range(20), threads=4)
+
+        # Test unordered results
+        _results = thread_imap_unordered(_test, range(5), threads=4)
+        assert sorted(_results) == [(_val, _val) for _val in range(5)]
+        with self.assertRaises(ValueError):
+            list(thread_imap_unordered(_test, range(20), threads=4))
+
     def test_to_nice(self):
 
         assert to_nice('_get_flex_opts') == 'Get flex opts'
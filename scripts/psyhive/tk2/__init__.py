@@ -6,7 +6,9 @@ from .tk_utils import (
     capture_scene)
 from .tk_sg import (
     get_project_sg_data, get_shot_sg_data, get_root_sg_data,
-    get_asset_sg_data, get_sg_data, create_workspaces)
+    get_asset_sg_data, get_sg_data, create_workspaces, get_shots_sg_data,
+    get_assets_sg_data, sg_find)
+from .tk_sg_cache import SGCache, get_sg_cache
 
 from .tk_templates import (
     TTSequenceRoot, TTRoot, TTStepRoot, TTWorkArea, TTWork, TTIncrement,
@@ -18,4 +20,4 @@ from .tk_templates import (
 
 from .tk_cache import (
     obtain_work, obtain_cur_work, obtain_sequences, obtain_cacheable,
-    clear_caches, obtain_assets)
+    clear_caches, obtain_assets, get_dir_index)
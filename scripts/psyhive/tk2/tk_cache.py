@@ -1,8 +1,12 @@
 """Tools for managing cacheable tank template representations."""
 
 import collections
+import os
+import threading
 
-from psyhive.utils import store_result_on_obj, Seq
+from psyhive import pipe
+from psyhive.utils import (
+    store_result_on_obj, Seq, DirIndex, build_cache_fmt, store_result)
 
 from psyhive.tk2.tk_templates import (
     TTSequenceRoot, TTRoot, TTStepRoot, TTWorkArea, TTWork, TTIncrement,
@@ -11,9 +15,23 @@ from psyhive.tk2.tk_templates import (
     TTAsset, cur_work)
 
 _CACHEABLES = collections.defaultdict(dict)
+_CACHEABLES_LOCK = threading.Lock()
 
 
-class _CTTSequenceRoot(TTSequenceRoot):
+class _CTTBase(object):
+    """Base class for any cacheable tank template object."""
+
+    @property
+    def dir_index(self):
+        """Get persistent dir listings index for this object's project.
+
+        Returns:
+            (DirIndex|None): dir index
+        """
+        return get_dir_index(self.project.path)
+
+
+class _CTTSequenceRoot(_CTTBase, TTSequenceRoot):
     """Represents a sequence root dir with caching."""
 
     @store_result_on_obj
@@ -30,7 +48,7 @@ class _CTTSequenceRoot(TTSequenceRoot):
         return [obtain_cacheable(_shot) for _shot in _shots]
 
 
-class _CTTRoot(TTRoot):
+class _CTTRoot(_CTTBase, TTRoot):
     """Represents a root dir with caching."""
 
     @store_result_on_obj
@@ -47,7 +65,7 @@ class _CTTRoot(TTRoot):
         return [obtain_cacheable(_root) for _root in _roots]
 
 
-class _CTTStepRoot(TTStepRoot):
+class _CTTStepRoot(_CTTBase, TTStepRoot):
     """Represents a step root dir with caching."""
 
     def get_work_area(self, dcc):
@@ -76,7 +94,7 @@ class _CTTStepRoot(TTStepRoot):
                 for _type in super(_CTTStepRoot, self)._read_output_types()]
 
 
-class _CTTWorkArea(TTWorkArea):
+class _CTTWorkArea(_CTTBase, TTWorkArea):
     """Represents a work area dir with caching."""
 
     @store_result_on_obj
@@ -117,7 +135,7 @@ class _CTTWorkArea(TTWorkArea):
         return super(_CTTWorkArea, self).get_metadata(verbose=verbose)
 
 
-class _CTTWork(TTWork):
+class _CTTWork(_CTTBase, TTWork):
     """Represents a work file with caching."""
 
     @store_result_on_obj
@@ -178,11 +196,11 @@ class _CTTWork(TTWork):
         self.get_metadata(force=True)
 
 
-class _CTTIncrement(TTIncrement):
+class _CTTIncrement(_CTTBase, TTIncrement):
     """Represents a work increment file with caching."""
 
 
-class _CTTOutputType(TTOutputType):
+class _CTTOutputType(_CTTBase, TTOutputType):
     """Represents an output type dir with caching."""
 
     @store_result_on_obj
@@ -199,7 +217,7 @@ class _CTTOutputType(TTOutputType):
         return [obtain_cacheable(_name) for _name in _names]
 
 
-class _CTTOutputName(TTOutputName):
+class _CTTOutputName(_CTTBase, TTOutputName):
     """Represents an output name dir with caching."""
 
     @store_result_on_obj
@@ -216,7 +234,7 @@ class _CTTOutputName(TTOutputName):
         return [obtain_cacheable(_ver) for _ver in _vers]
 
 
-class _CTTOutputVersion(TTOutputVersion):
+class _CTTOutputVersion(_CTTBase, TTOutputVersion):
     """Represents an output version dir with caching."""
 
     @store_result_on_obj
@@ -233,7 +251,7 @@ class _CTTOutputVersion(TTOutputVersion):
         return [obtain_cacheable(_out) for _out in _outs]
 
 
-class _CTTOutput(TTOutput):
+class _CTTOutput(_CTTBase, TTOutput):
     """Represents an output dir with caching."""
 
     @store_result_on_obj
@@ -250,11 +268,11 @@ class _CTTOutput(TTOutput):
                 for _file in super(_CTTOutput, self)._read_files()]
 
 
-class _CTTOutputFile(TTOutputFile):
+class _CTTOutputFile(_CTTBase, TTOutputFile):
     """Represents an output file with caching."""
 
 
-class _CTTOutputFileSeq(TTOutputFileSeq):
+class _CTTOutputFileSeq(_CTTBase, TTOutputFileSeq):
     """Represents an output file seq with caching."""
 
     move_to = Seq.move_to
@@ -289,6 +307,39 @@ def _map_class_to_cacheable(class_):
     }[class_]
 
 
+def get_dir_index(project=None):
+    """Get persistent dir listings index for the given project.
+
+    The index is stored to the project level cache and is used to avoid
+    rereading listings of dirs which haven't changed between sessions.
+    It can be disabled by setting $PSYHIVE_DISABLE_DIR_INDEX.
+
+    Args:
+        project (str): path to project (if not current)
+
+    Returns:
+        (DirIndex|None): dir index
+    """
+    if os.environ.get('PSYHIVE_DISABLE_DIR_INDEX'):
+        return None
+    return _get_dir_index(project or pipe.cur_project().path)
+
+
+@store_result
+def _get_dir_index(project):
+    """Get persistent dir listings index for the given project path.
+
+    Args:
+        project (str): path to project
+
+    Returns:
+        (DirIndex): dir index
+    """
+    _file = build_cache_fmt(
+        project, root=project+'/production', extn='db').format('dir_index')
+    return DirIndex(_file)
+
+
 def clear_caches():
     """Clear all caches."""
     global _CACHEABLES
@@ -306,12 +357,13 @@ def obtain_cacheable(source):
     """
     global _CACHEABLES
     _type = _map_class_to_cacheable(source.__class__)
-    if _type not in _CACHEABLES:
-        _CACHEABLES[_type] = {}
-    if source not in _CACHEABLES[_type]:
-        _cacheable = _type(source.path)
-        _CACHEABLES[_type][source] = _cacheable
-    return _CACHEABLES[_type][source]
+    with _CACHEABLES_LOCK:
+        if _type not in _CACHEABLES:
+            _CACHEABLES[_type] = {}
+        if source not in _CACHEABLES[_type]:
+            _cacheable = _type(source.path)
+            _CACHEABLES[_type][source] = _cacheable
+        return _CACHEABLES[_type][source]
 
 
 def obtain_assets():
@@ -320,7 +372,8 @@ def obtain_assets():
     Returns:
         (CTTRoot): asset roots
     """
-    return [obtain_cacheable(_root) for _root in find_assets()]
+    return [obtain_cacheable(_root)
+            for _root in find_assets(index=get_dir_index())]
 
 
 def obtain_sequences():
@@ -329,7 +382,8 @@ def obtain_sequences():
     Returns:
         (CTTSequenceRoot): sequences
     """
-    return [obtain_cacheable(_seq) for _seq in find_sequences()]
+    return [obtain_cacheable(_seq)
+            for _seq in find_sequences(index=get_dir_index())]
 
 
 def obtain_work(file_):
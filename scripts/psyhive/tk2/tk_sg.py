@@ -9,6 +9,10 @@ import tank
 from psyhive import pipe, qt
 from psyhive.utils import store_result, get_single, get_plural, lprint
 
+from .tk_sg_cache import get_sg_cache
+
+_PAGE_SIZE = 500
+
 
 def get_sg_data(type_, fields=None, limit=10, verbose=0, **kwargs):
     """Search shotgun for data.
@@ -33,10 +37,41 @@ def get_sg_data(type_, fields=None, limit=10, verbose=0, **kwargs):
         print 'FILTERS:'
         pprint.pprint(_filters)
 
-    _data = _sg.find(type_, filters=_filters, fields=_fields, limit=limit or 0)
+    _data = sg_find(
+        type_, filters=_filters, fields=_fields, limit=limit or 0, sg=_sg)
     return _data
 
 
+def sg_find(type_, filters, fields=None, limit=0, page=0, sg=None,
+            force=False, verbose=0):
+    """Execute a shotgun find request.
+
+    Responses are stored in the persistent shotgun cache (if enabled)
+    so that they can be shared between sessions.
+
+    Args:
+        type_ (str): entity type (eg. Shot)
+        filters (list): find filters
+        fields (str list): fields to return
+        limit (int): maximum number of results
+        page (int): page of results
+        sg (Shotgun): override shotgun connection
+        force (bool): ignore any cached response
+        verbose (int): print process data
+
+    Returns:
+        (dict list): shotgun data
+    """
+    _sg = sg or tank.platform.current_engine().shotgun
+    _cache = get_sg_cache()
+    if not _cache:
+        return _sg.find(
+            type_, filters, fields=fields, limit=limit, page=page)
+    return _cache.find(
+        _sg, type_, filters, fields=fields, limit=limit, page=page,
+        force=force, verbose=verbose)
+
+
 @store_result
 def _get_shot_sg_name(name):
     """Get shotgun name for a shot based on its disk name.
@@ -70,7 +105,7 @@ def get_asset_sg_data(asset):
     Returns:
         (dict): asset shotgun data
     """
-    _data = get_single(tank.platform.current_engine().shotgun.find(
+    _data = get_single(sg_find(
         'Asset', filters=[
             ["project", "is", [get_project_sg_data(asset.project)]],
             ["code", "is", asset.asset],
@@ -78,6 +113,97 @@ def get_asset_sg_data(asset):
     return _data
 
 
+def get_assets_sg_data(assets, sg=None, page_size=_PAGE_SIZE, verbose=0):
+    """Get shotgun data for a list of assets.
+
+    The assets are read using a single paged request for each project,
+    and the results are stored in the get_asset_sg_data cache, so that
+    subsequent calls to get_asset_sg_data don't hit shotgun.
+
+    Args:
+        assets (TTRoot list): assets to retrieve data for
+        sg (Shotgun): override shotgun connection
+        page_size (int): maximum number of items per request
+        verbose (int): print process data
+
+    Returns:
+        (dict): asset shotgun data (None if missing) by asset
+    """
+    _sg = sg or tank.platform.current_engine().shotgun
+    _results = {}
+    for _project, _assets in _group_by_project(assets).items():
+        _names = sorted(set(_asset.asset for _asset in _assets))
+        _filters = [
+            ["project", "is", [get_project_sg_data(_project)]]]
+        _sg_data = collections.defaultdict(list)
+        for _data in _find_paged(
+                _sg, 'Asset', filters=_filters, names=_names,
+                fields=['code'], page_size=page_size, verbose=verbose):
+            _sg_data[_data['code']].append(
+                {'type': _data['type'], 'id': _data['id']})
+        for _asset in _assets:
+            _matches = _sg_data.get(_asset.asset, [])
+            if len(_matches) != 1:
+                lprint('FAILED TO MATCH ASSET', _asset, _matches,
+                       verbose=verbose)
+                _results[_asset] = None
+                continue
+            _data = get_single(_matches)
+            get_asset_sg_data.set_result(_data, _asset)
+            _results[_asset] = _data
+    return _results
+
+
+def _find_paged(sg_, type_, filters, names, fields, page_size, verbose=0):
+    """Find all entities matching a list of codes.
+
+    The codes are split into chunks to keep the filter size down, and
+    each chunk is read a page at a time.
+
+    Args:
+        sg_ (Shotgun): shotgun connection
+        type_ (str): entity type
+        filters (list): filters to apply
+        names (str list): codes to match
+        fields (str list): fields to read
+        page_size (int): maximum number of items per request
+        verbose (int): print process data
+
+    Returns:
+        (dict list): shotgun data
+    """
+    _results = []
+    for _idx in range(0, len(names), page_size):
+        _names = names[_idx: _idx+page_size]
+        _filters = filters + [["code", "in", _names]]
+        _page = 1
+        while True:
+            lprint('FINDING', type_, len(_names), 'PAGE', _page,
+                   verbose=verbose)
+            _data = sg_find(type_, filters=_filters, fields=fields,
+                            limit=page_size, page=_page, sg=sg_)
+            _results += _data
+            if len(_data) < page_size:
+                break
+            _page += 1
+    return _results
+
+
+def _group_by_project(roots):
+    """Group the given roots by project.
+
+    Args:
+        roots (TTRoot list): roots to group
+
+    Returns:
+        (dict): roots by project
+    """
+    _roots = collections.defaultdict(list)
+    for _root in roots:
+        _roots[_root.project].append(_root)
+    return _roots
+
+
 @store_result
 def get_project_sg_data(project=None):
     """Get tank request data for the given project.
@@ -89,7 +215,7 @@ def get_project_sg_data(project=None):
         (dict): search data
     """
     _project = project or pipe.cur_project()
-    _data = tank.platform.current_engine().shotgun.find(
+    _data = sg_find(
         "Project", filters=[["sg_code", "is", _project.name]])
     _id = get_single(_data)['id']
     return {'type': 'Project', 'id': _id, 'name': _project.name}
@@ -122,7 +248,7 @@ def get_shot_sg_data(shot):
         (dict): search data
     """
     _sg_name = _get_shot_sg_name(shot.name)
-    _data = tank.platform.current_engine().shotgun.find(
+    _data = sg_find(
         'Shot', filters=[
             ["project", "is", [get_project_sg_data(shot.project)]],
             ["code", "is", _sg_name],
@@ -133,6 +259,46 @@ def get_shot_sg_data(shot):
     return {'type': 'Shot', 'id': _id, 'name': _get_shot_sg_name(shot.name)}
 
 
+def get_shots_sg_data(shots, sg=None, page_size=_PAGE_SIZE, verbose=0):
+    """Get shotgun data for a list of shots.
+
+    The shots are read using a single paged request for each project,
+    and the results are stored in the get_shot_sg_data cache, so that
+    subsequent calls to get_shot_sg_data don't hit shotgun.
+
+    Args:
+        shots (TTShot list): shots to retrieve data for
+        sg (Shotgun): override shotgun connection
+        page_size (int): maximum number of items per request
+        verbose (int): print process data
+
+    Returns:
+        (dict): shot shotgun data (None if missing) by shot
+    """
+    _sg = sg or tank.platform.current_engine().shotgun
+    _results = {}
+    for _project, _shots in _group_by_project(shots).items():
+        _names = sorted(set(
+            _get_shot_sg_name(_shot.name) for _shot in _shots))
+        _filters = [
+            ["project", "is", [get_project_sg_data(_project)]]]
+        _ids = {}
+        for _data in _find_paged(
+                _sg, 'Shot', filters=_filters, names=_names,
+                fields=['code'], page_size=page_size, verbose=verbose):
+            _ids[_data['code']] = _data['id']
+        for _shot in _shots:
+            _sg_name = _get_shot_sg_name(_shot.name)
+            if _sg_name not in _ids:
+                lprint('SHOT MISSING FROM SHOTGUN', _shot, verbose=verbose)
+                _results[_shot] = None
+                continue
+            _data = {'type': 'Shot', 'id': _ids[_sg_name], 'name': _sg_name}
+            get_shot_sg_data.set_result(_data, _shot)
+            _results[_shot] = _data
+    return _results
+
+
 def create_workspaces(root, force=False, verbose=0):
     """Create workspaces within the given root asset/shot.
 
@@ -0,0 +1,250 @@
+"""Tools for managing a persistent cache of shotgun responses."""
+
+import cPickle
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from psyhive import pipe
+from psyhive.utils import lprint, test_path, build_cache_fmt, store_result
+
+_HOUR = 60*60
+_TTLS = {
+    'Asset': 24*_HOUR,
+    'Project': 7*24*_HOUR,
+    'PublishedFile': 5*60,
+    'Sequence': 24*_HOUR,
+    'Shot': 24*_HOUR,
+    'Step': 7*24*_HOUR,
+    'Task': _HOUR,
+    'Version': 5*60,
+}
+_DEFAULT_TTL = 10*60
+_EMPTY_TTL = 60
+_READ_ONLY_TTL = 24*_HOUR
+
+
+class SGCache(object):
+    """Persistent cache of shotgun find responses stored in an sqlite file.
+
+    Responses are keyed by entity type, filters, fields and paging, and
+    expire after a time-to-live which depends on the entity type. Empty
+    responses expire after a short time-to-live, so that an entity which
+    is looked up before it's created isn't reported missing for long.
+
+    In read-only mode, the cache is never written to and stored responses
+    are used until they reach a single maximum age - this allows farm
+    tasks to share responses read by the submitting session without each
+    hitting shotgun once the normal time-to-live has passed.
+    """
+
+    def __init__(self, file_, read_only=False, ttls=None,
+                 empty_ttl=_EMPTY_TTL, read_only_ttl=_READ_ONLY_TTL):
+        """Constructor.
+
+        Args:
+            file_ (str): path to sqlite file
+            read_only (bool): don't write responses
+            ttls (dict): override time-to-live in secs by entity type
+            empty_ttl (float): time-to-live in secs of empty responses
+            read_only_ttl (float): time-to-live in secs of all responses
+                in read-only mode
+        """
+        self.file_ = file_
+        self.read_only = read_only
+        self.ttls = dict(_TTLS)
+        self.ttls.update(ttls or {})
+        self.empty_ttl = empty_ttl
+        self.read_only_ttl = read_only_ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = None
+        self._lock = threading.Lock()
+        self._invalidated = {}
+
+    def find(self, sg_, entity_type, filters, fields=None, limit=0, page=0,
+             force=False, verbose=0):
+        """Execute a shotgun find, using a stored response if possible.
+
+        Args:
+            sg_ (Shotgun): shotgun connection
+            entity_type (str): entity type to find
+            filters (list): find filters
+            fields (str list): fields to read
+            limit (int): maximum number of results
+            page (int): page of results
+            force (bool): ignore stored response
+            verbose (int): print process data
+
+        Returns:
+            (dict list): shotgun data
+        """
+        _key = json.dumps(
+            [entity_type, filters, sorted(fields or []), limit, page],
+            sort_keys=True, default=str)
+
+        # Try to read from cache
+        if not force:
+            with self._lock:
+                _conn = self._get_conn()
+                _row = None
+                if _conn:
+                    _row = _conn.execute(
+                        'SELECT time, data, empty FROM responses '
+                        'WHERE key=?', (_key, )).fetchone()
+            if _row and self._is_valid(
+                    entity_type, mtime=_row[0], empty=_row[2]):
+                lprint('READ SG CACHE', entity_type, verbose=verbose)
+                self.hits += 1
+                return cPickle.loads(str(_row[1]))
+
+        # Read from shotgun
+        lprint('READ SHOTGUN', entity_type, filters, verbose=verbose)
+        self.misses += 1
+        _data = sg_.find(
+            entity_type, filters, fields=fields, limit=limit, page=page)
+
+        # Update cache
+        if not self.read_only:
+            _blob = sqlite3.Binary(cPickle.dumps(_data, protocol=2))
+            with self._lock:
+                _conn = self._get_conn()
+                if _conn:
+                    try:
+                        _conn.execute(
+                            'INSERT OR REPLACE INTO responses '
+                            'VALUES (?, ?, ?, ?, ?)',
+                            (_key, entity_type, time.time(), _blob,
+                             int(not _data)))
+                        _conn.commit()
+                    except sqlite3.Error as _exc:
+                        lprint('FAILED TO UPDATE SG CACHE', _exc)
+
+        return _data
+
+    def invalidate(self, entity_type=None):
+        """Remove stored responses.
+
+        In read-only mode, the stored responses are ignored by this cache
+        instead.
+
+        Args:
+            entity_type (str): only remove responses for this entity type
+        """
+        if self.read_only:
+            self._invalidated[entity_type] = time.time()
+            return
+        with self._lock:
+            _conn = self._get_conn()
+            if not _conn:
+                return
+            if entity_type:
+                _conn.execute(
+                    'DELETE FROM responses WHERE type=?', (entity_type, ))
+            else:
+                _conn.execute('DELETE FROM responses')
+            _conn.commit()
+
+    def _is_valid(self, entity_type, mtime, empty):
+        """Test whether a stored response can be used.
+
+        Args:
+            entity_type (str): response entity type
+            mtime (float): time response was stored
+            empty (bool): whether response is empty
+
+        Returns:
+            (bool): whether response has not expired or been invalidated
+        """
+        if self.read_only:
+            _ttl = self.read_only_ttl
+        elif empty:
+            _ttl = self.empty_ttl
+        else:
+            _ttl = self.ttls.get(entity_type, _DEFAULT_TTL)
+        if time.time() - mtime >= _ttl:
+            return False
+        for _type in [None, entity_type]:
+            if mtime <= self._invalidated.get(_type, 0):
+                return False
+        return True
+
+    def _get_conn(self):
+        """Get connection to the cache database.
+
+        If the database fails to open (or in read-only mode, has not been
+        created) then None is returned, in which case all requests are
+        passed to shotgun.
+
+        Returns:
+            (Connection|None): database connection
+        """
+        if self._conn is None:
+            try:
+                if not self.read_only:
+                    test_path(os.path.dirname(self.file_))
+                elif not os.path.exists(self.file_):
+                    raise OSError('Missing file')
+                self._conn = sqlite3.connect(
+                    self.file_, timeout=30, check_same_thread=False)
+                if self.read_only:
+                    if not self._conn.execute(
+                            "SELECT name FROM sqlite_master WHERE "
+                            "type='table' AND name='responses'").fetchone():
+                        raise OSError('Missing responses table')
+                else:
+                    self._conn.execute(
+                        'CREATE TABLE IF NOT EXISTS responses '
+                        '(key TEXT PRIMARY KEY, type TEXT, time REAL, '
+                        'data BLOB, empty INTEGER)')
+            except (sqlite3.Error, OSError) as _exc:
+                lprint('FAILED TO OPEN SG CACHE', self.file_, _exc)
+                self._conn = False
+        return self._conn or None
+
+    def __repr__(self):
+        return '<{}|{}>'.format(type(self).__name__, self.file_)
+
+
+def get_sg_cache(project=None):
+    """Get persistent shotgun response cache for the given project.
+
+    The cache is stored to the project level cache. It can be disabled
+    by setting $PSYHIVE_DISABLE_SG_CACHE, and can be made read-only
+    (eg. for farm tasks) by setting $PSYHIVE_SG_CACHE_READ_ONLY.
+
+    Args:
+        project (str): path to project (if not current)
+
+    Returns:
+        (SGCache|None): shotgun cache
+    """
+    if os.environ.get('PSYHIVE_DISABLE_SG_CACHE'):
+        return None
+    if not project:
+        _project = pipe.cur_project()
+        if not _project:
+            return None
+        project = _project.path
+    return _get_sg_cache(
+        project, read_only=bool(
+            os.environ.get('PSYHIVE_SG_CACHE_READ_ONLY')))
+
+
+@store_result
+def _get_sg_cache(project, read_only):
+    """Get persistent shotgun response cache for the given project path.
+
+    Args:
+        project (str): path to project
+        read_only (bool): read-only mode
+
+    Returns:
+        (SGCache): shotgun cache
+    """
+    _file = build_cache_fmt(
+        project, root=project+'/production', extn='db').format('sg_cache')
+    return SGCache(_file, read_only=read_only)
@@ -9,7 +9,7 @@ import tank
 from psyhive import pipe, host
 from psyhive.utils import (
     Path, abs_path, lprint, Dir, find, apply_filter, get_single,
-    passes_filter, obj_read, obj_write, build_cache_fmt)
+    passes_filter, obj_read, obj_write, build_cache_fmt, thread_map)
 
 from psyhive.tk2.tk_templates.tt_utils import get_area, get_dcc, get_template
 from psyhive.tk2.tk_utils import get_current_engine
@@ -26,6 +26,7 @@ class TTBase(Path):
     hint = None
 
     hint_fmt = None
+    dir_index = None
 
     def __init__(
             self, path, hint, tmpl=None, data=None, verbose=0):
@@ -236,7 +237,7 @@ class TTSequenceRoot(TTDirBase):
             (TTRoot list): list of shots
         """
         _class = class_ or TTShot
-        return self.find(depth=1, class_=_class)
+        return self.find(depth=1, class_=_class, index=self.dir_index)
 
 
 class TTRoot(TTDirBase):
@@ -320,7 +321,8 @@ class TTRoot(TTDirBase):
             (TTStepRoot list): list of steps
         """
         _class = class_ or TTStepRoot
-        return self.find(depth=1, type_='d', class_=_class)
+        return self.find(
+            depth=1, type_='d', class_=_class, index=self.dir_index)
 
 
 class TTAsset(TTRoot):
@@ -476,13 +478,15 @@ class TTStepRoot(TTDirBase):
         Returns:
             (TTOutputName list): output names list
         """
-        _names = []
-        for _type in self.find_output_types(output_type=output_type):
-            lprint('TESTING TYPE', _type, verbose=verbose)
-            _names += _type.find_names(
+        def _find_type_names(type_):
+            lprint('TESTING TYPE', type_, verbose=verbose)
+            return type_.find_names(
                 output_name=output_name, filter_=filter_, task=task,
                 verbose=verbose)
-        return _names
+
+        return sum(thread_map(
+            _find_type_names,
+            self.find_output_types(output_type=output_type)), [])
 
     def find_output_versions(
             self, filter_=None, task=None, version=None,
@@ -500,13 +504,15 @@ class TTStepRoot(TTDirBase):
         Returns:
             (TTOutput list): list of outputs
         """
-        _vers = []
-        for _name in self.find_output_names(
+        def _find_name_versions(name):
+            lprint('TESTING NAME', name, verbose=verbose)
+            return name.find_versions(filter_=filter_, version=version)
+
+        return sum(thread_map(
+            _find_name_versions,
+            self.find_output_names(
                 task=task, output_type=output_type,
-                output_name=output_name):
-            lprint('TESTING NAME', _name, verbose=verbose)
-            _vers += _name.find_versions(filter_=filter_, version=version)
-        return _vers
+                output_name=output_name)), [])
 
     def find_outputs(self, filter_=None, task=None, version=None,
                      output_type=None, output_name=None, verbose=0):
@@ -523,13 +529,15 @@ class TTStepRoot(TTDirBase):
         Returns:
             (TTOutput list): list of outputs
         """
-        _outs = []
-        for _ver in self.find_output_versions(
+        def _find_ver_outputs(ver):
+            lprint('TESTING VER', ver, verbose=verbose)
+            return ver.find_outputs(filter_=filter_)
+
+        return sum(thread_map(
+            _find_ver_outputs,
+            self.find_output_versions(
                 task=task, output_type=output_type,
-                output_name=output_name, version=version):
-            lprint('TESTING VER', _ver, verbose=verbose)
-            _outs += _ver.find_outputs(filter_=filter_)
-        return _outs
+                output_name=output_name, version=version)), [])
 
     def find_output_file(
             self, format_=None, extn=None, version=None, task=None,
@@ -568,12 +576,10 @@ class TTStepRoot(TTDirBase):
         Returns:
             (TTOutputFileBase list): matching output files
         """
-        _files = []
-        for _out in self.find_outputs(
-                version=version, task=task, output_type=output_type):
-            _files += _out.find_files(
-                format_=format_, extn=extn)
-        return _files
+        return sum(thread_map(
+            lambda _out: _out.find_files(format_=format_, extn=extn),
+            self.find_outputs(
+                version=version, task=task, output_type=output_type)), [])
 
     def find_renders(self):
         """Find renders in this step root.
@@ -635,4 +641,5 @@ class TTStepRoot(TTDirBase):
         _hint = '{}_output_root'.format(self.area)
         _tmpl = get_template(_hint)
         _root = _tmpl.apply_fields(self.data)
-        return find(_root, depth=1, class_=class_ or TTOutputType)
+        return find(_root, depth=1, class_=class_ or TTOutputType,
+                    index=self.dir_index)
@@ -8,8 +8,8 @@ from transgen import helper
 
 from psyhive import pipe
 from psyhive.utils import (
-    File, abs_path, lprint, apply_filter, Seq, seq_from_frame,
-    get_single, Movie)
+    File, abs_path, lprint, apply_filter, Seq, group_files_by_seq,
+    get_single, Movie, thread_map)
 
 
 from .tt_base import TTDirBase, TTBase
@@ -83,7 +83,8 @@ class TTOutputType(TTDirBase):
         Returns:
             (TTOutputName list): list of output names
         """
-        return self.find(depth=1, class_=class_ or TTOutputName)
+        return self.find(
+            depth=1, class_=class_ or TTOutputName, index=self.dir_index)
 
 
 class TTOutputName(TTDirBase):
@@ -147,7 +148,8 @@ class TTOutputName(TTDirBase):
         Returns:
             (TTOutputVersion list): list of versions
         """
-        return self.find(depth=1, class_=class_ or TTOutputVersion)
+        return self.find(
+            depth=1, class_=class_ or TTOutputVersion, index=self.dir_index)
 
 
 class TTOutputVersion(TTDirBase):
@@ -191,8 +193,10 @@ class TTOutputVersion(TTDirBase):
         Returns:
             (TTOutputFile|TTOutputFileSeq list): matching output files
         """
-        return sum([_out.find_files(extn=extn, format_=format_, class_=class_)
-                    for _out in self.find_outputs()], [])
+        return sum(thread_map(
+            lambda _out: _out.find_files(
+                extn=extn, format_=format_, class_=class_),
+            self.find_outputs()), [])
 
     def find_latest(self):
         """Find latest version of this output.
@@ -241,7 +245,8 @@ class TTOutputVersion(TTDirBase):
         Returns:
             (TTOutput list): list of outputs
         """
-        return self.find(depth=1, class_=class_ or TTOutput)
+        return self.find(
+            depth=1, class_=class_ or TTOutput, index=self.dir_index)
 
 
 class TTOutput(TTDirBase):
@@ -332,61 +337,41 @@ class TTOutput(TTDirBase):
         """
         lprint('SEARCHING FOR OUTPUTS', verbose=verbose)
 
-        _files = self.find(type_='f', depth=3)
+        _files = self.find(type_='f', depth=3, index=self.dir_index)
         lprint(' - FOUND {:d} FILES'.format(len(_files)), verbose=verbose)
 
         # Map files to outputs
         _outputs = []
-        _seqs = {}
-        for _file in _files:
-
-            # Ignore files already matched in seq
-            _already_matched = False
-            for _seq in _seqs:
-                if _seq.contains(_file):
-                    _already_matched = True
-                    _frame = _seq.get_frame(_file)
-                    _seqs[_seq].add(_frame)
-                    lprint(' - EXISTING SEQ', _file, verbose=verbose > 2)
-                    break
-            if _already_matched:
-                continue
-
-            _output = None
-            lprint(' - TESTING', _file, verbose=verbose > 1)
+        for _path, _frames in group_files_by_seq(_files):
 
             # Match seq
-            _seq = seq_from_frame(_file, catch=True)
-            if _seq:
+            if _frames is not None:
+                lprint(' - TESTING SEQ', _path, verbose=verbose > 1)
                 try:
-                    _output = TTOutputFileSeq(_seq.path)
+                    _output = TTOutputFileSeq(_path)
                 except ValueError:
-                    lprint('   - NOT TTOutputFileSeq', _file,
+                    lprint('   - NOT TTOutputFileSeq', _path,
                            verbose=verbose > 1)
                 else:
-                    _frame = _output.get_frame(_file)
-                    _seqs[_output] = set([_frame])
+                    _output.set_frames(_frames)
+                    lprint(' - ADDED OUTPUT', _output, verbose=verbose)
+                    _outputs.append(_output)
+                    continue
+                _paths = [_path % _frame for _frame in _frames]
             else:
-                lprint('   - NOT OUTPUT FILE SEQ', _file,
-                       verbose=verbose > 1)
+                _paths = [_path]
 
-            # Match file
-            if not _output:
+            # Match files
+            for _file in _paths:
+                lprint(' - TESTING', _file, verbose=verbose > 1)
                 try:
                     _output = TTOutputFile(_file)
                 except ValueError:
                     lprint('   - NOT OUTPUT FILE', _file,
                            verbose=verbose > 1)
-
-            if not _output:
-                continue
-
-            lprint(' - ADDED OUTPUT', _output, verbose=verbose)
-            _outputs.append(_output)
-
-        # Apply frames cache
-        for _seq, _frames in _seqs.items():
-            _seq.set_frames(sorted(_frames))
+                    continue
+                lprint(' - ADDED OUTPUT', _output, verbose=verbose)
+                _outputs.append(_output)
 
         return _outputs
 
@@ -492,6 +477,11 @@ class _TTOutputFileBase(TTBase):
         _framework_sg.register_publish(
             _path, complete=complete, workspace=_sg_workspace, **kwargs)
 
+        # Discard stored publish responses
+        _sg_cache = tk2.get_sg_cache()
+        if _sg_cache:
+            _sg_cache.invalidate('PublishedFile')
+
     @property
     def ver_n(self):
         """Get this output's version number as an integer.
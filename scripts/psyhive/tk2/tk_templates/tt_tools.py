@@ -1,7 +1,7 @@
 """Tools for managing tank template representations."""
 
 from psyhive import pipe, host
-from psyhive.utils import find, get_single, passes_filter
+from psyhive.utils import find, get_single, passes_filter, thread_map
 
 from .tt_base import TTSequenceRoot, TTStepRoot, TTShot, TTAsset
 from .tt_work import TTWork
@@ -59,18 +59,20 @@ def find_asset(filter_=None, asset=None, catch=False):
     return get_single(_assets, catch=catch, verbose=1)
 
 
-def find_assets(filter_=None):
+def find_assets(filter_=None, index=None):
     """Read asset roots.
 
     Args:
         filter_ (str): filter by file path
+        index (DirIndex): read dir listings from this index
 
     Returns:
         (TTAsset list): list of assets in this show
     """
     _root = pipe.cur_project().path+'/assets'
     _roots = []
-    for _dir in find(_root, depth=3, type_='d', filter_=filter_):
+    for _dir in find(_root, depth=3, type_='d', filter_=filter_,
+                     index=index):
         try:
             _asset = TTAsset(_dir)
         except ValueError:
@@ -80,15 +82,18 @@ def find_assets(filter_=None):
     return _roots
 
 
-def find_sequences():
+def find_sequences(index=None):
     """Find sequences in the current project.
 
+    Args:
+        index (DirIndex): read dir listings from this index
+
     Returns:
         (TTSequenceRoot): list of sequences
     """
     _seq_path = pipe.cur_project().path+'/sequences'
     _seqs = []
-    for _path in find(_seq_path, depth=1):
+    for _path in find(_seq_path, depth=1, index=index):
         _seq = TTSequenceRoot(_path)
         _seqs.append(_seq)
     return _seqs
@@ -129,9 +134,9 @@ def find_shots(class_=None, filter_=None, sequence=None, mode='disk'):
         _seqs = find_sequences()
         if sequence:
             _seqs = [_seq for _seq in _seqs if _seq.name == sequence]
-        return sum([
-            _seq.find_shots(class_=class_, filter_=filter_)
-            for _seq in _seqs], [])
+        return sum(thread_map(
+            lambda _seq: _seq.find_shots(class_=class_, filter_=filter_),
+            _seqs), [])
     elif mode == 'sg':
         from psyhive import tk2
         _path_fmt = '{}/sequences/{}/{}'
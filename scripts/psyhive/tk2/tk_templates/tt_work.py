@@ -46,7 +46,8 @@ class TTWorkArea(TTDirBase):
         _tmp_inc = self.map_to(
             hint=_hint, class_=TTIncrement, Task='blah', increment=0,
             extension=get_extn(self.dcc), version=0)
-        return find(_tmp_inc.dir, depth=1, type_='f', class_=TTIncrement)
+        return find(_tmp_inc.dir, depth=1, type_='f', class_=TTIncrement,
+                    index=self.dir_index)
 
     def find_work(self, class_=None, task=None):
         """Find work files in this shot area.
@@ -59,15 +60,23 @@ class TTWorkArea(TTDirBase):
             (TTWork list): list of work files
         """
         _class = class_ or TTWork
+        _works = find(self.get_work_dir(), depth=1, type_='f', class_=_class,
+                      index=self.dir_index)
+        if task:
+            _works = [_work for _work in _works if _work.task == task]
+        return _works
+
+    def get_work_dir(self):
+        """Get dir containing work files in this work area.
+
+        Returns:
+            (str): work dir
+        """
         _hint = '{}_{}_work'.format(self.dcc, self.area)
-        _tmpl = get_template(_hint)
         _test_work = self.map_to(
             hint=_hint, Task=self.step, extension=get_extn(self.dcc),
             version=1, class_=TTWork)
-        _works = find(_test_work.dir, depth=1, type_='f', class_=_class)
-        if task:
-            _works = [_work for _work in _works if _work.task == task]
-        return _works
+        return _test_work.dir
 
     def get_metadata(self, verbose=1):
         """Read this work area's metadata yaml file.
@@ -90,6 +90,9 @@ class VendorSeq(Seq, Ingestible):
 
         if not _out.exists():
             return 'Ready to ingest', True
+        if not _out.cache_read('vendor_source') and (
+                _out.get_frames(force=True) != self.get_frames()):
+            return 'Partially copied', True
 
         # Check current source matches
         _src = _out.cache_read('vendor_source')
@@ -124,8 +127,11 @@ class VendorSeq(Seq, Ingestible):
         _out = self.to_psy_file_seq()
         print ' - OUT', _out.path
 
-        # Create images on psy side
-        if not _out.exists():
+        # Create images on psy side - an interrupted copy is resumed
+        if (
+                not _out.exists() or
+                not _out.cache_read('vendor_source') and
+                _out.get_frames(force=True) != self.get_frames()):
 
             # Check asset/shot + step exists
             _root = tk2.TTRoot(_out.path)
@@ -136,7 +142,7 @@ class VendorSeq(Seq, Ingestible):
             print ' - STEP EXISTS', _step.path
 
             # Copy images
-            self.copy_to(_out)
+            self.copy_to(_out, verify=True, resume=True)
             _out.cache_write('vendor_source', self.path)
             print ' - COPIED IMAGES'
 
@@ -1,17 +1,33 @@
-"""Tools for tracking tool usage using kibana."""
+"""Tools for tracking tool usage using kibana.
 
+Usage data is queued and written in bulk from a background thread, so
+that tracked tools don't wait on the kibana server.
+"""
+
+import atexit
 import datetime
 import functools
 import getpass
+import json
 import os
 import pprint
 import platform
+import socket
+import tempfile
+import threading
 import time
 
+from six.moves import http_client
+from six.moves.urllib.parse import urlparse
+
 from psyhive import host
-from psyhive.utils import dprint, dev_mode
+from psyhive.utils import (
+    dprint, dev_mode, abs_path, store_result, test_path)
 
 _ELASTIC_URL = 'http://la1dock001.psyop.tv:9200'
+_MAX_SPILL = 10000
+_SPILL_DIR = abs_path('{}/psyhive/usage_spill'.format(
+    tempfile.gettempdir()))
 _ES_DATA_TYPE = 'data'
 _INDEX_MAPPING = {
     'mappings': {
@@ -45,7 +61,7 @@ def _build_usage_dict(name, args):
         'function': name,
         'machine_name': platform.node(),
         'project': os.environ.get('PSYOP_PROJECT'),
-        'timestamp': datetime.datetime.utcnow(),
+        'timestamp': datetime.datetime.utcnow().isoformat(),
         'username': getpass.getuser(),
     }
 
@@ -66,12 +82,280 @@ def _build_usage_dict(name, args):
     return _usage
 
 
-def _write_usage_to_kibana(name=None, catch=True, args=None, verbose=0):
-    """Write usage data to kibana index.
+class UsageQueue(object):
+    """Queue which writes usage data to kibana in a background thread.
+
+    Documents are sent using the elasticsearch bulk api over a single
+    pooled connection, either when max_docs documents are queued or
+    after max_wait secs. If the server can't be reached, documents are
+    spilled to a file in the spill dir and replayed on the next send.
+
+    Each queue spills to its own file. Before replaying, spill files are
+    claimed by renaming them, so that documents spilled by other
+    sessions on this machine are replayed exactly once.
+    """
+
+    def __init__(self, url=_ELASTIC_URL, spill_dir=_SPILL_DIR,
+                 max_docs=50, max_wait=10.0, retry_wait=60.0,
+                 timeout=5.0, verbose=0):
+        """Constructor.
+
+        Args:
+            url (str): elasticsearch url
+            spill_dir (str): dir to store unsent documents in
+            max_docs (int): send when this many documents are queued
+            max_wait (float): send queued documents after this many secs
+            retry_wait (float): after a failed send, spill documents
+                without trying to connect for this many secs
+            timeout (float): connection timeout in secs
+            verbose (int): print process data
+        """
+        _url = urlparse(url)
+        self.host = _url.hostname
+        self.port = _url.port
+        self.spill_dir = spill_dir
+        self.spill_file = '{}/{:d}_{:d}.json'.format(
+            spill_dir, os.getpid(), id(self))
+        self.max_docs = max_docs
+        self.max_wait = max_wait
+        self.retry_wait = retry_wait
+        self.timeout = timeout
+        self.verbose = verbose
+        self.sent = 0
+        self.spilled = 0
+
+        self._conn = None
+        self._docs = []
+        self._indices = set()
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._retry_time = 0.0
+        self._stopped = False
+        self._thread = None
+        self._wake = threading.Event()
+
+    def flush(self):
+        """Send all queued documents now."""
+        with self._lock:
+            _docs, self._docs = self._docs, []
+        with self._send_lock:
+            self._send(_docs)
+
+    def put(self, index, doc):
+        """Add a document to the queue.
+
+        Args:
+            index (str): name of index to write to
+            doc (dict): usage document
+        """
+        with self._lock:
+            self._docs.append((index, doc))
+            _full = len(self._docs) >= self.max_docs
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+        if _full:
+            self._wake.set()
+
+    def stop(self):
+        """Stop the background thread and send any queued documents."""
+        self._stopped = True
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+    def _create_index(self, index):
+        """Create the given index if it doesn't exist.
+
+        Args:
+            index (str): name of index
+        """
+        _status, _ = self._request('HEAD', '/'+index)
+        if _status == 404:
+            _status, _data = self._request(
+                'PUT', '/'+index, body=json.dumps(_INDEX_MAPPING))
+            if _status >= 300 and 'already_exists' not in _data:
+                raise RuntimeError('Failed to create index {} ({:d})'.format(
+                    index, _status))
+        elif _status >= 300:
+            raise RuntimeError('Failed to read index {} ({:d})'.format(
+                index, _status))
+        self._indices.add(index)
+
+    def _claim_spill(self):
+        """Claim spill files written by any session on this machine.
+
+        Each file is renamed before it's read, so only one session can
+        claim it.
+
+        Returns:
+            (str list): paths to claimed files
+        """
+        try:
+            _names = os.listdir(self.spill_dir)
+        except OSError:
+            return []
+        _claimed = []
+        for _name in sorted(_names):
+            if not _name.endswith('.json'):
+                continue
+            _path = '{}/{}'.format(self.spill_dir, _name)
+            _claim = '{}.{:d}_{:d}.claim'.format(
+                _path, os.getpid(), id(self))
+            try:
+                os.rename(_path, _claim)
+            except OSError:
+                continue
+            _claimed.append(_claim)
+        return _claimed
+
+    def _read_spill(self, files):
+        """Read documents spilled to disk by a failed send.
+
+        Args:
+            files (str list): claimed spill files
+
+        Returns:
+            (tuple list): list of index/document pairs
+        """
+        _docs = []
+        for _path in files:
+            try:
+                with open(_path) as _file:
+                    _lines = _file.readlines()
+            except (OSError, IOError):
+                continue
+            for _line in _lines:
+                try:
+                    _index, _doc = json.loads(_line)
+                except ValueError:
+                    continue
+                _docs.append((_index, _doc))
+        return _docs
+
+    def _request(self, method, path, body=None, headers=None):
+        """Make a request using the pooled connection.
+
+        Args:
+            method (str): request method
+            path (str): request path
+            body (str): request body
+            headers (dict): request headers
+
+        Returns:
+            (tuple): response status, response data
+        """
+        if not self._conn:
+            self._conn = http_client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout)
+        self._conn.request(method, path, body=body, headers=headers or {})
+        _resp = self._conn.getresponse()
+        return _resp.status, _resp.read()
+
+    def _run(self):
+        """Send documents whenever the queue fills or times out."""
+        while not self._stopped:
+            self._wake.wait(self.max_wait)
+            self._wake.clear()
+            self.flush()
+
+    def _send(self, docs):
+        """Send documents to kibana, along with any spilled documents.
+
+        Args:
+            docs (tuple list): list of index/document pairs
+        """
+        if time.time() < self._retry_time:
+            self._spill(docs)
+            return
+        _claimed = self._claim_spill()
+        _docs = self._read_spill(_claimed) + docs
+        _remove_files(_claimed)
+        if not _docs:
+            return
+
+        _start = time.time()
+        try:
+            for _index in sorted(set(
+                    _index for _index, _ in _docs) - self._indices):
+                self._create_index(_index)
+            _body = ''
+            for _index, _doc in _docs:
+                _body += json.dumps(
+                    {'index': {'_index': _index, '_type': _ES_DATA_TYPE}})
+                _body += '\n'+json.dumps(_doc)+'\n'
+            _status, _ = self._request(
+                'POST', '/_bulk', body=_body,
+                headers={'Content-Type': 'application/x-ndjson'})
+            if _status >= 300:
+                raise RuntimeError('Bulk write failed ({:d})'.format(_status))
+        except (socket.error, http_client.HTTPException,
+                RuntimeError) as _exc:
+            dprint('Failed to write usage to kibana', _exc)
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+            self._retry_time = time.time() + self.retry_wait
+            self._spill(_docs)
+            return
+
+        self.sent += len(_docs)
+        dprint('Wrote {:d} usage docs to kibana ({:.02f}s)'.format(
+            len(_docs), time.time() - _start), verbose=self.verbose)
+
+    def _spill(self, docs):
+        """Append unsent documents to this queue's spill file.
+
+        Args:
+            docs (tuple list): list of index/document pairs
+        """
+        if not docs:
+            return
+        try:
+            test_path(self.spill_dir)
+            with open(self.spill_file, 'a') as _file:
+                for _index, _doc in docs[-_MAX_SPILL:]:
+                    _file.write(json.dumps([_index, _doc])+'\n')
+        except (OSError, IOError) as _exc:
+            dprint('Failed to spill usage', _exc)
+            return
+        self.spilled += len(docs)
+
+
+def _remove_files(files):
+    """Remove the given files, ignoring any which fail.
+
+    Args:
+        files (str list): paths to remove
+    """
+    for _path in files:
+        try:
+            os.remove(_path)
+        except OSError:
+            pass
+
+
+@store_result
+def _get_usage_queue():
+    """Get the usage queue for this session.
+
+    Any queued documents are sent on exit.
+
+    Returns:
+        (UsageQueue): usage queue
+    """
+    _queue = UsageQueue()
+    atexit.register(_queue.stop)
+    return _queue
+
+
+def _queue_usage(name=None, args=None, verbose=0):
+    """Add usage data to the queue to be written to kibana.
 
     Args:
         name (str): override function name
-        catch (bool): on fail continue and disable usage tracking
         args (tuple): args data to write to usage
         verbose (int): print process data
     """
@@ -80,12 +364,6 @@ def _write_usage_to_kibana(name=None, catch=True, args=None, verbose=0):
     if os.environ.get('USER') == 'render' or dev_mode():
         return
 
-    try:
-        from elasticsearch import Elasticsearch
-    except ImportError:
-        return
-
-    _start = time.time()
     _index_name = 'psyhive-'+datetime.datetime.utcnow().strftime('%Y.%m')
     _usage = _build_usage_dict(name=name, args=args)
 
@@ -93,22 +371,7 @@ def _write_usage_to_kibana(name=None, catch=True, args=None, verbose=0):
         print _index_name
         pprint.pprint(_usage)
 
-    # Send to kibana
-    _conn = Elasticsearch([_ELASTIC_URL])
-    if not _conn.ping():
-        if catch:
-            dprint('Failed to make connection to Elasticsearch')
-            os.environ['PSYHIVE_DISABLE_USAGE'] = '1'
-            return
-        raise RuntimeError('Cannot connect to Elasticsearch database.')
-    if not _conn.indices.exists(_index_name):
-        _conn.indices.create(index=_index_name, body=_INDEX_MAPPING)
-    _res = _conn.index(
-        index=_index_name, doc_type=_ES_DATA_TYPE, body=_usage,
-        id=_usage.pop('_id', None))
-    _usage['_id'] = _res['_id']
-    _dur = time.time() - _start
-    dprint('Wrote usage to kibana ({:.02f}s)'.format(_dur), verbose=verbose)
+    _get_usage_queue().put(_index_name, _usage)
 
 
 def get_usage_tracker(name=None, args=False, verbose=0):
@@ -128,7 +391,7 @@ def get_usage_tracker(name=None, args=False, verbose=0):
         @functools.wraps(func)
         def _usage_tracked_fn(*args_, **kwargs):
             if not os.environ.get('PSYHIVE_DISABLE_USAGE'):
-                _write_usage_to_kibana(
+                _queue_usage(
                     name=name or func.__name__, verbose=verbose,
                     args=(args_, kwargs) if args else None)
             return func(*args_, **kwargs)
@@ -3,10 +3,12 @@
 from .cache import (
     store_result, Cacheable, get_result_to_file_storer, obj_read, obj_write,
     store_result_to_file, store_result_on_obj, get_result_storer,
-    store_result_content_dependent, build_cache_fmt, ReadError, CacheMissing)
+    store_result_content_dependent, build_cache_fmt, ReadError, CacheMissing,
+    cache_report, clear_cache)
 from .dev_ import dev_mode, set_dev_mode, revert_dev_mode
 from .email_ import send_email
 from .heart import check_heart, HEART
+from .frame_stream import Frame, FrameWriter, comp_frames, read_frames
 from .filter_ import passes_filter, apply_filter
 from .misc import (
     lprint, system, dprint, wrap_fn, chain_fns, to_nice, get_single,
@@ -14,14 +16,21 @@ from .misc import (
     to_camel, val_map, get_time_t, clamp, read_url, safe_zip, is_pascal,
     nice_age, get_time_f, to_pascal)
 from .cfg import get_cfg, set_cfg
+from .copy_ import CopyError, CopyStats, copy_file, copy_files, is_copied
 from .path import (
-    File, Path, Dir, abs_path, read_file, find, write_file, replace_file,
-    search_files_for_text, test_path, touch, restore_cwd, rel_path, FileError,
-    diff, write_yaml, read_yaml, nice_size, get_copy_path_fn, get_owner,
-    launch_browser, get_path)
+    File, Path, Dir, DirIndex, abs_path, read_file, find, find_iter,
+    write_file, replace_file, search_files_for_text, test_path, touch,
+    restore_cwd, rel_path, FileError, diff, write_yaml, read_yaml, nice_size,
+    get_copy_path_fn, get_owner, launch_browser, get_path)
+from .ma_file import MaFile, MaRef
+from .pool import (
+    thread_map, thread_imap_unordered, get_thread_count, set_thread_count)
 from .py_file import (
-    PyFile, MissingDocs, text_to_py_file, PyBase, PyDef, PyClass)
+    PyFile, MissingDocs, text_to_py_file, PyBase, PyDef, PyClass,
+    ToolkitInfo, find_toolkits, read_module_attrs)
 from .range_ import (
     ints_to_str, str_to_ints, ValueRange, fr_range, fr_enumerate,
     str_to_frames, str_to_range)
-from .seq import Seq, Collection, seq_from_frame, Movie, find_seqs
+from .seq import (
+    Seq, Collection, seq_from_frame, Movie, find_seqs, group_files_by_seq)
+from .work_queue import WorkQueue, Lease, LEASE_TIME
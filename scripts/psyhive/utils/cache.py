@@ -1,18 +1,24 @@
 """Tools for managing the caching of data."""
 
+import collections
 import cPickle
 import functools
 import inspect
 import operator
 import os
 import shutil
+import sys
 import tempfile
+import threading
 import time
+import weakref
 
 import six
 
 from .filter_ import passes_filter
-from .misc import lprint, dprint
+from .misc import lprint, dprint, bytes_to_str
+
+_RESULT_CACHES = weakref.WeakSet()
 
 
 class Cacheable(object):
@@ -83,6 +89,190 @@ class Cacheable(object):
         return _file.path
 
 
+class _ResultCache(object):
+    """Stores the results of a memoised function.
+
+    Entries are held in least recently used order so that the cache can
+    be bounded by number of entries and by approximate size in bytes.
+    Entries can also be given a maximum age, after which they expire.
+    Entries can be tied to the lifetime of an owner object using a
+    weakref, so they are discarded when the owner is garbage collected.
+
+    Each cache is added to a global registry and records hit/miss
+    statistics so that it can be inspected using cache_report.
+
+    Access is locked so that a cache can be shared between threads.
+    """
+
+    def __init__(self, name, max_entries=None, max_bytes=None, ttl=None):
+        """Constructor.
+
+        Args:
+            name (str): name of the memoised function
+            max_entries (int): max number of entries to store
+            max_bytes (int): max approximate size of stored results
+            ttl (float): age in seconds after which an entry expires
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.compute_time = 0.0
+
+        self.n_bytes = 0
+        self._entries = collections.OrderedDict()
+        self._owners = {}
+        self._sizes = {}
+        self._times = {}
+        self._lock = threading.RLock()
+
+        _RESULT_CACHES.add(self)
+
+    def clear(self):
+        """Remove all entries from this cache."""
+        for _key in self.keys():
+            self.pop(_key)
+
+    def get_size(self):
+        """Get approximate size in bytes of the results in this cache.
+
+        Returns:
+            (int): size in bytes
+        """
+        if self.max_bytes is not None:
+            return self.n_bytes
+        with self._lock:
+            _results = self._entries.values()
+        return sum([_get_approx_size(_result) for _result in _results])
+
+    def get_stats(self):
+        """Get statistics for this cache.
+
+        Returns:
+            (dict): cache statistics
+        """
+        return {
+            'name': self.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'compute_time': self.compute_time,
+            'entries': len(self),
+            'size': self.get_size()}
+
+    def lookup(self, key):
+        """Look up the result stored for the given key.
+
+        Expired entries are removed, and a valid entry is marked as most
+        recently used.
+
+        Args:
+            key (any): key to read
+
+        Returns:
+            (tuple): whether a valid entry was found, stored result
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            if (
+                    self.ttl is not None and
+                    time.time() - self._times[key] > self.ttl):
+                self.pop(key)
+                return False, None
+            _result = self._entries.pop(key)
+            self._entries[key] = _result
+            return True, _result
+
+    def record_hit(self):
+        """Record that a stored result was used."""
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self, duration):
+        """Record that a result had to be calculated.
+
+        Args:
+            duration (float): time taken to calculate result (in secs)
+        """
+        with self._lock:
+            self.misses += 1
+            self.compute_time += duration
+
+    def keys(self):
+        """Get list of keys stored in this cache.
+
+        Returns:
+            (list): keys
+        """
+        with self._lock:
+            return self._entries.keys()
+
+    def pop(self, key):
+        """Remove the given entry from this cache.
+
+        Args:
+            key (any): key to remove
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._owners.pop(key, None)
+            self._times.pop(key, None)
+            self.n_bytes -= self._sizes.pop(key, 0)
+
+    def set(self, key, result, owner=None):
+        """Store a result in this cache.
+
+        Args:
+            key (any): key to store result under
+            result (any): result to store
+            owner (any): object whose lifetime the entry is tied to
+        """
+        _size = _get_approx_size(result) if self.max_bytes is not None else 0
+        with self._lock:
+            self.pop(key)
+            self._entries[key] = result
+            self._times[key] = time.time()
+            if owner is not None:
+                try:
+                    self._owners[key] = weakref.ref(
+                        owner, functools.partial(self._owner_deleted, key))
+                except TypeError:  # Owner doesn't support weakrefs
+                    self._owners[key] = owner
+            if self.max_bytes is not None:
+                self._sizes[key] = _size
+                self.n_bytes += _size
+            self._apply_limits()
+
+    def _apply_limits(self):
+        """Discard least recently used entries until within limits."""
+        while self._entries and (
+                (self.max_entries is not None and
+                 len(self._entries) > self.max_entries) or
+                (self.max_bytes is not None and
+                 self.n_bytes > self.max_bytes)):
+            self.pop(next(iter(self._entries)))
+
+    def _owner_deleted(self, key, ref):
+        """Executed when the owner of an entry is garbage collected.
+
+        Args:
+            key (any): key of entry
+            ref (weakref): dead reference to owner
+        """
+        with self._lock:
+            if self._owners.get(key) is ref:
+                self.pop(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return '<{}|{}>'.format(type(self).__name__.strip('_'), self.name)
+
+
 class CacheMissing(OSError):
     """Raise when a cache doesn't exist."""
 
@@ -131,6 +321,77 @@ def build_cache_fmt(
         extn=extn, namespace=namespace))
 
 
+def _get_approx_size(obj, depth=3):
+    """Get approximate size in bytes of the given object.
+
+    Containers are traversed to the given depth.
+
+    Args:
+        obj (any): object to measure
+        depth (int): max container depth to traverse
+
+    Returns:
+        (int): approximate size in bytes
+    """
+    _size = sys.getsizeof(obj, 0)
+    if depth:
+        if isinstance(obj, dict):
+            for _key, _val in obj.items():
+                _size += _get_approx_size(_key, depth=depth-1)
+                _size += _get_approx_size(_val, depth=depth-1)
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            for _item in obj:
+                _size += _get_approx_size(_item, depth=depth-1)
+    return _size
+
+
+def cache_report(filter_=None, sort='compute_time', verbose=1):
+    """Report statistics for all registered result caches.
+
+    Args:
+        filter_ (str): filter by function name
+        sort (str): stat to sort by (highest first)
+        verbose (int): print report
+
+    Returns:
+        (dict list): stats for each cache
+    """
+    _stats = [_cache.get_stats() for _cache in list(_RESULT_CACHES)
+              if passes_filter(_cache.name, filter_)]
+    _stats.sort(key=operator.itemgetter(sort), reverse=True)
+
+    if verbose:
+        print '{:>8} {:>8} {:>10} {:>8} {:>10}  {}'.format(
+            'HITS', 'MISSES', 'TIME', 'ENTRIES', 'SIZE', 'NAME')
+        for _stat in _stats:
+            print '{:>8d} {:>8d} {:>9.02f}s {:>8d} {:>10}  {}'.format(
+                _stat['hits'], _stat['misses'], _stat['compute_time'],
+                _stat['entries'], bytes_to_str(_stat['size']),
+                _stat['name'])
+
+    return _stats
+
+
+def clear_cache(func):
+    """Clear stored results of the given function.
+
+    Args:
+        func (fn|str): memoised function, or name of function in
+            registry (all caches with this name are cleared)
+
+    Returns:
+        (int): number of caches cleared
+    """
+    if isinstance(func, six.string_types):
+        _caches = [_cache for _cache in list(_RESULT_CACHES)
+                   if func in (_cache.name, _cache.name.split('.')[-1])]
+    else:
+        _caches = [func.result_cache]
+    for _cache in _caches:
+        _cache.clear()
+    return len(_caches)
+
+
 def _depend_path_makes_cache_outdated(
         cache_file, depend_path, cache_file_exists=None, verbose=0):
     """Check of a depend path makes a cache outdated.
@@ -163,13 +424,23 @@ def _depend_path_makes_cache_outdated(
 def get_result_storer(
         key=None, timeout=None, ignore_args=False, id_as_key=False,
         get_depend_var=None, args_filter=None, get_depend_path=None,
-        verbose=0):
+        max_entries=None, max_bytes=None, ttl=None, name=None, verbose=0):
     """Build a decorator to store the result of a function.
 
     By default, the result is regenerated for each combination of args. If
     any combination of args is applied to the function more than once,
     the result from the initial execution of the function is used.
 
+    The number of stored results can be bounded using the max_entries
+    and max_bytes args, in which case the least recently used results
+    are discarded first. If id_as_key is used, results are discarded
+    when the first arg is garbage collected (where the object supports
+    weakrefs).
+
+    The decorated function has a set_result method which stores a result
+    for the given args, eg. set_result(result, *args, **kwargs). This
+    allows results which are read in bulk to be added to the cache.
+
     Args:
         key (str): arg to use as a key (ie. ignore other arg values)
         timeout (float): cause the cached result to expire after this
@@ -183,6 +454,11 @@ def get_result_storer(
         get_depend_path (fn): function to get a path - if the mtime of
             this path is greater than the time at which the cache was
             generated then the cache is regenerated
+        max_entries (int): max number of results to store
+        max_bytes (int): max approximate size of stored results in bytes
+        ttl (float): discard each result this many seconds after it
+            was generated
+        name (str): override name of cache in registry
         verbose (int): print process data
     """
 
@@ -191,7 +467,9 @@ def get_result_storer(
         # Dicts are used for _depend_var/_read_time to avoid global errors
         _depend_var = {None: get_depend_var()} if get_depend_var else None
         _read_time = {}
-        _result_cache = {}
+        _result_cache = _ResultCache(
+            name=name or '{}.{}'.format(func.__module__, func.__name__),
+            max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
         _arg_spec = inspect.getargspec(func)
         dprint('Reset results cache', func.__name__, verbose=verbose)
 
@@ -221,10 +499,7 @@ def get_result_storer(
             return timeout is not None and (
                 not _read_time or time.time() - _read_time[None] > timeout)
 
-        @functools.wraps(func)
-        def _fn_wrapper(*args, **kwargs):
-
-            dprint('Executing', func.__name__, verbose=verbose)
+        def _get_key(args, kwargs):
 
             # Catch bad kwarg provided
             for _kwarg in kwargs:
@@ -258,7 +533,7 @@ def get_result_storer(
 
             # Get key to reference this result
             if id_as_key:
-                _key = id(args[0]), args[0]
+                _key = id(args[0])
             elif ignore_args:
                 _key = None
             elif key:
@@ -268,30 +543,51 @@ def get_result_storer(
                 for _name, _val in _key:
                     if isinstance(_val, dict):
                         raise RuntimeError("Cacher applied to dict arg")
-            del _args_key
+            return _key
+
+        @functools.wraps(func)
+        def _fn_wrapper(*args, **kwargs):
+
+            dprint('Executing', func.__name__, verbose=verbose)
+            _key = _get_key(args, kwargs)
             lprint(' - args key', _key, verbose=verbose)
             lprint(' - results keys', _result_cache.keys(), verbose=verbose)
 
             # Calculate result if needed
+            _found, _result = _result_cache.lookup(_key)
             if (
                     kwargs.get('force') or
-                    _key not in _result_cache or
+                    not _found or
                     _timeout_forces_recache() or
                     _depend_var_forces_recache() or
                     _depend_path_forces_recache(args, _read_time.get(None))):
 
                 # Store result
+                _start = time.time()
                 _result = func(*args, **kwargs)
-                _result_cache[_key] = _result
+                _result_cache.set(
+                    _key, _result, owner=args[0] if id_as_key else None)
+                _result_cache.record_miss(time.time() - _start)
 
                 # Store read time
                 _read_time[None] = time.time()
 
+            else:
+                _result_cache.record_hit()
+
             lprint(
                 ' - results keys (final)', _result_cache.keys(),
                 verbose=verbose)
-            return _result_cache[_key]
+            return _result
+
+        def _set_result(result, *args, **kwargs):
+            _key = _get_key(args, kwargs)
+            _result_cache.set(
+                _key, result, owner=args[0] if id_as_key else None)
+            _read_time[None] = time.time()
 
+        _fn_wrapper.result_cache = _result_cache
+        _fn_wrapper.set_result = _set_result
         return _fn_wrapper
 
     return _store_result
@@ -318,7 +614,8 @@ def get_result_to_file_storer(
 
     def _store_result_to_file(method):
 
-        @get_result_storer(key='key')
+        @get_result_storer(
+            key='key', name='{}.{}'.format(method.__module__, method.__name__))
         def _get_result(
                 key, cache_file, args, kwargs, force=False,
                 cache_file_exists=None):
@@ -413,6 +710,7 @@ def get_result_to_file_storer(
                 key=_key, args=args, kwargs=kwargs, force=_force,
                 cache_file=_cache_file, cache_file_exists=_cache_file_exists)
 
+        _result_writer.result_cache = _get_result.result_cache
         return _result_writer
 
     return _store_result_to_file
@@ -480,7 +778,8 @@ def store_result_on_obj(method):
     """Decorator which stores the result of a method on the object.
 
     This generates a unique result for each instance of the object. This
-    cache acts like a property (except it is still a function).
+    cache acts like a property (except it is still a function). The result
+    is discarded when the object is garbage collected.
 
     Args:
         method (fn): method to decorate
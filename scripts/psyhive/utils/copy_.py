@@ -0,0 +1,244 @@
+"""Tools for copying large numbers of files concurrently.
+
+Each file is copied with a large buffer to a partial file alongside its
+target, which is renamed into place once complete. This means a target
+file only exists if it was copied in full, so an interrupted copy can be
+resumed by skipping targets which already match their source.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+from .misc import bytes_to_str
+from .path import test_path
+from .pool import thread_imap_unordered
+
+PARTIAL_EXTN = '.partial'
+
+_BUFFER_SIZE = int(os.environ.get('PSYHIVE_COPY_BUFFER_MB', 16))*1024*1024
+
+
+class CopyError(IOError):
+    """Raised when a copied file fails verification."""
+
+
+class CopyStats(object):
+    """Records the amount of data copied and the rate it was copied at."""
+
+    def __init__(self):
+        """Constructor."""
+        self.files = 0
+        self.skipped = 0
+        self.bytes_ = 0
+        self.start = time.time()
+        self.end = None
+        self._lock = threading.Lock()
+
+    def add(self, bytes_, skipped=False):
+        """Add a file to these stats.
+
+        Args:
+            bytes_ (int): size of file
+            skipped (bool): file was skipped as it was already copied
+        """
+        with self._lock:
+            if skipped:
+                self.skipped += 1
+            else:
+                self.files += 1
+                self.bytes_ += bytes_
+
+    def get_dur(self):
+        """Get duration of copy.
+
+        Returns:
+            (float): duration in seconds
+        """
+        return max((self.end or time.time()) - self.start, 0.000001)
+
+    def get_mb_per_s(self):
+        """Get copy rate in megabytes per second.
+
+        Returns:
+            (float): copy rate
+        """
+        return self.bytes_/1000.0/1000.0/self.get_dur()
+
+    def get_files_per_s(self):
+        """Get copy rate in files per second.
+
+        Returns:
+            (float): copy rate
+        """
+        return self.files/self.get_dur()
+
+    def __str__(self):
+        return (
+            'Copied {:d} file{} ({}) in {:.01f}s - {:.01f}MB/s, {:.01f} '
+            'files/s{}'.format(
+                self.files, '' if self.files == 1 else 's',
+                bytes_to_str(self.bytes_), self.get_dur(),
+                self.get_mb_per_s(), self.get_files_per_s(),
+                ', skipped {:d} already copied'.format(self.skipped)
+                if self.skipped else ''))
+
+
+def copy_file(src, dest, verify=False, buffer_size=None):
+    """Copy a file using a large buffer.
+
+    The file is copied to a partial file, which is renamed to the target
+    path once the copy is complete. Any partial file left by a previous
+    interrupted copy is removed first, and the partial file is removed if
+    the copy fails. The source's permissions and modification time are
+    applied to the target.
+
+    Args:
+        src (str): path to copy
+        dest (str): path to copy to
+        verify (bool): check the md5 of the target matches the source
+        buffer_size (int): override read buffer size in bytes
+
+    Returns:
+        (int): bytes copied
+
+    Raises:
+        (CopyError): if verification fails
+    """
+    _buffer_size = buffer_size or _BUFFER_SIZE
+    _partial = dest+PARTIAL_EXTN
+    _src_md5 = hashlib.md5()
+    _bytes = 0
+    _remove_partial(dest)
+    try:
+        with open(src, 'rb') as _src, open(_partial, 'wb') as _dest:
+            while True:
+                _buffer = _src.read(_buffer_size)
+                if not _buffer:
+                    break
+                _dest.write(_buffer)
+                _bytes += len(_buffer)
+                if verify:
+                    _src_md5.update(_buffer)
+    except (IOError, OSError):
+        _remove_partial(dest)
+        raise
+
+    if verify and _get_md5(_partial, _buffer_size) != _src_md5.hexdigest():
+        os.remove(_partial)
+        raise CopyError('Copy failed verification {}'.format(dest))
+
+    shutil.copystat(src, _partial)
+    if os.path.exists(dest):
+        os.remove(dest)
+    os.rename(_partial, dest)
+
+    return _bytes
+
+
+def copy_files(
+        pairs, threads=None, verify=False, resume=False, progress=False,
+        title='Copying {:d} file{}', parent=None, buffer_size=None,
+        verbose=1):
+    """Copy a list of files concurrently.
+
+    Args:
+        pairs (tuple list): source/target path pairs
+        threads (int): override number of copy threads
+        verify (bool): check the md5 of each target matches its source
+        resume (bool): skip targets which already match their source
+            (removing any partial files left alongside them)
+        progress (bool): show progress bar
+        title (str): progress bar title
+        parent (QDialog): parent dialog for progress bar
+        buffer_size (int): override read buffer size in bytes
+        verbose (int): print process data
+
+    Returns:
+        (CopyStats): copy stats
+    """
+    _stats = CopyStats()
+    for _dir in set([os.path.dirname(_dest) for _, _dest in pairs]):
+        test_path(_dir)
+
+    def _copy(pair):
+        _src, _dest = pair
+        if resume and is_copied(_src, _dest):
+            _remove_partial(_dest)
+            _stats.add(os.path.getsize(_dest), skipped=True)
+            return
+        _bytes = copy_file(
+            _src, _dest, verify=verify, buffer_size=buffer_size)
+        _stats.add(_bytes)
+
+    _results = thread_imap_unordered(_copy, pairs, threads=threads)
+    if progress:
+        from psyhive import qt
+        for _ in qt.progress_bar(
+                range(len(pairs)), title, parent=parent):
+            next(_results)
+    else:
+        for _ in _results:
+            pass
+
+    _stats.end = time.time()
+    if verbose:
+        print _stats
+    return _stats
+
+
+def is_copied(src, dest):
+    """Test whether a target file matches the file it was copied from.
+
+    Targets match if they have the same size and modification time as
+    the source, which copy_file applies on completion.
+
+    Args:
+        src (str): source path
+        dest (str): target path
+
+    Returns:
+        (bool): whether target matches source
+    """
+    try:
+        _src = os.stat(src)
+        _dest = os.stat(dest)
+    except OSError:
+        return False
+    return (
+        _src.st_size == _dest.st_size and
+        int(_src.st_mtime) == int(_dest.st_mtime))
+
+
+def _remove_partial(dest):
+    """Remove the partial file of the given target, if there is one.
+
+    Args:
+        dest (str): target path
+    """
+    try:
+        os.remove(dest+PARTIAL_EXTN)
+    except OSError:
+        pass
+
+
+def _get_md5(path, buffer_size):
+    """Get md5 of the given file.
+
+    Args:
+        path (str): path to read
+        buffer_size (int): read buffer size in bytes
+
+    Returns:
+        (str): md5 hex digest
+    """
+    _md5 = hashlib.md5()
+    with open(path, 'rb') as _file:
+        while True:
+            _buffer = _file.read(buffer_size)
+            if not _buffer:
+                break
+            _md5.update(_buffer)
+    return _md5.hexdigest()
@@ -0,0 +1,224 @@
+"""Tools for compositing frames streamed between ffmpeg processes.
+
+Frames are held as raw rgb24 buffers. Inputs are decoded by ffmpeg
+processes which write raw frames to a pipe, frames are composited on a
+thread pool, and the results are written to the stdin of a single ffmpeg
+encode process, so no intermediate image sequences are written to disk.
+Any cropping/scaling of inputs is applied by ffmpeg as they are decoded,
+so compositing only needs to copy rows of pixels between buffers.
+"""
+
+import os
+import subprocess
+
+from .pool import thread_map, get_thread_count
+
+FFMPEG = os.environ.get('PSYHIVE_FFMPEG', 'ffmpeg')
+
+_ANCHORS = {
+    'TL': (0, 0), 'T': (0.5, 0), 'TR': (1, 0),
+    'BL': (0, 1), 'BR': (1, 1), 'C': (0.5, 0.5)}
+
+
+class Frame(object):
+    """A raw rgb24 image buffer."""
+
+    def __init__(self, width, height, data=None):
+        """Constructor.
+
+        Args:
+            width (int): frame width
+            height (int): frame height
+            data (str|bytearray): rgb24 pixel data (blank if not provided)
+        """
+        self.width = width
+        self.height = height
+        if data is None:
+            self.data = bytearray(width*height*3)
+        else:
+            assert len(data) == width*height*3
+            self.data = bytearray(data)
+
+    def get_pixel(self, x_pos, y_pos):
+        """Get colour of the given pixel.
+
+        Args:
+            x_pos (int): pixel column
+            y_pos (int): pixel row
+
+        Returns:
+            (tuple): r/g/b values
+        """
+        _idx = (y_pos*self.width + x_pos)*3
+        return tuple(self.data[_idx: _idx+3])
+
+    def paste(self, frame, pos=(0, 0), anchor='TL'):
+        """Paste another frame over this one.
+
+        Any part of the pasted frame which falls outside this frame is
+        ignored.
+
+        Args:
+            frame (Frame): frame to paste
+            pos (tuple): position of anchor
+            anchor (str): anchor position (eg. TL, TR, C)
+        """
+        _fx, _fy = _ANCHORS[anchor]
+        _left = int(pos[0] - frame.width*_fx)
+        _top = int(pos[1] - frame.height*_fy)
+
+        # Clip to this frame
+        _x0, _x1 = max(_left, 0), min(_left+frame.width, self.width)
+        _y0, _y1 = max(_top, 0), min(_top+frame.height, self.height)
+        if _x0 >= _x1 or _y0 >= _y1:
+            return
+
+        _row_bytes = (_x1 - _x0)*3
+        _src_x = (_x0 - _left)*3
+        for _y_pos in range(_y0, _y1):
+            _src = (_y_pos - _top)*frame.width*3 + _src_x
+            _dest = (_y_pos*self.width + _x0)*3
+            self.data[_dest: _dest+_row_bytes] = frame.data[
+                _src: _src+_row_bytes]
+
+
+class FrameWriter(object):
+    """Encodes frames to a video file by piping them to ffmpeg.
+
+    This should be used as a context manager - the file is finalised on
+    exit.
+    """
+
+    def __init__(self, path, size, fps=30, args=None):
+        """Constructor.
+
+        Args:
+            path (str): path to video to write
+            size (tuple): frame width/height
+            fps (float): frame rate
+            args (str list): override ffmpeg encode args
+        """
+        self.path = path
+        self.size = size
+        self.fps = fps
+        self.args = args or [
+            '-vcodec', 'libx264', '-crf', '25', '-pix_fmt', 'yuv420p']
+        self.frames = 0
+        self._proc = None
+
+    def write(self, frame):
+        """Write a frame.
+
+        Args:
+            frame (Frame): frame to write
+        """
+        assert (frame.width, frame.height) == tuple(self.size)
+        self._proc.stdin.write(frame.data)
+        self.frames += 1
+
+    def __enter__(self):
+        _cmds = [
+            FFMPEG, '-v', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+            '-s', '{:d}x{:d}'.format(*self.size),
+            '-r', str(self.fps),
+            '-i', '-'] + self.args + [self.path]
+        self._proc = subprocess.Popen(_cmds, stdin=subprocess.PIPE)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._proc.stdin.close()
+        if exc_type:
+            self._proc.kill()
+        self._proc.wait()
+        if not exc_type and self._proc.returncode:
+            raise RuntimeError(
+                'Failed to encode {} (ffmpeg error {:d})'.format(
+                    self.path, self._proc.returncode))
+
+
+def comp_frames(func, inputs, threads=None, batch_size=None):
+    """Composite frames from the given inputs.
+
+    The first input determines the number of frames. If other inputs run
+    out of frames, None is passed in their place. Frames are read and
+    composited in batches, so that only a few frames are held in memory
+    at once.
+
+    Args:
+        func (fn): comp function which is passed one frame from each
+            input and returns an output frame
+        inputs (iterable list): frame sources (eg. read_frames generators)
+        threads (int): override number of comp threads
+        batch_size (int): override number of frames to read at once
+
+    Returns:
+        (generator): composited frames in order
+    """
+    _threads = get_thread_count() if threads is None else threads
+    _batch_size = batch_size or max(_threads, 1)*2
+    _main = iter(inputs[0])
+    _others = [iter(_input) for _input in inputs[1:]]
+
+    while True:
+        _batch = []
+        for _frame in _main:
+            _batch.append([_frame] + [
+                next(_other, None) for _other in _others])
+            if len(_batch) == _batch_size:
+                break
+        if not _batch:
+            return
+        for _result in thread_map(
+                lambda _frames: func(*_frames), _batch, threads=_threads):
+            yield _result
+
+
+def read_frames(path, size, filters=None, input_args=None, frames=None):
+    """Read frames from an image sequence or video using ffmpeg.
+
+    Frames are scaled to the given size after any other filters are
+    applied. If ffmpeg fails before the expected number of frames have
+    been read, an error is raised rather than the frames just ending.
+
+    Args:
+        path (str): path to read (eg. images.%04d.jpg or movie.mov)
+        size (tuple): width/height of frames to read
+        filters (str list): ffmpeg filters to apply (eg. crop=100:100)
+        input_args (str list): ffmpeg input args (eg. -start_number 1001)
+        frames (int): number of frames expected (if any ffmpeg error
+            should be raised, leave as None)
+
+    Returns:
+        (generator): frames
+    """
+    _width, _height = size
+    _filters = list(filters or []) + ['scale={:d}:{:d}'.format(
+        _width, _height)]
+    _cmds = [FFMPEG, '-v', 'error'] + list(input_args or []) + [
+        '-i', path, '-vf', ','.join(_filters),
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-']
+    _proc = subprocess.Popen(_cmds, stdout=subprocess.PIPE)
+    _frame_bytes = _width*_height*3
+    _count = 0
+    _finished = False
+    try:
+        while True:
+            _data = _proc.stdout.read(_frame_bytes)
+            if len(_data) < _frame_bytes:
+                _finished = True
+                break
+            yield Frame(_width, _height, _data)
+            _count += 1
+    finally:
+        _proc.stdout.close()
+        if _proc.poll() is None:
+            _proc.kill()
+        _proc.wait()
+        if (
+                _finished and _proc.returncode and
+                (frames is None or _count < frames)):
+            raise RuntimeError(
+                'Failed to read {} after {:d} frame{} (ffmpeg error '
+                '{:d})'.format(path, _count, '' if _count == 1 else 's',
+                               _proc.returncode))
@@ -0,0 +1,336 @@
+"""Tools for reading maya ascii files without opening them in maya.
+
+The file is scanned one statement at a time in a single forward pass.
+Only statements which could contain requested data are tokenised - the
+rest are skipped line by line - and the scan stops as soon as all of the
+requested data has been found. References and file info are written in
+the header, before the first node is created, so reading these only
+requires the start of the file to be read.
+"""
+
+import collections
+import re
+
+from .path import File
+
+MaRef = collections.namedtuple('MaRef', ['namespace', 'path', 'ref_node'])
+
+_TOKEN_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+_ESCAPE_RE = re.compile(r'\\(.)')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+_RANGE_RE = re.compile(r'playbackOptions\b.*?-min\s+(\S+).*?-max\s+(\S+)')
+
+
+class MaFile(File):
+    """Represents a maya ascii file."""
+
+    def read_attrs(self, type_, attrs):
+        """Read string attribute values for nodes of the given type.
+
+        Only nodes created in this file are read (ie. not nodes inside
+        references).
+
+        Args:
+            type_ (str): node type (eg. ExocortexAlembicFile)
+            attrs (str list): names to match - an attribute may be
+                written with its long or short name so both should be
+                included
+
+        Returns:
+            (dict): node name/value
+        """
+        return self.scan(attrs={type_: attrs})['attrs']
+
+    def read_dependencies(self):
+        """Read references and abc caches used by this file.
+
+        Returns:
+            (dict): namespace/path dicts of refs and abcs
+        """
+        _data = self.scan(
+            refs=True, attrs={'ExocortexAlembicFile': ['fileName', 'fn']})
+        _deps = {'refs': {}, 'abcs': {}}
+
+        # Read refs
+        for _ref in _data['refs']:
+            if not _ref.path or not _ref.namespace:
+                continue
+            _deps['refs'][_ref.namespace] = _ref.path
+
+        # Read abcs
+        for _abc, _path in _data['attrs'].items():
+            if ':' not in _abc or _path is None:
+                continue
+            _ns = str(_abc.split(':')[0])
+            _deps['abcs'][_ns] = str(_path)
+
+        return _deps
+
+    def read_file_info(self):
+        """Read fileInfo values.
+
+        Returns:
+            (dict): file info key/value
+        """
+        return self.scan(file_info=True)['file_info']
+
+    def read_range(self):
+        """Read playback range.
+
+        Returns:
+            (tuple|None): start/end frames (None if not found)
+        """
+        return self.scan(range_=True)['range']
+
+    def read_refs(self):
+        """Read top level references.
+
+        Returns:
+            (MaRef list): references
+        """
+        return self.scan(refs=True)['refs']
+
+    def scan(self, refs=False, range_=False, file_info=False, attrs=None):
+        """Scan this file for the requested data.
+
+        Args:
+            refs (bool): read top level references
+            range_ (bool): read playback range
+            file_info (bool): read fileInfo values
+            attrs (dict): node type/attribute names of string attributes
+                to read
+
+        Returns:
+            (dict): requested data
+        """
+        with open(self.path) as _handle:
+            return scan_ma(
+                _handle, refs=refs, range_=range_, file_info=file_info,
+                attrs=attrs)
+
+
+def scan_ma(lines, refs=False, range_=False, file_info=False, attrs=None):
+    """Scan lines of maya ascii for the requested data.
+
+    Args:
+        lines (iterable): lines of maya ascii (eg. file handle)
+        refs (bool): read top level references
+        range_ (bool): read playback range
+        file_info (bool): read fileInfo values
+        attrs (dict): node type/attribute names of string attributes to
+            read
+
+    Returns:
+        (dict): requested data
+    """
+    _attrs = dict([(_type, set(['.'+_attr for _attr in _names]))
+                   for _type, _names in (attrs or {}).items()])
+    _result = {}
+    if refs:
+        _result['refs'] = []
+    if range_:
+        _result['range'] = None
+    if file_info:
+        _result['file_info'] = {}
+    if attrs is not None:
+        _result['attrs'] = {}
+
+    _header = refs or file_info
+    _node = _node_type = None
+    for _cmd, _tokens in _read_statements(lines, _node_type_filter(_attrs)):
+
+        if _tokens is None:
+            _node = _node_type = None
+
+        elif _cmd == 'createNode':
+            _node_type, _node = _tokens[1], _get_node_name(_tokens)
+            if _header and not (range_ or _attrs):
+                break
+            _header = False
+
+        elif _cmd == 'file' and refs and '-r' in _tokens:
+            _result['refs'].append(MaRef(
+                namespace=_get_flag(_tokens, '-ns'), path=_tokens[-1],
+                ref_node=_get_flag(_tokens, '-rfn')))
+
+        elif _cmd == 'fileInfo' and file_info and len(_tokens) == 3:
+            _result['file_info'][_tokens[1]] = _tokens[2]
+
+        elif _cmd == 'setAttr' and _node:
+            _name = _tokens[1]
+            _val = _tokens[-1] if '-type' in _tokens else None
+            if (
+                    range_ and
+                    _node_type == 'script' and
+                    _node == 'sceneConfigurationScriptNode' and
+                    _name in ('.b', '.before') and _val):
+                _match = _RANGE_RE.search(_val)
+                if _match:
+                    _result['range'] = tuple(
+                        [_to_num(_frame) for _frame in _match.groups()])
+                    range_ = False
+                    if not _attrs:
+                        break
+            if _node_type in _attrs and _name in _attrs[_node_type]:
+                _result['attrs'][_node] = _val
+
+    return _result
+
+
+def _get_flag(tokens, flag):
+    """Get the value of a flag from a list of tokens.
+
+    Args:
+        tokens (str list): statement tokens
+        flag (str): flag to read (eg. -ns)
+
+    Returns:
+        (str|None): flag value
+    """
+    if flag not in tokens[:-1]:
+        return None
+    return tokens[tokens.index(flag)+1]
+
+
+def _get_node_name(tokens):
+    """Get node name from createNode tokens.
+
+    Args:
+        tokens (str list): createNode statement tokens
+
+    Returns:
+        (str|None): node name
+    """
+    return _get_flag(tokens, '-n') or _get_flag(tokens, '-name')
+
+
+def _node_type_filter(attrs):
+    """Build a test for whether setAttr statements need to be read.
+
+    Args:
+        attrs (dict): node type/attribute names being read
+
+    Returns:
+        (fn): test taking node type and returning whether to read
+    """
+    _types = set(attrs)
+    _types.add('script')
+    return _types.__contains__
+
+
+def _read_statements(lines, read_node_type):
+    """Read statements from lines of maya ascii.
+
+    Statements end with a line ending in a semicolon. Only statements
+    which might contain requested data are tokenised, ie. top level
+    file/fileInfo/createNode statements, and setAttr statements on nodes
+    whose type passes the given test. Other top level statements are
+    yielded without tokens, so that the caller knows the current node
+    has changed. Other indented statements are not yielded.
+
+    Args:
+        lines (iterable): lines of maya ascii
+        read_node_type (fn): test for whether to read setAttr statements
+            for a node type
+
+    Returns:
+        (generator): command/tokens (None if not read) for each statement
+    """
+    _buffer = None
+    _skip = False
+    _read_attrs = False
+    for _line in lines:
+        _line = _line.rstrip()
+
+        # Continue current statement
+        if _skip or _buffer is not None:
+            if not _skip:
+                _buffer.append(_line)
+            if not _line.endswith(';'):
+                continue
+            if not _skip:
+                _tokens = _tokenise(' '.join(_buffer))
+                if _tokens[0] == 'createNode':
+                    _read_attrs = read_node_type(_tokens[1])
+                yield _tokens[0], _tokens
+            _buffer = None
+            _skip = False
+            continue
+
+        # Start new statement
+        _cmd = _line.lstrip().split(' ', 1)[0]
+        if not _cmd or _cmd.startswith('//'):
+            continue
+        _indented = _line[0] in ' \t'
+        if _indented:
+            _read = _cmd == 'setAttr' and _read_attrs
+        else:
+            _read_attrs = False
+            _read = _cmd in ('file', 'fileInfo', 'createNode')
+            if not _read:
+                yield _cmd, None
+
+        if not _line.endswith(';'):
+            if _read:
+                _buffer = [_line]
+            else:
+                _skip = True
+        elif _read:
+            _tokens = _tokenise(_line)
+            if _cmd == 'createNode':
+                _read_attrs = read_node_type(_tokens[1])
+            yield _cmd, _tokens
+
+
+def _to_num(text):
+    """Convert a frame string to a number.
+
+    Args:
+        text (str): frame (eg. 1 or 1.5)
+
+    Returns:
+        (int|float): frame
+    """
+    _val = float(text)
+    return int(_val) if _val.is_integer() else _val
+
+
+def _tokenise(statement):
+    """Split a statement into tokens.
+
+    Strings are unescaped, and strings joined with a + are combined.
+
+    Args:
+        statement (str): statement to split
+
+    Returns:
+        (str list): tokens
+    """
+    _tokens = []
+    _join = False
+    for _str, _word in _TOKEN_RE.findall(statement.rstrip(';').strip()):
+        if _word == '+' and _tokens:
+            _join = True
+            continue
+        _token = _word or _unescape(_str)
+        if _join:
+            _tokens[-1] += _token
+            _join = False
+        else:
+            _tokens.append(_token)
+    return _tokens
+
+
+def _unescape(text):
+    """Unescape a mel string.
+
+    Args:
+        text (str): string contents
+
+    Returns:
+        (str): unescaped string
+    """
+    if '\\' not in text:
+        return text
+    return _ESCAPE_RE.sub(
+        lambda _match: _ESCAPES.get(_match.group(1), _match.group(1)), text)
@@ -0,0 +1,199 @@
+"""Tools for managing a persistent index of directory listings."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from ..misc import lprint
+
+from .p_tools import test_path, _scandir
+
+_DIR = 1
+_FILE = 2
+_LINK = 4
+
+
+class _IndexEntry(object):
+    """Represents a dir entry read from the index."""
+
+    def __init__(self, name, flags):
+        """Constructor.
+
+        Args:
+            name (str): entry name
+            flags (int): entry type flags
+        """
+        self.name = name
+        self.flags = flags
+
+    def is_dir(self):
+        """Test if this entry is a dir.
+
+        Returns:
+            (bool): whether dir
+        """
+        return bool(self.flags & _DIR)
+
+    def is_file(self):
+        """Test if this entry is a file.
+
+        Returns:
+            (bool): whether file
+        """
+        return bool(self.flags & _FILE)
+
+    def is_symlink(self):
+        """Test if this entry is a symlink.
+
+        Returns:
+            (bool): whether symlink
+        """
+        return bool(self.flags & _LINK)
+
+
+class DirIndex(object):
+    """Persistent index of directory listings stored in an sqlite file.
+
+    Each directory's listing is stored with the mtime of the directory.
+    When a directory is listed, its mtime is checked with a single stat
+    call and the stored listing is used unless the mtime has changed.
+
+    New listings are held in memory and written in a single transaction
+    when the index is flushed, which find does at the end of each walk,
+    so that a cold scan doesn't commit once per dir.
+
+    This can be passed to find using the index arg.
+    """
+
+    def __init__(self, file_, read_only=False, min_age=2.0,
+                 max_pending=1000):
+        """Constructor.
+
+        Args:
+            file_ (str): path to sqlite file
+            read_only (bool): don't write new listings to the index
+            min_age (float): don't store listings of dirs which were
+                modified less than this many seconds ago (to avoid
+                missing changes made within the mtime resolution)
+            max_pending (int): flush once this many new listings are
+                waiting to be written
+        """
+        self.file_ = file_
+        self.read_only = read_only
+        self.min_age = min_age
+        self.max_pending = max_pending
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = None
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def clear(self):
+        """Remove all listings from this index."""
+        with self._lock:
+            self._pending = {}
+            _conn = self._get_conn()
+            if not _conn:
+                return
+            _conn.execute('DELETE FROM dirs')
+            _conn.commit()
+
+    def flush(self):
+        """Write any new listings to the index in a single transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            _rows = [(_path, _mtime, _data) for _path, (_mtime, _data)
+                     in self._pending.items()]
+            self._pending = {}
+            _conn = self._get_conn()
+            if not _conn:
+                return
+            try:
+                _conn.executemany(
+                    'INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)', _rows)
+                _conn.commit()
+            except sqlite3.Error as _exc:
+                _conn.rollback()
+                lprint('FAILED TO UPDATE INDEX', _exc)
+
+    def scandir(self, dir_, verbose=0):
+        """List the contents of the given dir.
+
+        Args:
+            dir_ (str): path to dir
+            verbose (int): print process data
+
+        Returns:
+            (DirEntry list): dir entries
+        """
+        _mtime = os.stat(dir_).st_mtime
+
+        # Try to read from index
+        with self._lock:
+            _row = self._pending.get(dir_)
+            _conn = self._get_conn()
+            if not _row and _conn:
+                _row = _conn.execute(
+                    'SELECT mtime, entries FROM dirs WHERE path=?',
+                    (dir_, )).fetchone()
+        if _row and _row[0] == _mtime:
+            lprint('READ INDEX', dir_, verbose=verbose)
+            self.hits += 1
+            return [_IndexEntry(_name, _flags)
+                    for _name, _flags in json.loads(_row[1])]
+
+        # Read from disk
+        lprint('SCAN DIR', dir_, verbose=verbose)
+        self.misses += 1
+        _entries = []
+        for _entry in _scandir(dir_):
+            _flags = 0
+            if _entry.is_dir():
+                _flags |= _DIR
+            if _entry.is_file():
+                _flags |= _FILE
+            if _entry.is_symlink():
+                _flags |= _LINK
+            _entries.append(_IndexEntry(_entry.name, _flags))
+
+        # Queue index update
+        if not self.read_only and time.time() - _mtime > self.min_age:
+            _data = json.dumps([(_entry.name, _entry.flags)
+                                for _entry in _entries])
+            with self._lock:
+                self._pending[dir_] = (_mtime, _data)
+                _flush = len(self._pending) >= self.max_pending
+            if _flush:
+                self.flush()
+
+        return _entries
+
+    def _get_conn(self):
+        """Get connection to the index database.
+
+        If the database fails to open then None is returned, in which
+        case listings are read directly from disk.
+
+        Returns:
+            (Connection|None): database connection
+        """
+        if self._conn is None:
+            try:
+                if not self.read_only:
+                    test_path(os.path.dirname(self.file_))
+                self._conn = sqlite3.connect(
+                    self.file_, timeout=30, check_same_thread=False)
+                self._conn.execute(
+                    'CREATE TABLE IF NOT EXISTS dirs '
+                    '(path TEXT PRIMARY KEY, mtime REAL, entries TEXT)')
+            except (sqlite3.Error, OSError) as _exc:
+                lprint('FAILED TO OPEN INDEX', self.file_, _exc)
+                self._conn = False
+        return self._conn or None
+
+    def __repr__(self):
+        return '<{}|{}>'.format(type(self).__name__, self.file_)
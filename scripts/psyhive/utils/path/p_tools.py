@@ -15,10 +15,85 @@ from ..filter_ import passes_filter
 from .p_file import File
 from .p_dir import Dir
 
+try:
+    from os import scandir as _SCANDIR
+except ImportError:
+    try:
+        from scandir import scandir as _SCANDIR
+    except ImportError:
+        _SCANDIR = None
+
+
+_ABS_PATH_CACHE = {}
+_ABS_PATH_CACHE_SIZE = 50000
+_ABS_PATH_DIRTY_TOKENS = (
+    '\\', '//', '/./', '../', '/la1nas006/homedir/hvanderbeek',
+    'c:/users/hvande~1')
+
 
 def abs_path(path, win=False, root=None, verbose=0):
     """Get the absolute path for the given path.
 
+    Paths which are already clean and absolute are returned unchanged,
+    and other results are memoised (the memo is cleared if it grows too
+    large).
+
+    Args:
+        path (str): path to check
+        win (bool): format for windows using escape chars
+        root (str): override root dir (otherwise cwd is used)
+        verbose (int): print process data
+    """
+    if verbose:
+        return _abs_path(path, win=win, root=root, verbose=verbose)
+
+    _path = path if type(path) is str else get_path(path)
+    if type(_path) is str and _path_is_clean(_path):
+        return _path.replace('/', '\\') if win else _path
+
+    _key = _path, win, root, None if root else os.getcwd()
+    try:
+        return _ABS_PATH_CACHE[_key]
+    except (KeyError, TypeError):
+        pass
+    _result = _abs_path(_path, win=win, root=root)
+    if len(_ABS_PATH_CACHE) >= _ABS_PATH_CACHE_SIZE:
+        _ABS_PATH_CACHE.clear()
+    try:
+        _ABS_PATH_CACHE[_key] = _result
+    except TypeError:
+        pass
+    return _result
+
+
+def _path_is_clean(path):
+    """Test if the given path is already a clean absolute path.
+
+    ie. abs_path would return this path unchanged.
+
+    Args:
+        path (str): path to test
+
+    Returns:
+        (bool): whether path is clean
+    """
+    if path.startswith('/'):
+        if len(path) >= 2 and path[1] != '/' and (
+                len(path) == 2 or path[2] == '/'):
+            return False  # MINGW64 style drive
+    elif not (
+            len(path) >= 3 and path[1] == ':' and path[2] == '/' and
+            path[0].isupper()):
+        return False
+    for _token in _ABS_PATH_DIRTY_TOKENS:
+        if _token in path:
+            return False
+    return True
+
+
+def _abs_path(path, win=False, root=None, verbose=0):
+    """Get the absolute path for the given path (without memo).
+
     Args:
         path (str): path to check
         win (bool): format for windows using escape chars
@@ -114,33 +189,44 @@ def diff(left, right, tool=None, label=None, check_extn=True):
     system(_cmds, verbose=1)
 
 
-def _find_cast_results_by_class(results, class_):
-    """Cast find results to the given class.
-
-    Any that raise ValueError are ignored.
+def find(
+        dir_=None, type_=None, extn=None, filter_=None, base=None, depth=-1,
+        name=None, full_path=True, class_=None, catch_missing=False,
+        index=None, verbose=0):
+    """Find files/dirs in a given path.
 
     Args:
-        results (str list): list of result to cast
-        class_ (type): type to cast to
+        dir_ (str): override root path
+        type_ (str): filter by path type (f=files, d=dirs, l=links)
+        extn (str): filter by extension
+        filter_ (str): apply filter to the list
+        base (str): filter by file basename
+        depth (int): max dir depth to traverse (-1 means unlimited)
+        name (str): match exact file/dir name
+        full_path (bool): return full path to file
+        class_ (type): cast results to this type
+        catch_missing (bool): allow the parent dir to be missing
+        index (DirIndex): read dir listings from this index
+        verbose (int): print process data
 
     Returns:
-        (list): castest results
+        (str list): paths found
     """
-    _class_results = []
-    for _result in results:
-        try:
-            _result = class_(_result)
-        except ValueError:
-            continue
-        _class_results.append(_result)
-    return _class_results
+    return sorted(find_iter(
+        dir_=dir_, type_=type_, extn=extn, filter_=filter_, base=base,
+        depth=depth, name=name, full_path=full_path, class_=class_,
+        catch_missing=catch_missing, index=index, verbose=verbose))
 
 
-def find(
+def find_iter(
         dir_=None, type_=None, extn=None, filter_=None, base=None, depth=-1,
         name=None, full_path=True, class_=None, catch_missing=False,
-        verbose=0):
-    """Find files/dirs in a given path.
+        index=None, verbose=0):
+    """Iterate over files/dirs in a given path.
+
+    Results are yielded as they are found (ie. they are not sorted). The
+    root dir is normalised once and the type information returned by the
+    directory listing is reused, to avoid further stat calls.
 
     Args:
         dir_ (str): override root path
@@ -151,71 +237,156 @@ def find(
         depth (int): max dir depth to traverse (-1 means unlimited)
         name (str): match exact file/dir name
         full_path (bool): return full path to file
-        class_ (type): cast results to this type
+        class_ (type): cast results to this type (any that raise
+            ValueError are ignored)
         catch_missing (bool): allow the parent dir to be missing
+        index (DirIndex): read dir listings from this index
         verbose (int): print process data
 
     Returns:
-        (str list): paths found
+        (generator): paths found
     """
-    _kwargs = locals()
-    _kwargs.pop('dir_')
-    _kwargs.pop('depth')
-    _kwargs.pop('full_path')
-    _kwargs.pop('class_')
-
-    _results = []
     _dir = abs_path(dir_ or os.getcwd())
 
     if extn and extn.startswith('.'):
         raise ValueError("Extn should not start with period - "+extn)
+    if type_ not in [None, 'd', 'f', 'l']:
+        raise ValueError(type_)
 
-    # Get a list of files in dir
     if catch_missing and not os.path.exists(_dir):
         raise OSError("Missing dir "+_dir)
+
+    _prefix = _dir.rstrip('/')+'/'
     try:
-        _files = os.listdir(_dir)
+        for _path in _find_walk(
+                dir_=_dir, depth=depth, index=index, type_=type_,
+                extn=extn, filter_=filter_, base=base, name=name,
+                verbose=verbose):
+
+            if not full_path:
+                _path = _path[len(_prefix):]
+
+            # Apply class cast
+            if class_:
+                try:
+                    _path = class_(_path)
+                except ValueError:
+                    continue
+
+            yield _path
+    finally:
+        if index:
+            index.flush()
+
+
+def _find_walk(dir_, depth, index=None, verbose=0, **filters):
+    """Walk the given dir yielding paths which pass find filters.
+
+    Args:
+        dir_ (str): normalised path to dir
+        depth (int): max dir depth to traverse (-1 means unlimited)
+        index (DirIndex): read dir listings from this index
+        verbose (int): print process data
+
+    Returns:
+        (generator): paths found
+    """
+    _head = dir_.rstrip('/')+'/'
+    try:
+        if index:
+            _entries = index.scandir(dir_)
+        else:
+            _entries = list(_scandir(dir_))
     except OSError:
-        _files = []
+        _entries = []
 
-    for _file in _files:
+    for _entry in _entries:
 
-        _path = abs_path('{}/{}'.format(_dir, _file))
-        lprint('TESTING', _path, _file, verbose=verbose)
+        _path = _head+_entry.name
+        lprint('TESTING', _path, _entry.name, verbose=verbose)
+
+        # Apply filters
+        _is_dir = _entry.is_dir()
+        if _find_path_passes_filters(
+                path=_path, filename=_entry.name, entry=_entry,
+                is_dir=_is_dir, verbose=verbose, **filters):
+            yield _path
 
         # Recurse into subdirs
-        _is_dir = os.path.isdir(_path)
         if _is_dir:
             _depth = max(depth - 1, -1)
             if _depth:
-                _results += find(_path, depth=_depth, **_kwargs)
+                for _path in _find_walk(
+                        _path, depth=_depth, index=index, verbose=verbose,
+                        **filters):
+                    yield _path
 
-        # Apply filters
-        if not _find_path_passes_filters(
-                path=_path, is_dir=_is_dir, type_=type_, name=name,
-                filter_=filter_, base=base, extn=extn):
-            continue
 
-        _results.append(_path)
+class _ListdirEntry(object):
+    """Fallback dir entry for when scandir is not available."""
+
+    def __init__(self, dir_, name):
+        """Constructor.
+
+        Args:
+            dir_ (str): parent dir
+            name (str): entry name
+        """
+        self.name = name
+        self.path = os.path.join(dir_, name)
+
+    def is_dir(self):
+        """Test if this entry is a dir.
+
+        Returns:
+            (bool): whether dir
+        """
+        return os.path.isdir(self.path)
+
+    def is_file(self):
+        """Test if this entry is a file.
 
-    if not full_path:
-        _results = [
-            _result.replace(_dir+'/', '') for _result in _results]
+        Returns:
+            (bool): whether file
+        """
+        return os.path.isfile(self.path)
 
-    # Apply class cast
-    if class_:
-        _results = _find_cast_results_by_class(
-            results=_results, class_=class_)
+    def is_symlink(self):
+        """Test if this entry is a symlink.
 
-    return sorted(_results)
+        Returns:
+            (bool): whether symlink
+        """
+        return os.path.islink(self.path)
 
 
-def _find_path_passes_filters(path, is_dir, type_, extn, base, filter_,
-                              name, verbose=0):
+def _scandir(dir_):
+    """List the contents of the given dir.
+
+    This uses scandir if it's available (os.scandir or the scandir
+    module), which provides type information from the directory listing
+    and so avoids a stat call for each entry.
+
+    Args:
+        dir_ (str): dir to list
+
+    Returns:
+        (DirEntry list): dir entries
+    """
+    if _SCANDIR:
+        return _SCANDIR(dir_)
+    return [_ListdirEntry(dir_, _name) for _name in os.listdir(dir_)]
+
+
+def _find_path_passes_filters(
+        path, filename, entry, is_dir, type_, extn, base, filter_, name,
+        verbose=0):
     """Test if a path passes find filters.
 
     Args:
         path (str): path to test
+        filename (str): path filename
+        entry (DirEntry): dir entry for path
         is_dir (bool): whether path is a dir
         type_ (str): filter by path type (f=files, d=dirs, l=links)
         extn (str): filter by extension
@@ -227,7 +398,6 @@ def _find_path_passes_filters(path, is_dir, type_, extn, base, filter_,
     Returns:
         (bool): whether path passes filters
     """
-    from .p_path import Path
 
     # Apply type filter
     if type_ is None:
@@ -236,26 +406,24 @@ def _find_path_passes_filters(path, is_dir, type_, extn, base, filter_,
         if not is_dir:
             return False
     elif type_ == 'f':
-        if not os.path.isfile(path):
+        if not entry.is_file():
             lprint(' - NOT FILE', verbose=verbose)
             return False
     elif type_ == 'l':
-        if not os.path.islink(path):
+        if not entry.is_symlink():
             return False
-    elif type_:
-        raise ValueError(type_)
 
     # Apply other filters
-    _path = Path(path)
-    if extn and not _path.extn == extn:
+    if extn and not (
+            '.' in filename and filename.rsplit('.', 1)[1] == extn):
         lprint(' - BAD EXTN', verbose=verbose)
         _result = False
-    elif base and not _path.filename.startswith(base):
+    elif base and not filename.startswith(base):
         _result = False
     elif filter_ and not passes_filter(path, filter_):
         lprint(' - FILTERED', verbose=verbose)
         _result = False
-    elif name and not _path.filename == name:
+    elif name and not filename == name:
         lprint(' - NAME FILTER', verbose=verbose)
         _result = False
     else:
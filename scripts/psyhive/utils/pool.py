@@ -0,0 +1,155 @@
+"""Tools for running tasks concurrently on a bounded pool of threads."""
+
+import os
+import sys
+import threading
+
+import six
+from six.moves import queue
+
+_LOCAL = threading.local()
+_THREADS = {}
+
+
+def get_thread_count():
+    """Get default number of worker threads.
+
+    This can be set using set_thread_count or $PSYHIVE_THREADS.
+
+    Returns:
+        (int): thread count
+    """
+    if None in _THREADS:
+        return _THREADS[None]
+    return int(os.environ.get('PSYHIVE_THREADS', 8))
+
+
+def set_thread_count(count):
+    """Set default number of worker threads.
+
+    Setting this to 1 disables concurrency.
+
+    Args:
+        count (int|None): thread count (None reverts to default)
+    """
+    if count is None:
+        _THREADS.pop(None, None)
+    else:
+        _THREADS[None] = count
+
+
+def thread_map(func, items, threads=None):
+    """Apply a function to each of the given items using a thread pool.
+
+    Results are returned in the same order as the items. If any call
+    raises an exception, remaining items are abandoned and the exception
+    is raised in the calling thread. If this is called from inside a
+    worker thread then the items are processed serially, so that the
+    total number of threads stays bounded.
+
+    Args:
+        func (fn): function to apply
+        items (list): items to process
+        threads (int): override number of worker threads
+
+    Returns:
+        (list): results
+    """
+    _items = list(items)
+    _threads = get_thread_count() if threads is None else threads
+    if (
+            _threads <= 1 or
+            len(_items) <= 1 or
+            getattr(_LOCAL, 'in_pool', False)):
+        return [func(_item) for _item in _items]
+
+    _results = [None]*len(_items)
+    _errors = []
+    _queue = queue.Queue()
+    for _idx, _item in enumerate(_items):
+        _queue.put((_idx, _item))
+
+    def _worker():
+        _LOCAL.in_pool = True
+        while not _errors:
+            try:
+                _idx, _item = _queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                _results[_idx] = func(_item)
+            except Exception:  # pylint: disable=broad-except
+                _errors.append(sys.exc_info())
+
+    _workers = []
+    for _ in range(min(_threads, len(_items))):
+        _thread = threading.Thread(target=_worker)
+        _thread.daemon = True
+        _thread.start()
+        _workers.append(_thread)
+    for _thread in _workers:
+        _thread.join()
+
+    if _errors:
+        six.reraise(*_errors[0])
+
+    return _results
+
+
+def thread_imap_unordered(func, items, threads=None):
+    """Apply a function to each of the given items using a thread pool.
+
+    This is a generator which yields each item with its result as soon
+    as it has been processed, so that progress can be reported while the
+    pool is running. If any call raises an exception, remaining items
+    are abandoned and the exception is raised in the calling thread.
+
+    Args:
+        func (fn): function to apply
+        items (list): items to process
+        threads (int): override number of worker threads
+
+    Returns:
+        (generator): (item, result) pairs in order of completion
+    """
+    _items = list(items)
+    _threads = get_thread_count() if threads is None else threads
+    if (
+            _threads <= 1 or
+            len(_items) <= 1 or
+            getattr(_LOCAL, 'in_pool', False)):
+        for _item in _items:
+            yield _item, func(_item)
+        return
+
+    _queue = queue.Queue()
+    _done = queue.Queue()
+    _cancelled = []
+    for _item in _items:
+        _queue.put(_item)
+
+    def _worker():
+        _LOCAL.in_pool = True
+        while not _cancelled:
+            try:
+                _item = _queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                _done.put((_item, func(_item), None))
+            except Exception:  # pylint: disable=broad-except
+                _done.put((_item, None, sys.exc_info()))
+
+    for _ in range(min(_threads, len(_items))):
+        _thread = threading.Thread(target=_worker)
+        _thread.daemon = True
+        _thread.start()
+
+    try:
+        for _ in range(len(_items)):
+            _item, _result, _error = _done.get()
+            if _error:
+                six.reraise(*_error)
+            yield _item, _result
+    finally:
+        _cancelled.append(True)
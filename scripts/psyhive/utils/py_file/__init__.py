@@ -5,3 +5,5 @@ from psyhive.utils.py_file.class_ import PyClass
 from psyhive.utils.py_file.def_ import PyDef
 from psyhive.utils.py_file.docs import MissingDocs
 from psyhive.utils.py_file.file_ import PyFile, text_to_py_file
+from psyhive.utils.py_file.toolkit import (
+    ToolkitInfo, find_toolkits, read_module_attrs)
@@ -0,0 +1,226 @@
+"""Tools for reading toolkit metadata without importing toolkits.
+
+A toolkit is a py file which is built into an interface by py_gui. It can
+declare ICON, LABEL and BUTTON_LABEL attributes to control how it is
+displayed. Importing a toolkit can pull in heavy dependencies, so these
+attributes are read from the ast instead, and the module is only imported
+when the toolkit is used. Toolkits with top level imports which can't be
+found (eg. because they require a particular show environment) are
+skipped, without executing them.
+"""
+
+import ast
+import operator
+import os
+import pkgutil
+import sys
+
+from psyhive.utils.cache import store_result, store_result_on_obj
+from psyhive.utils.misc import lprint, str_to_seed, to_nice
+from psyhive.utils.path import Dir, FileError, abs_path, find
+
+from psyhive.utils.py_file.file_ import PyFile
+
+
+class ToolkitInfo(object):
+    """Metadata for a toolkit py file, read from its ast."""
+
+    def __init__(self, path, name=None, deps=()):
+        """Constructor.
+
+        Args:
+            path (str): path to toolkit py file
+            name (str): override toolkit name (default is file basename)
+            deps (str list): paths to py files which are also executed
+                when this toolkit is imported (eg. package __init__)
+        """
+        self.py_file = PyFile(path)
+        self.path = self.py_file.path
+        self.name = name or self.py_file.basename
+        self.deps = [PyFile(_dep) for _dep in deps]
+
+        _attrs = read_module_attrs(self.py_file, ['LABEL', 'BUTTON_LABEL'])
+        self.label = _attrs.get('LABEL') or to_nice(self.name)
+        self.button_label = _attrs.get('BUTTON_LABEL') or self.label
+        self.title = '{} tools'.format(self.label)
+
+    @store_result_on_obj
+    def get_icon(self):
+        """Get icon for this toolkit.
+
+        If the toolkit has no ICON attribute, or it can't be read from
+        the ast, a random animal is used.
+
+        Returns:
+            (str): path to icon
+        """
+        from psyhive import icons
+        _attrs = read_module_attrs(self.py_file, ['ICON'])
+        if 'ICON' not in _attrs:
+            return str_to_seed(self.name).choice(icons.ANIMALS)
+        return _attrs['ICON']
+
+    def find_missing_imports(self):
+        """Find top level modules imported by this toolkit which are missing.
+
+        Returns:
+            (str list): names of missing modules
+        """
+        _missing = []
+        for _file in self.deps + [self.py_file]:
+            for _name in _read_imports(_file):
+                if _name not in _missing and not _module_exists(_name):
+                    _missing.append(_name)
+        return _missing
+
+    def get_module(self):
+        """Import this toolkit's module.
+
+        Returns:
+            (mod): toolkit module
+        """
+        return self.py_file.get_module()
+
+    def __repr__(self):
+        return '<{}:{}>'.format(type(self).__name__, self.name)
+
+
+def find_toolkits(dir_, verbose=0):
+    """Find toolkits in the given dir.
+
+    Toolkits are public py files in the dir, or toolkit.py files in
+    public subdirs.
+
+    Args:
+        dir_ (str): dir to search
+        verbose (int): print process data
+
+    Returns:
+        (ToolkitInfo list): toolkits, sorted by name
+    """
+    _candidates = []
+    for _py in find(dir_, extn='py', depth=1, type_='f'):
+        if not os.path.basename(_py).startswith('_'):
+            _candidates.append((_py, None, []))
+    for _dir in find(dir_, depth=1, type_='d'):
+        _name = Dir(_dir).filename
+        _py = '{}/toolkit.py'.format(_dir)
+        if _name.startswith('_') or not os.path.exists(_py):
+            continue
+        _candidates.append((_py, _name, ['{}/__init__.py'.format(_dir)]))
+
+    _toolkits = []
+    for _py, _name, _deps in _candidates:
+        try:
+            _toolkit = ToolkitInfo(_py, name=_name, deps=_deps)
+            _missing = _toolkit.find_missing_imports()
+        except (FileError, IOError, OSError) as _exc:
+            lprint(' - FAILED TO READ TOOLKIT', _py, _exc, verbose=verbose)
+            continue
+        if _missing:
+            lprint(' - MISSING IMPORTS', _py, _missing, verbose=verbose)
+            continue
+        lprint(' - FOUND TOOLKIT', _toolkit.name, verbose=verbose)
+        _toolkits.append(_toolkit)
+    _toolkits.sort(key=operator.attrgetter('name'))
+
+    return _toolkits
+
+
+def read_module_attrs(py_file, names):
+    """Read module level attribute values from a py file's ast.
+
+    Values can be literals or calls/attributes of the psyhive.icons
+    module (eg. icons.EMOJI.find('Brain')). Values which are any other
+    expression, or fail to evaluate, are ignored.
+
+    Args:
+        py_file (PyFile): py file to read
+        names (str list): attribute names to read
+
+    Returns:
+        (dict): attribute name/value
+    """
+    _attrs = {}
+    for _node in py_file.get_ast().body:
+        if not isinstance(_node, ast.Assign):
+            continue
+        for _target in _node.targets:
+            if not isinstance(_target, ast.Name) or _target.id not in names:
+                continue
+            try:
+                _attrs[_target.id] = _eval_attr(_node.value)
+            except Exception as _exc:  # pylint: disable=broad-except
+                lprint('FAILED TO READ', _target.id, py_file.path, _exc)
+                _attrs.pop(_target.id, None)
+    return _attrs
+
+
+def _eval_attr(node):
+    """Evaluate an attribute value node.
+
+    Args:
+        node (ast.AST): value to evaluate
+
+    Returns:
+        (any): value
+    """
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        pass
+    if isinstance(node, ast.Name) and node.id == 'icons':
+        from psyhive import icons
+        return icons
+    if isinstance(node, ast.Attribute):
+        return getattr(_eval_attr(node.value), node.attr)
+    if isinstance(node, ast.Call):
+        _func = _eval_attr(node.func)
+        _args = [ast.literal_eval(_arg) for _arg in node.args]
+        _kwargs = dict([(_keyword.arg, ast.literal_eval(_keyword.value))
+                        for _keyword in node.keywords])
+        return _func(*_args, **_kwargs)
+    raise ValueError('Unhandled value '+ast.dump(node))
+
+
+@store_result
+def _module_exists(name):
+    """Test whether a top level module can be imported.
+
+    The module is located but not executed.
+
+    Args:
+        name (str): module name
+
+    Returns:
+        (bool): whether module exists
+    """
+    if name in sys.modules:
+        return True
+    try:
+        return pkgutil.find_loader(name) is not None
+    except ImportError:
+        return False
+
+
+def _read_imports(py_file):
+    """Read names of top level modules imported at the top of a py file.
+
+    Relative imports and imports inside functions or try statements
+    are ignored.
+
+    Args:
+        py_file (PyFile): file to read
+
+    Returns:
+        (str list): module names
+    """
+    if not os.path.exists(abs_path(py_file.path)):
+        return []
+    _names = []
+    for _node in py_file.get_ast().body:
+        if isinstance(_node, ast.Import):
+            _names += [_alias.name for _alias in _node.names]
+        elif isinstance(_node, ast.ImportFrom) and not _node.level:
+            _names.append(_node.module)
+    return [_name.split('.')[0] for _name in _names]
@@ -7,10 +7,12 @@ import shutil
 import time
 
 from .cache import store_result_on_obj
+from .copy_ import copy_files
 from .misc import dprint, lprint, get_plural, bytes_to_str
 from .filter_ import passes_filter
 from .path import (
     File, abs_path, find, test_path, Dir, nice_size, get_path, Path)
+from .pool import thread_map
 from .range_ import ints_to_str
 
 
@@ -48,20 +50,35 @@ class Seq(object):
         _frames.add(frame)
         self.set_frames(sorted(_frames))
 
-    def copy_to(self, seq, parent=None):
+    def copy_to(self, seq, parent=None, threads=None, verify=False,
+                resume=False, progress=True):
         """Copy this sequence to a new location.
 
+        Frames are copied concurrently, and the copy rate is printed on
+        completion.
+
         Args:
             seq (Seq): target location
             parent (QDialog): parent dialog for progress bar
+            threads (int): override number of copy threads
+            verify (bool): check the md5 of each copied frame
+            resume (bool): keep existing target frames which match their
+                source frame, rather than replacing the whole sequence
+            progress (bool): show progress bar
+
+        Returns:
+            (CopyStats): copy stats
         """
-        from psyhive import qt
-        seq.delete(wording='Replace')
+        if not resume:
+            seq.delete(wording='Replace')
         seq.test_dir()
-        for _frame in qt.progress_bar(
-                self.get_frames(), 'Copying {:d} frame{}',
-                parent=parent):
-            shutil.copy(self[_frame], seq[_frame])
+        _frames = self.get_frames()
+        _stats = copy_files(
+            [(self[_frame], seq[_frame]) for _frame in _frames],
+            threads=threads, verify=verify, resume=resume,
+            progress=progress, title='Copying {:d} frame{}', parent=parent)
+        seq.get_frames(force=True)
+        return _stats
 
     def contains(self, file_):
         """Test if the given file is contained in this seq.
@@ -88,21 +105,19 @@ class Seq(object):
             frames (int list): list of frames to delete (if not all)
             icon (str): override interface icon
         """
-        from psyhive import qt
-
         _frames = self.get_frames(force=True)
         if frames:
             _frames = sorted(set(_frames).intersection(frames))
         if not _frames:
             return
         if not force:
+            from psyhive import qt
             qt.ok_cancel(
                 '{} existing frame{} {} of image sequence?\n\n{}'.format(
                     wording.capitalize(), get_plural(_frames),
                     ints_to_str(_frames), self.path),
                 title='Confirm '+wording, icon=icon)
-        for _frame in _frames:
-            os.remove(self[_frame])
+        thread_map(os.remove, [self[_frame] for _frame in _frames])
         self.get_frames(force=True)
 
     def exists(self, force=False, verbose=0):
@@ -241,8 +256,8 @@ class Seq(object):
         """
         assert not target.exists(force=True)
         target.test_dir()
-        for _frame in self.get_frames(force=True):
-            shutil.move(self[_frame], target[_frame])
+        thread_map(lambda _frame: shutil.move(self[_frame], target[_frame]),
+                   self.get_frames(force=True))
 
     def nice_size(self):
         """Get size of this image sequence in a readable form.
@@ -495,35 +510,16 @@ def find_seqs(dir_, class_=None, filter_=None, verbose=0):
     _dir = Dir(abs_path(dir_))
     _class = class_ or Seq
 
-    _this_seqs = collections.defaultdict(set)
+    _files = []
     _seqs = []
     for _path in _dir.find(depth=1, class_=Path):
 
         lprint(' - TESTING FILE', _path, verbose=verbose > 2)
 
         if _path.is_file():
-
             if filter_ and not passes_filter(_path.path, filter_):
                 continue
-
-            # Ignore files already matched in seq
-            _already_matched = False
-            for _seq in _this_seqs:
-                if _seq.contains(_path):
-                    _already_matched = True
-                    _frame = _seq.get_frame(_path)
-                    _this_seqs[_seq].add(_frame)
-                    lprint(' - EXISTING SEQ', _path, verbose=verbose > 2)
-                    break
-            if _already_matched:
-                continue
-
-            # Match seq
-            _seq = seq_from_frame(_path, catch=True, class_=_class)
-            if _seq:
-                lprint(' - CREATED SEQ', _seq, verbose=verbose)
-                _frame = _seq.get_frame(_path)
-                _this_seqs[_seq].add(_frame)
+            _files.append(_path.path)
 
         elif _path.is_dir():
             _seqs += find_seqs(
@@ -532,11 +528,60 @@ def find_seqs(dir_, class_=None, filter_=None, verbose=0):
         else:
             raise ValueError(_path)
 
-    # Apply frames cache
-    for _seq, _frames in _this_seqs.items():
-        _seq.set_frames(sorted(_frames))
+    # Build seqs from grouped frames
+    for _fmt, _frames in group_files_by_seq(_files):
+        if _frames is None:
+            continue
+        try:
+            _seq = _class(_fmt)
+        except ValueError:
+            continue
+        lprint(' - CREATED SEQ', _seq, verbose=verbose)
+        _seq.set_frames(_frames)
+        _seqs.append(_seq)
+
+    return sorted(_seqs, key=operator.attrgetter('path'))
 
-    return sorted(_seqs+_this_seqs.keys(), key=operator.attrgetter('path'))
+
+def group_files_by_seq(paths):
+    """Group the given file paths into sequences in a single pass.
+
+    Each filename is parsed once as <base>.<frame>.<extn> and its frame
+    is added to a bucket for the sequence with the same dir, base,
+    frame padding and extension. Frames which format using %04d are
+    bucketed with 4 padding (so frames beyond 9999 are added to the 4
+    padded sequence).
+
+    Args:
+        paths (str list): absolute file paths
+
+    Returns:
+        (tuple list): list of (path, frames) pairs in order of first
+            appearance - for sequences this is the seq path with a
+            sorted frames list, otherwise it is the file path with
+            frames as None
+    """
+    _groups = collections.OrderedDict()
+    for _path in paths:
+        _dir, _, _filename = _path.rpartition('/')
+        _tokens = _filename.split('.')
+        if len(_tokens) < 3 or not _tokens[-2].isdigit():
+            _groups[_path] = None
+            continue
+        _frame_str = _tokens[-2]
+        _frame = int(_frame_str)
+        if '%04d' % _frame == _frame_str:
+            _pad = 4
+        else:
+            _pad = len(_frame_str)
+        _fmt = '{}/{}.%0{:d}d.{}'.format(
+            _dir, '.'.join(_tokens[:-2]), _pad, _tokens[-1])
+        if _fmt not in _groups:
+            _groups[_fmt] = set()
+        _groups[_fmt].add(_frame)
+
+    return [(_path, sorted(_frames) if _frames is not None else None)
+            for _path, _frames in _groups.items()]
 
 
 def seq_from_frame(file_, catch=False, class_=None):
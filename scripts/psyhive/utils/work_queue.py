@@ -0,0 +1,289 @@
+"""Tools for sharing a list of work items between concurrent workers.
+
+Workers claim items by creating a lease file in a shared dir. Lease files
+are created atomically, so each item is only claimed by one worker at a
+time, and a done file is written when an item completes, so it is never
+claimed again. While an item is being processed its lease is renewed in
+a background thread - if a worker crashes, its leases stop being renewed
+and expire, allowing other workers to claim the items. Each lease file
+records its owner, and a worker only renews, releases or completes a
+lease which it still owns, so a worker whose lease expired can't disturb
+the worker which reclaimed the item.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+
+from .misc import lprint
+from .path import test_path
+
+LEASE_TIME = 5*60
+
+
+class WorkQueue(object):
+    """A list of work items shared between workers using a dir of leases."""
+
+    def __init__(self, dir_, lease_time=LEASE_TIME):
+        """Constructor.
+
+        Args:
+            dir_ (str): dir to store lease and done files in
+            lease_time (float): time in secs after which an unrenewed
+                lease expires
+        """
+        self.dir = dir_
+        self.lease_time = lease_time
+        test_path(self.dir)
+
+    def claim(self, item):
+        """Try to claim an item.
+
+        The item is checked again once the lease is acquired, since the
+        previous owner writes the done file before removing its lease.
+
+        Args:
+            item (str): item to claim
+
+        Returns:
+            (Lease|None): lease if the item was claimed
+        """
+        if self.is_done(item):
+            return None
+        _lease = Lease(self, item)
+        if not _lease.acquire():
+            return None
+        if self.is_done(item):
+            _lease.release()
+            return None
+        return _lease
+
+    def get_status(self, items):
+        """Get status of the given items.
+
+        Args:
+            items (str list): items to check
+
+        Returns:
+            (tuple): done, leased and pending item lists
+        """
+        _done, _leased, _pending = [], [], []
+        for _item in items:
+            if self.is_done(_item):
+                _done.append(_item)
+            elif Lease(self, _item).is_active():
+                _leased.append(_item)
+            else:
+                _pending.append(_item)
+        return _done, _leased, _pending
+
+    def get_path(self, item, extn):
+        """Get path to a file used to track the given item.
+
+        Args:
+            item (str): item to get path for
+            extn (str): file extension
+
+        Returns:
+            (str): path to file
+        """
+        _hash = hashlib.md5(item.encode('utf-8')).hexdigest()
+        return '{}/{}.{}'.format(self.dir, _hash, extn)
+
+    def is_done(self, item):
+        """Test whether an item has been completed.
+
+        Args:
+            item (str): item to check
+
+        Returns:
+            (bool): whether item is done
+        """
+        return os.path.exists(self.get_path(item, 'done'))
+
+    def reset(self, items, leases=True):
+        """Remove any leases or done files for the given items.
+
+        Args:
+            items (str list): items to reset
+            leases (bool): also remove leases - if this is disabled,
+                items being processed by other workers are unaffected
+        """
+        _extns = ['lease', 'done'] if leases else ['done']
+        for _item in items:
+            for _extn in _extns:
+                _path = self.get_path(_item, _extn)
+                if os.path.exists(_path):
+                    os.remove(_path)
+
+
+class Lease(object):
+    """A worker's claim on a work queue item.
+
+    This can be used as a context manager, which renews the lease while
+    the item is processed and then completes or releases it.
+    """
+
+    def __init__(self, queue, item):
+        """Constructor.
+
+        Args:
+            queue (WorkQueue): parent queue
+            item (str): item being claimed
+        """
+        self.queue = queue
+        self.item = item
+        self.path = queue.get_path(item, 'lease')
+        self.owner = '{}:{:d}:{:d}'.format(
+            socket.gethostname(), os.getpid(), id(self))
+        self._renewing = None
+
+    def acquire(self):
+        """Try to acquire this lease.
+
+        If there is an existing lease which has expired, it is first
+        renamed aside. Another worker may have replaced the expired lease
+        since it was checked, so the renamed lease is checked again, and
+        put back if it turns out to be active.
+
+        Returns:
+            (bool): whether lease was acquired
+        """
+        if os.path.exists(self.path) and not self.is_active():
+            _aside = '{}.expired.{}'.format(
+                self.path, self.owner.replace(':', '_'))
+            try:
+                os.rename(self.path, _aside)
+            except OSError:
+                return False
+            if _get_age(_aside) < self.queue.lease_time:
+                _restore_lease(_aside, self.path)
+                return False
+            os.remove(_aside)
+
+        try:
+            _fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except OSError:
+            return False
+        os.write(_fd, json.dumps({
+            'item': self.item, 'owner': self.owner, 'time': time.time()}))
+        os.close(_fd)
+        return True
+
+    def complete(self):
+        """Mark this lease's item as done and remove the lease.
+
+        If this lease has been lost to another worker then the item is
+        left for that worker to complete.
+
+        Returns:
+            (bool): whether item was completed
+        """
+        if not self.is_held():
+            lprint('LEASE LOST', self.item)
+            return False
+        with open(self.queue.get_path(self.item, 'done'), 'w') as _file:
+            json.dump({'item': self.item, 'owner': self.owner,
+                       'time': time.time()}, _file)
+        self.release()
+        return True
+
+    def is_active(self):
+        """Test whether this lease is held and has not expired.
+
+        Returns:
+            (bool): whether lease active
+        """
+        return _get_age(self.path) < self.queue.lease_time
+
+    def is_held(self):
+        """Test whether the lease file belongs to this lease.
+
+        Returns:
+            (bool): whether this lease is the current owner
+        """
+        try:
+            with open(self.path) as _file:
+                return json.load(_file).get('owner') == self.owner
+        except (IOError, OSError, ValueError):
+            return False
+
+    def release(self):
+        """Remove this lease so that the item can be claimed again."""
+        if self.is_held():
+            os.remove(self.path)
+
+    def renew(self):
+        """Renew this lease by updating its mtime.
+
+        Returns:
+            (bool): whether this lease is still held
+        """
+        if not self.is_held():
+            return False
+        os.utime(self.path, None)
+        return True
+
+    def _renew_until_stopped(self, stopped):
+        """Renew this lease periodically until the given event is set.
+
+        Args:
+            stopped (threading.Event): event which stops renewal
+        """
+        while not stopped.wait(self.queue.lease_time/3.0):
+            if not self.renew():
+                lprint('LEASE LOST', self.item)
+                return
+
+    def __enter__(self):
+        self._renewing = threading.Event()
+        _thread = threading.Thread(
+            target=self._renew_until_stopped, args=(self._renewing, ))
+        _thread.daemon = True
+        _thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._renewing.set()
+        if exc_type:
+            self.release()
+        else:
+            self.complete()
+
+
+def _get_age(path):
+    """Get time since the given file was modified.
+
+    Args:
+        path (str): path to file
+
+    Returns:
+        (float): age in secs (infinite if file is missing)
+    """
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return float('inf')
+
+
+def _restore_lease(aside, path):
+    """Put back a lease which was renamed aside.
+
+    If a new lease has been created since then, the renamed lease is
+    discarded instead of replacing it.
+
+    Args:
+        aside (str): path lease was renamed to
+        path (str): lease path
+    """
+    try:
+        if hasattr(os, 'link'):
+            os.link(aside, path)
+            os.remove(aside)
+        else:
+            os.rename(aside, path)
+    except OSError:
+        os.remove(aside)